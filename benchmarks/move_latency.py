@@ -0,0 +1,83 @@
+"""Per-move latency of each CursorService input backend under Xvfb.
+
+Usage: python benchmarks/move_latency.py [--moves N] [--display :99]
+
+Starts a private Xvfb server (unless --display points at a running one),
+then times move_relative() for every available backend and prints
+percentiles in microseconds.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cursor_service import INPUT_BACKENDS  # noqa: E402
+
+def start_xvfb(display):
+    if shutil.which("Xvfb") is None:
+        sys.exit("Xvfb not found; install it or pass --display of a running server")
+    process = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socket_path = f"/tmp/.X11-unix/X{display.lstrip(':')}"
+    for _ in range(100):
+        if os.path.exists(socket_path):
+            return process
+        time.sleep(0.05)
+    process.terminate()
+    sys.exit("Xvfb did not start")
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+def bench(backend, moves):
+    backend.open()
+    samples = []
+    try:
+        for i in range(moves):
+            offset = 1 if i % 2 == 0 else -1
+            start = time.perf_counter_ns()
+            backend.move_relative(offset, offset)
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        backend.close()
+    samples.sort()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--moves", type=int, default=2000)
+    parser.add_argument("--display", default=None)
+    args = parser.parse_args()
+    
+    xvfb = None
+    if args.display is None:
+        args.display = ":99"
+        xvfb = start_xvfb(args.display)
+    os.environ["DISPLAY"] = args.display
+    
+    try:
+        print(f"{'backend':<12} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10} {'max us':>10}")
+        for name, backend_class in INPUT_BACKENDS.items():
+            if not backend_class.available():
+                print(f"{name:<12} unavailable")
+                continue
+            try:
+                samples = bench(backend_class(), args.moves)
+            except Exception as e:
+                print(f"{name:<12} failed: {e}")
+                continue
+            print(f"{name:<12} {percentile(samples, 0.5) / 1000:>10.1f} "
+                  f"{percentile(samples, 0.9) / 1000:>10.1f} "
+                  f"{percentile(samples, 0.99) / 1000:>10.1f} {samples[-1] / 1000:>10.1f}")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+if __name__ == "__main__":
+    main()
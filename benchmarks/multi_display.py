@@ -0,0 +1,82 @@
+"""Cost of keeping many Xvfb displays awake from one DisplayManager.
+
+Usage: python benchmarks/multi_display.py [--displays 500] [--seconds 30]
+                                          [--frequency 1.0] [--first 200]
+
+Starts --displays private Xvfb servers on :FIRST upwards, adds each one as a
+target with a zero idle threshold (so every target moves on every tick),
+runs the scheduler for --seconds and prints moves, loop wakeups, CPU time
+and peak RSS. A display killed part-way through must be dropped without
+taking the process down; --kill-one checks that.
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.display_manager import DisplayManager  # noqa: E402
+from services.event_loop import HeapEventLoop  # noqa: E402
+
+def start_xvfb(display):
+    return subprocess.Popen(["Xvfb", display, "-screen", "0", "640x480x8", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_for_sockets(displays, timeout=30):
+    deadline = time.monotonic() + timeout
+    for display in displays:
+        socket_path = f"/tmp/.X11-unix/X{display.lstrip(':')}"
+        while not os.path.exists(socket_path):
+            if time.monotonic() > deadline:
+                sys.exit(f"Xvfb {display} did not start")
+            time.sleep(0.05)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--displays", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--frequency", type=float, default=1.0)
+    parser.add_argument("--first", type=int, default=200)
+    parser.add_argument("--kill-one", action="store_true")
+    args = parser.parse_args()
+    
+    if shutil.which("Xvfb") is None:
+        sys.exit("Xvfb not found")
+    
+    displays = [f":{args.first + i}" for i in range(args.displays)]
+    servers = [start_xvfb(display) for display in displays]
+    try:
+        wait_for_sockets(displays)
+        loop = HeapEventLoop()
+        manager = DisplayManager(loop)
+        for display in displays:
+            manager.add_target(display, frequency=args.frequency, idle_threshold=0)
+        
+        if args.kill_one:
+            loop.call_at(loop.time() + args.seconds / 2, servers[0].kill)
+        
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        loop.call_at(loop.time() + args.seconds, loop.stop)
+        loop.run_forever()
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        
+        cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+        print(f"targets alive:   {len(manager.targets)} / {args.displays}")
+        print(f"moves:           {manager.metrics.moves.value}")
+        print(f"loop wakeups:    {manager.metrics.loop_jitter.count}")
+        print(f"CPU:             {cpu:.2f} s ({cpu / args.seconds * 100:.1f}% of one core)")
+        print(f"peak RSS:        {after.ru_maxrss / 1024:.1f} MB")
+        manager.close()
+    finally:
+        for server in servers:
+            server.terminate()
+        for server in servers:
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Storage writes caused by a simulated slider drag, before and after write-behind.
+
+Usage: python benchmarks/settings_writes.py [--events N] [--rate HZ]
+
+Replays a drag of the frequency slider as N valueChanged events at the given
+rate through SettingsService.save_frequency(), once writing through
+(flush_delay=0, the old behaviour) and once with the default coalescing
+flush, and counts set_value() and sync() calls reaching the backend.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.settings_service import FLUSH_DELAY, SettingsService  # noqa: E402
+
+class CountingBackend:
+    """In-memory settings backend that counts storage operations"""
+    
+    def __init__(self):
+        self.values = {}
+        self.set_calls = 0
+        self.sync_calls = 0
+    
+    def value(self, key, default, type):
+        return type(self.values.get(key, default))
+    
+    def set_value(self, key, value):
+        self.set_calls += 1
+        self.values[key] = value
+    
+    def sync(self):
+        self.sync_calls += 1
+    
+    def reload(self):
+        pass
+
+def drag(flush_delay, events, rate):
+    backend = CountingBackend()
+    settings = SettingsService(backend, flush_delay=flush_delay)
+    start = time.perf_counter()
+    for i in range(events):
+        settings.save_frequency((i % 30 + 1) / 10)
+        time.sleep(1 / rate)
+    elapsed = time.perf_counter() - start
+    settings.flush()  # what quitting does
+    return backend, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=60)
+    parser.add_argument("--rate", type=float, default=60.0)
+    args = parser.parse_args()
+    
+    print(f"Slider drag: {args.events} valueChanged events at {args.rate:g} Hz")
+    print(f"{'mode':<16} {'set_value':>10} {'sync':>6} {'drag s':>8}")
+    for label, flush_delay in (("write-through", 0), ("write-behind", FLUSH_DELAY)):
+        backend, elapsed = drag(flush_delay, args.events, args.rate)
+        print(f"{label:<16} {backend.set_calls:>10} {backend.sync_calls:>6} {elapsed:>8.2f}")
+
+if __name__ == "__main__":
+    main()
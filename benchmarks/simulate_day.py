@@ -0,0 +1,76 @@
+"""Sweep keep-alive settings over a simulated day on a virtual clock.
+
+Usage: python benchmarks/simulate_day.py [--script PATH | --journal PATH | --recording PATH]
+                                         [--frequency 1,5,30] [--idle-threshold 3,60,300]
+                                         [--wakeup-budget N] [--timeline]
+
+Replays an activity trace (the built-in workday, a trace script, a
+journal dump saved from the tray or with `cursorvibe-ctl events`, or a
+binary activity recording from the `activity_trace` setting) through
+the real scheduler for every combination of --frequency and
+--idle-threshold, and prints moves, engine wakeups, deadlines missed
+across suspends, the longest stretch without input or a move, and how long
+each simulation took. --timeline prints every move, wakeup and missed
+deadline of a single combination instead.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.simulation import (WORKDAY_SCRIPT, Simulation,  # noqa: E402
+                                 load_activity_recording, load_journal_trace, parse_script)
+
+def float_list(text):
+    return [float(value) for value in text.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--script", help="trace script (see services/simulation.py)")
+    source.add_argument("--journal", help="journal dump to replay")
+    source.add_argument("--recording", help="binary activity recording to replay")
+    parser.add_argument("--frequency", type=float_list, default=[1.0, 5.0, 30.0])
+    parser.add_argument("--idle-threshold", type=float_list, default=[3.0, 60.0, 300.0])
+    parser.add_argument("--wakeup-budget", type=int, default=None,
+                        help="simulate battery power with this many wakeups per minute")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeline", action="store_true")
+    args = parser.parse_args()
+    
+    if args.journal:
+        events, duration = load_journal_trace(args.journal)
+    elif args.recording:
+        events, duration = load_activity_recording(args.recording)
+    else:
+        text = WORKDAY_SCRIPT
+        if args.script:
+            with open(args.script) as f:
+                text = f.read()
+        events, duration = parse_script(text)
+    
+    if args.timeline:
+        report = Simulation(events, duration, frequency=args.frequency[0],
+                            idle_threshold=args.idle_threshold[0], seed=args.seed,
+                            wakeup_budget=args.wakeup_budget).run()
+        for when, kind, detail in report.timeline():
+            print(f"{when:12.3f} {kind:<7} {detail}")
+        return
+    
+    print(f"trace: {duration / 3600:.1f} h, {len(events)} events")
+    print(f"{'frequency':>10} {'threshold':>10} {'moves':>8} {'wakeups':>8} {'missed':>7} "
+          f"{'longest gap':>12} {'elapsed':>9}")
+    for frequency in args.frequency:
+        for idle_threshold in args.idle_threshold:
+            report = Simulation(events, duration, frequency=frequency,
+                                idle_threshold=idle_threshold, seed=args.seed,
+                                wakeup_budget=args.wakeup_budget).run()
+            summary = report.summary()
+            print(f"{frequency:>10g} {idle_threshold:>10g} {summary['moves']:>8} "
+                  f"{summary['wakeups']:>8} {summary['missed']:>7} "
+                  f"{summary['longest_gap']:>11.1f}s {summary['elapsed'] * 1000:>7.0f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Startup time and resident memory, settings window versus tray-only start.
+
+Usage: python benchmarks/startup.py [--runs N]
+
+Launches `main.py --profile-startup` N times in each mode under the
+offscreen QPA (no display needed), each with its own empty runtime and
+config directories so no running instance or saved setting interferes.
+A window start is measured up to the first paint of the settings window,
+a tray start (--tray) up to the event loop running. Prints the median
+total startup time and the resident memory at that point.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOTAL = re.compile(r"^\s*total\s+([\d.]+) ms")
+RSS = re.compile(r"^\s*resident memory\s+([\d.]+) MiB")
+
+def profile(extra_args):
+    """Run one profiled start; return (milliseconds, MiB)"""
+    with tempfile.TemporaryDirectory() as runtime, tempfile.TemporaryDirectory() as config:
+        os.chmod(runtime, 0o700)
+        env = dict(os.environ, XDG_RUNTIME_DIR=runtime, XDG_CONFIG_HOME=config,
+                   PYTHONUNBUFFERED="1")
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "main.py"), "--profile-startup"] + extra_args,
+            cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        total = rss = None
+        try:
+            for line in process.stdout:
+                if TOTAL.match(line):
+                    total = float(TOTAL.match(line).group(1))
+                elif RSS.match(line):
+                    rss = float(RSS.match(line).group(1))
+                elif line.strip().startswith("modules loaded"):
+                    break
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+        if total is None:
+            raise RuntimeError(f"no startup profile from main.py {' '.join(extra_args)}")
+        return total, rss
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    
+    print(f"{'mode':<10} {'startup':>10} {'resident':>10}  (median of {args.runs})")
+    for name, extra_args in (("window", []), ("tray", ["--tray"])):
+        profile(extra_args)  # Warm up the page cache
+        samples = [profile(extra_args) for _ in range(args.runs)]
+        total = statistics.median(total for total, _ in samples)
+        rss = [rss for _, rss in samples if rss is not None]
+        rss_text = f"{statistics.median(rss):7.1f} MiB" if rss else "       n/a"
+        print(f"{name:<10} {total:7.1f} ms {rss_text}")
+
+if __name__ == "__main__":
+    main()
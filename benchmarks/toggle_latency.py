@@ -0,0 +1,108 @@
+"""Start/stop button restyle latency, per-widget stylesheets versus the app theme.
+
+Usage: python benchmarks/toggle_latency.py [--toggles N]
+
+Builds the real main window under the offscreen QPA (no display needed)
+and switches the toggle button between its active and inactive look N
+times: once the old way, by setting a freshly formatted stylesheet on the
+button and clearing it again, and once by switching its dynamic "variant"
+property against the application stylesheet. Each toggle includes
+repainting the button. Prints percentiles in microseconds.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from ui.custom_widgets import COLORS  # noqa: E402
+
+LEGACY_PRIMARY = f"""
+    QPushButton {{
+        background-color: {COLORS["primary"]};
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 8px 16px;
+        font-weight: bold;
+    }}
+    QPushButton:hover {{
+        background-color: {COLORS["primary_dark"]};
+    }}
+"""
+
+def legacy_toggle(button, active):
+    # What refresh_status() did before: format and parse a sheet per toggle,
+    # then clear it and parse the button's own sheet again
+    if active:
+        button.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {COLORS["danger"]};
+                color: white;
+                border: none;
+                border-radius: 4px;
+                padding: 8px 16px;
+                font-weight: bold;
+            }}
+            QPushButton:hover {{
+                background-color: #C82333;
+            }}
+            QPushButton:pressed {{
+                background-color: #BD2130;
+            }}
+        """)
+    else:
+        button.setStyleSheet("")
+        button.setStyleSheet(LEGACY_PRIMARY)
+
+def themed_toggle(button, active):
+    if active:
+        button.set_variant("danger")
+    else:
+        button.update_style()
+
+def bench(app, button, toggle, toggles):
+    samples = []
+    for i in range(toggles):
+        start = time.perf_counter()
+        toggle(button, i % 2 == 0)
+        button.repaint()
+        app.processEvents()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--toggles", type=int, default=2000)
+    args = parser.parse_args()
+    
+    app = QApplication(sys.argv[:1])
+    app.setStyle("Fusion")
+    import resources  # noqa: F401  Registers :/icons for the stylesheet
+    from ui.app import CursorVibeApp
+    cursor_vibe = CursorVibeApp()
+    cursor_vibe.show_settings()
+    app.processEvents()
+    button = cursor_vibe.settings_window.toggle_button
+    
+    print(f"{'method':<10} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (us per toggle)")
+    for name, toggle in (("legacy", legacy_toggle), ("themed", themed_toggle)):
+        bench(app, button, toggle, 50)  # Warm up
+        samples = bench(app, button, toggle, args.toggles)
+        print(f"{name:<10} " + " ".join(
+            f"{percentile(samples, fraction) * 1e6:8.0f}" for fraction in (0.5, 0.9, 0.99, 1.0)))
+        button.setStyleSheet("")
+        button.update_style()
+    cursor_vibe.close_app()
+
+if __name__ == "__main__":
+    main()
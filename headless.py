@@ -0,0 +1,203 @@
+import argparse
+import signal
+
+from services.activity_recorder import open_recorder
+from services.control_server import CONTROL_AVAILABLE, ControlError, ControlHandler, ControlServer
+from services import x11
+from services.cursor_service import CursorService
+from services.event_loop import HeapEventLoop
+from services.journal import LogSink, journal
+from services.metrics import start_exporters
+from services.power_policy import PowerPolicy
+from services.schedule import ScheduleTimer
+from services.settings_service import FileSettingsBackend, SettingsService
+
+# Qt-free daemon for kiosk and VDI hosts where nobody opens the settings
+# window. Nothing imported from here may pull in PyQt5.
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="cursorvibe --headless",
+                                     description="Run CursorVibe without a GUI.")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--config", default=None,
+                        help=f"settings file (default: {FileSettingsBackend.default_path()})")
+    parser.add_argument("--display", action="append", default=[], metavar="NAME",
+                        help="keep X display NAME awake instead of the local session "
+                             "(repeatable; more can be added at runtime with cursorvibe-ctl)")
+    parser.add_argument("--log", default=None, metavar="PATH",
+                        help="append the event journal to PATH ('-' for stderr)")
+    parser.add_argument("--metrics-textfile", default=None, metavar="PATH",
+                        help="rewrite Prometheus metrics to PATH every 15 seconds")
+    parser.add_argument("--metrics-port", default=None, type=int, metavar="PORT",
+                        help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    parser.add_argument("--record-activity", default=None, metavar="PATH",
+                        help="record user activity to the binary trace PATH")
+    parser.add_argument("--workers", default=None, type=int, metavar="N",
+                        help="shard --display targets across N worker processes "
+                             "(0: one per CPU core)")
+    return parser.parse_args(argv)
+
+# Commands a second launch may pass on to the running daemon, e.g. `main.py stop`
+FORWARDED_COMMANDS = ("start", "stop", "toggle")
+
+def run_forwarded_args(handler, argv):
+    """Run the commands in argv forwarded by a second launch
+    
+    Options only apply when the daemon starts and are ignored. Other
+    control commands need cursorvibe-ctl, which can show their results.
+    """
+    for word in argv:
+        if word not in FORWARDED_COMMANDS and hasattr(handler, f"cmd_{word}"):
+            raise ControlError(f"use cursorvibe-ctl {word}")
+    for word in argv:
+        if word in FORWARDED_COMMANDS:
+            handler.execute({"cmd": word})
+
+def apply_settings(settings_service, cursor_service):
+    """Push the loaded settings into the cursor service"""
+    settings = settings_service.get_all_settings()
+    cursor_service.power_policy.battery_budget = settings["wakeup_budget"]
+    cursor_service.update_settings(
+        frequency=settings["movement_frequency"],
+        distance=settings["movement_distance"],
+        idle_threshold=settings["idle_threshold"],
+        pattern=settings["pattern"],
+        pattern_file=settings["pattern_file"],
+        sparse_margin=settings["sparse_margin"],
+        feedback_tuning=settings["feedback_tuning"]
+    )
+    cursor_service.set_mode(settings["keep_awake_mode"])
+
+def run_headless(argv):
+    """Run the keep-alive engine on the main thread until SIGTERM or SIGINT"""
+    args = parse_args(argv)
+    loop = HeapEventLoop()
+    settings_service = SettingsService(FileSettingsBackend(args.config), loop=loop)
+    power_policy = PowerPolicy(battery_budget=settings_service.wakeup_budget)
+    activity_recorder = None
+    activity_trace = args.record_activity or settings_service.activity_trace
+    if activity_trace:
+        activity_recorder = open_recorder(activity_trace)
+    cursor_service = CursorService(
+        loop=loop,
+        mode=settings_service.keep_awake_mode,
+        input_backend=settings_service.input_backend,
+        power_policy=power_policy,
+        recorder=activity_recorder
+    )
+    apply_settings(settings_service, cursor_service)
+    cursor_service.on_tuning_change = settings_service.save_feedback_tuning
+    
+    log_sink = None
+    log_file = args.log if args.log is not None else settings_service.log_file
+    if log_file:
+        try:
+            log_sink = LogSink.open(journal, log_file)
+            log_sink.start()
+        except OSError as e:
+            journal.error(f"Error opening log file {log_file}: {e}")
+    
+    # Remote X displays (VDI sessions) share this loop and its metrics, or
+    # are sharded across worker processes that report into those metrics.
+    # Each is imported only when used: the supervisor pulls in multiprocessing
+    if args.workers is not None:
+        from services.supervisor import Supervisor
+        display_manager = Supervisor(loop, workers=args.workers, metrics=cursor_service.metrics)
+        display_manager.start()
+    else:
+        from services.display_manager import DisplayManager
+        display_manager = DisplayManager(loop, metrics=cursor_service.metrics)
+    
+    exporters = start_exporters(
+        cursor_service.metrics, loop,
+        textfile=args.metrics_textfile if args.metrics_textfile is not None else settings_service.metrics_textfile,
+        port=args.metrics_port if args.metrics_port is not None else settings_service.metrics_port
+    )
+    
+    # Active hours drive the local session only, not --display targets
+    def active_hours_changed(active):
+        if active:
+            cursor_service.start_simulation()
+        else:
+            cursor_service.stop_simulation()
+    
+    schedule_timer = None
+    if not args.display and args.workers is None:
+        schedule_timer = ScheduleTimer(
+            lambda active: loop.call_soon_threadsafe(lambda: active_hours_changed(active))
+        )
+    
+    control_server = None
+    if CONTROL_AVAILABLE:
+        handler = ControlHandler(cursor_service, settings_service, display_manager=display_manager,
+                                 schedule_timer=schedule_timer,
+                                 on_args=lambda argv: run_forwarded_args(handler, argv))
+        control_server = ControlServer(handler, loop)
+        try:
+            control_server.start()
+        except OSError as e:
+            journal.error(f"Control socket unavailable: {e}")
+            control_server = None
+    
+    def shutdown():
+        cursor_service.stop_simulation()
+        settings_service.flush()
+        if control_server is not None:
+            control_server.stop()
+        for exporter in exporters:
+            exporter.stop()
+        power_policy.stop_monitor()
+        if schedule_timer is not None:
+            schedule_timer.stop()
+        display_manager.close()
+        if log_sink is not None:
+            log_sink.stop()
+        if activity_recorder is not None:
+            activity_recorder.close()
+        loop.stop()
+    
+    def apply_schedule():
+        """Follow the active hours in the settings; return True if there are any"""
+        try:
+            schedule = settings_service.load_schedule()
+        except ValueError as e:
+            journal.error(f"Invalid active hours, ignoring them: {e}")
+            schedule = None
+        schedule_timer.set_schedule(schedule)
+        return schedule is not None
+    
+    def reload():
+        schedule_settings = (settings_service.active_hours, settings_service.holidays_file,
+                             settings_service.schedule_timezone)
+        settings_service.reload()
+        apply_settings(settings_service, cursor_service)
+        if schedule_timer is not None and schedule_settings != (
+                settings_service.active_hours, settings_service.holidays_file,
+                settings_service.schedule_timezone):
+            apply_schedule()
+        journal.info("Settings reloaded")
+    
+    loop.add_signal_handler(signal.SIGTERM, shutdown)
+    loop.add_signal_handler(signal.SIGINT, shutdown)
+    loop.add_signal_handler(signal.SIGHUP, reload)
+    
+    def power_changed():
+        cursor_service.apply_power_policy()
+        journal.info(power_policy.describe(cursor_service.move_interval))
+    
+    power_policy.start_monitor(lambda: loop.call_soon_threadsafe(power_changed))
+    for display_name in args.display:
+        try:
+            display_manager.add_target(
+                display_name,
+                frequency=settings_service.movement_frequency,
+                distance=settings_service.movement_distance,
+                idle_threshold=settings_service.idle_threshold,
+                pattern=settings_service.pattern
+            )
+        except x11.X11Error as e:
+            journal.error(f"Error adding display {display_name}: {e}")
+    if schedule_timer is not None and not apply_schedule():
+        cursor_service.start_simulation()
+    loop.run_forever()
+    return 0
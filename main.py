@@ -1,14 +1,118 @@
-
+import os
 import sys
-from PyQt5.QtWidgets import QApplication
-from ui.main_window import CursorVibe
-import resources  # Import the resources file
+import time
 
-if __name__ == "__main__":
+def resident_memory():
+    """Return the resident set size in bytes, or None where it cannot be read"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current, in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class StartupProfiler:
+    """Collects wall-clock timings of startup phases for --profile-startup"""
+    
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.start = self.last = time.perf_counter()
+        self.phases = []
+    
+    def mark(self, label):
+        """Record the time spent since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((label, now - self.last))
+        self.last = now
+    
+    def report(self):
+        """Print the phase breakdown and the modules loaded so far"""
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self.start
+        print("Startup profile:")
+        for label, seconds in self.phases:
+            print(f"  {label:<28} {seconds * 1000:8.1f} ms")
+        print(f"  {'total':<28} {total * 1000:8.1f} ms")
+        rss = resident_memory()
+        if rss is not None:
+            print(f"  {'resident memory':<28} {rss / 2**20:8.1f} MiB")
+        heavy = [name for name in ("pyautogui", "PIL", "numpy") if name in sys.modules]
+        print(f"  modules loaded: {len(sys.modules)}; heavy: {', '.join(heavy) or 'none'}")
+
+def main():
+    # A second launch hands its arguments to the running instance and exits
+    from services.control_server import (CONTROL_AVAILABLE, ControlError,
+                                         forward_to_running_instance)
+    try:
+        if CONTROL_AVAILABLE and forward_to_running_instance(sys.argv[1:]):
+            sys.exit(0)
+    except ControlError as e:
+        print(f"cursorvibe: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    if "--headless" in sys.argv:
+        # Must stay ahead of every PyQt5 import
+        from headless import run_headless
+        sys.exit(run_headless(sys.argv[1:]))
+    
+    profiler = StartupProfiler("--profile-startup" in sys.argv)
+    
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+    profiler.mark("import PyQt5")
+    
+    import resources  # Registers the compiled :/icons resources
+    profiler.mark("register resources")
+    
+    from ui.app import CursorVibeApp
+    profiler.mark("import ui and services")
+    
     app = QApplication(sys.argv)
     
     # Set application style
     app.setStyle("Fusion")
+    # The tray keeps running while no window is open
+    app.setQuitOnLastWindowClosed(False)
+    profiler.mark("create QApplication")
+    
+    cursor_vibe = CursorVibeApp()
+    profiler.mark("start services and tray")
+    
+    # Logon starts (--tray) only get the tray icon; the settings window is
+    # built when it is first asked for. The tray may not be up yet at logon,
+    # Qt shows the icon once it is, and launching again opens the window.
+    tray_only = "--tray" in sys.argv or cursor_vibe.settings_service.start_in_tray
+    if not tray_only:
+        cursor_vibe.show_settings()
+        profiler.mark("build settings window")
+    elif profiler.enabled:
+        # Nothing is painted; the event loop running marks the ready state
+        def ready():
+            profiler.mark("event loop running")
+            profiler.report()
+        QTimer.singleShot(0, ready)
+    
+    if profiler.enabled and cursor_vibe.settings_window is not None:
+        class FirstPaintFilter(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Paint:
+                    app.removeEventFilter(self)
+                    profiler.mark("first paint")
+                    profiler.report()
+                return False
+        
+        # The first Paint delivered to any widget marks the first frame
+        first_paint_filter = FirstPaintFilter(app)
+        app.installEventFilter(first_paint_filter)
     
-    cursor_vibe = CursorVibe()
     sys.exit(app.exec_())
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,94 @@
+# -*- coding: utf-8 -*-
 
-# Resource file for icons and other resources
+# Resource object code
+#
+# Created by: The Resource Compiler for PyQt5 (Qt v5.15.14)
+#
+# WARNING! All changes made in this file will be lost!
 
-# This is a placeholder for a real resource file
-# In a real application, you would use PyQt's resource system (pyrcc5)
-# to compile resources into a Python module
+from PyQt5 import QtCore
 
-# For now, we'll create some dummy icons as base64 data
+qt_resource_data = b"\
+\x00\x00\x00\xdd\
+\x89\
+\x50\x4e\x47\x0d\x0a\x1a\x0a\x00\x00\x00\x0d\x49\x48\x44\x52\x00\
+\x00\x00\x20\x00\x00\x00\x20\x08\x06\x00\x00\x00\x73\x7a\x7a\xf4\
+\x00\x00\x00\xa4\x49\x44\x41\x54\x78\xda\xe5\xd7\xbd\x0d\x00\x21\
+\x08\x05\x60\xeb\x5b\x8a\xd1\x1c\xcd\x09\x6e\x26\xaf\x39\x1b\xe3\
+\x1f\xf0\x40\x13\x0b\x1b\x2c\xf8\xf2\x02\x26\x86\xe7\xcd\x61\xe7\
+\x09\x27\x02\xd2\x6e\x40\xf6\x44\xf4\x00\x6e\x88\x11\xc0\x05\x31\
+\x03\x94\x43\xbb\x01\x66\x08\x0e\xc0\x04\xc1\x05\xc0\x11\x12\x00\
+\x74\x38\xa5\x00\x18\x42\x03\x80\x20\xb4\x00\x35\x02\x01\x50\x0d\
+\x27\x12\x20\x42\xa0\x01\x6c\x84\x05\x80\x85\xd0\x00\xe8\xaa\x77\
+\x80\xfe\x86\x75\xdd\x05\x50\xa2\xa6\xc6\x5d\xb4\x06\xd0\x42\x3a\
+\x66\x80\xd6\x90\x45\x74\x0a\x3d\xc0\x68\xc2\xa1\x29\xb4\x8a\xb3\
+\xf5\x8a\xc8\x95\x94\xca\x61\x2b\x29\x05\xa4\xaa\xb9\x7b\x02\xa4\
+\x6d\x7c\xf4\xdf\xf0\x2e\xc0\x07\x39\x91\x34\x08\xa8\xe0\xd6\x7f\
+\x00\x00\x00\x00\x49\x45\x4e\x44\xae\x42\x60\x82\
+\x00\x00\x00\xed\
+\x3c\
+\x73\x76\x67\x20\x78\x6d\x6c\x6e\x73\x3d\x22\x68\x74\x74\x70\x3a\
+\x2f\x2f\x77\x77\x77\x2e\x77\x33\x2e\x6f\x72\x67\x2f\x32\x30\x30\
+\x30\x2f\x73\x76\x67\x22\x20\x77\x69\x64\x74\x68\x3d\x22\x31\x34\
+\x22\x20\x68\x65\x69\x67\x68\x74\x3d\x22\x31\x34\x22\x20\x76\x69\
+\x65\x77\x42\x6f\x78\x3d\x22\x30\x20\x30\x20\x32\x34\x20\x32\x34\
+\x22\x20\x66\x69\x6c\x6c\x3d\x22\x6e\x6f\x6e\x65\x22\x20\x73\x74\
+\x72\x6f\x6b\x65\x3d\x22\x63\x75\x72\x72\x65\x6e\x74\x43\x6f\x6c\
+\x6f\x72\x22\x20\x73\x74\x72\x6f\x6b\x65\x2d\x77\x69\x64\x74\x68\
+\x3d\x22\x32\x22\x20\x73\x74\x72\x6f\x6b\x65\x2d\x6c\x69\x6e\x65\
+\x63\x61\x70\x3d\x22\x72\x6f\x75\x6e\x64\x22\x20\x73\x74\x72\x6f\
+\x6b\x65\x2d\x6c\x69\x6e\x65\x6a\x6f\x69\x6e\x3d\x22\x72\x6f\x75\
+\x6e\x64\x22\x3e\x0a\x20\x20\x3c\x70\x6f\x6c\x79\x6c\x69\x6e\x65\
+\x20\x70\x6f\x69\x6e\x74\x73\x3d\x22\x32\x30\x20\x36\x20\x39\x20\
+\x31\x37\x20\x34\x20\x31\x32\x22\x3e\x3c\x2f\x70\x6f\x6c\x79\x6c\
+\x69\x6e\x65\x3e\x0a\x3c\x2f\x73\x76\x67\x3e\x0a\
+"
 
-import os
-from PyQt5.QtCore import QDir
+qt_resource_name = b"\
+\x00\x05\
+\x00\x6f\xa6\x53\
+\x00\x69\
+\x00\x63\x00\x6f\x00\x6e\x00\x73\
+\x00\x0a\
+\x0a\x68\x0e\x67\
+\x00\x63\
+\x00\x75\x00\x72\x00\x73\x00\x6f\x00\x72\x00\x2e\x00\x70\x00\x6e\x00\x67\
+\x00\x09\
+\x0b\x9e\x89\x07\
+\x00\x63\
+\x00\x68\x00\x65\x00\x63\x00\x6b\x00\x2e\x00\x73\x00\x76\x00\x67\
+"
 
-# Create a directory for icons if it doesn't exist
-icons_dir = os.path.join(os.path.dirname(__file__), "icons")
-os.makedirs(icons_dir, exist_ok=True)
+qt_resource_struct_v1 = b"\
+\x00\x00\x00\x00\x00\x02\x00\x00\x00\x01\x00\x00\x00\x01\
+\x00\x00\x00\x00\x00\x02\x00\x00\x00\x02\x00\x00\x00\x02\
+\x00\x00\x00\x10\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\
+\x00\x00\x00\x2a\x00\x00\x00\x00\x00\x01\x00\x00\x00\xe1\
+"
 
-# Create a simple cursor icon
-with open(os.path.join(icons_dir, "cursor.png"), "wb") as f:
-    # This is a simple base64-encoded PNG image of a cursor
-    cursor_icon_data = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x10\x00\x00\x00\x10\x08\x06\x00\x00\x00\x1f\xf3\xffa\x00\x00\x00\x01sRGB\x00\xae\xce\x1c\xe9\x00\x00\x00\x04gAMA\x00\x00\xb1\x8f\x0b\xfca\x05\x00\x00\x00\tpHYs\x00\x00\x0e\xc3\x00\x00\x0e\xc3\x01\xc7o\xa8d\x00\x00\x00uIDAT8OcDP\xb3\xfe\x9f\x01\x0b`DW\xc0\xc8\xc0\xc0\xf0\x9f\x01\x07\xa0\xa2\x00\x97Z\\\x8a\xd0\x15\xe0P\x88\xaa\x00W\xc0\xa3*\xc0\x1d\xc1\xc8\n\x08\xf8\x0e\xd5\x12\x06\x06\xc2\xc1\x8e*@\xf5$\x81\n\xc8I\'(\x89\x14e\x90\x98T/\x81\x9c\xa4J\x9er\xbciA\x8e\x02\xf4T\x8e-\x15\x13\xd3\x00N+\xc8\x01\x14\xa5\x02|\x86\x10S\r\xce4@\xb1\x02\x00\xe8\\\x17\xba\xf1\xb5?\xd7\x00\x00\x00\x00IEND\xaeB`\x82'
-    f.write(cursor_icon_data)
+qt_resource_struct_v2 = b"\
+\x00\x00\x00\x00\x00\x02\x00\x00\x00\x01\x00\x00\x00\x01\
+\x00\x00\x00\x00\x00\x00\x00\x00\
+\x00\x00\x00\x00\x00\x02\x00\x00\x00\x02\x00\x00\x00\x02\
+\x00\x00\x00\x00\x00\x00\x00\x00\
+\x00\x00\x00\x10\x00\x00\x00\x00\x00\x01\x00\x00\x00\x00\
+\x00\x00\x01\xa1\x4f\x51\xf1\x2a\
+\x00\x00\x00\x2a\x00\x00\x00\x00\x00\x01\x00\x00\x00\xe1\
+\x00\x00\x01\xa1\x4f\x51\xce\x70\
+"
 
-# Create a check icon for the checkbox
-with open(os.path.join(icons_dir, "check.svg"), "w") as f:
-    f.write("""<svg xmlns="http://www.w3.org/2000/svg" width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">
-  <polyline points="20 6 9 17 4 12"></polyline>
-</svg>""")
+qt_version = [int(v) for v in QtCore.qVersion().split('.')]
+if qt_version < [5, 8, 0]:
+    rcc_version = 1
+    qt_resource_struct = qt_resource_struct_v1
+else:
+    rcc_version = 2
+    qt_resource_struct = qt_resource_struct_v2
 
-print("Created resources in:", icons_dir)
+def qInitResources():
+    QtCore.qRegisterResourceData(rcc_version, qt_resource_struct, qt_resource_name, qt_resource_data)
+
+def qCleanupResources():
+    QtCore.qUnregisterResourceData(rcc_version, qt_resource_struct, qt_resource_name, qt_resource_data)
+
+qInitResources()
@@ -0,0 +1,211 @@
+import glob
+import mmap
+import os
+import struct
+import threading
+import time
+
+from services.journal import journal
+
+# Compact binary recording of user activity for tuning idle thresholds.
+#
+# Every activity report (and every synthetic move, start and stop, so the
+# gaps in a recording can be told apart) becomes one fixed-width record in
+# a preallocated, memory-mapped segment file. Recording is a struct
+# pack_into the mapping plus a header update; the kernel writes the pages
+# back in the background. A full segment is renamed to PATH.1 (older
+# segments shift up to PATH.KEEP, the oldest is deleted) and a fresh one
+# is started, so disk use is bounded by (KEEP + 1) segments.
+#
+# File layout, little endian:
+#
+#   header (64 bytes)   magic, record size, capacity, records written,
+#                       CLOCK_MONOTONIC and wall-clock ns at creation
+#   records             time_ns i64, x i32, y i32, source u8, kind u8, 6 pad
+#
+# read_trace() maps a segment and returns its records as a NumPy
+# structured array that views the mapping without copying.
+
+MAGIC = b"CVTRACE1"
+HEADER = struct.Struct("<8sIIQqq24x")
+RECORD = struct.Struct("<qiiBB6x")
+COUNT_OFFSET = 16  # Offset of the records-written field in HEADER
+
+# Records per segment: 262144 * 24 bytes is a 6 MB file, about a day of
+# activity reports plus one move per second
+SEGMENT_RECORDS = 262144
+
+# Rotated segments kept besides the active one
+KEEP_SEGMENTS = 2
+
+KIND_ACTIVITY = 0
+KIND_MOVE = 1
+KIND_START = 2
+KIND_STOP = 3
+KIND_NAMES = ("activity", "move", "start", "stop")
+
+# A segment is only continued within the same boot: its monotonic
+# timestamps would be meaningless after a reboot
+BOOT_TOLERANCE_NS = 2 * 10 ** 9
+
+# Activity sources by record code; the engine itself records moves
+SOURCE_NAMES = ("unknown", "xinput2", "evdev", "idle-counter", "poll", "engine")
+SOURCE_CODES = {name: code for code, name in enumerate(SOURCE_NAMES)}
+SOURCE_ENGINE = SOURCE_CODES["engine"]
+
+# x and y of records that carry no pointer position
+NO_POSITION = -2 ** 31
+
+class ActivityRecorder:
+    """Appends activity records to a rotating memory-mapped segment file
+    
+    record() may be called from any thread.
+    """
+    
+    def __init__(self, path, capacity=SEGMENT_RECORDS, keep=KEEP_SEGMENTS):
+        self.path = path
+        self.capacity = capacity
+        self.keep = keep
+        self.map = None
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def open(self):
+        """Open the segment at path, continuing it if it has room; raises OSError"""
+        with self._lock:
+            if self.map is None:
+                self._open_segment()
+    
+    def close(self):
+        with self._lock:
+            self._close_segment()
+    
+    def record(self, kind, timestamp, x=NO_POSITION, y=NO_POSITION, source=0):
+        """Append one record; timestamp is time.monotonic() seconds"""
+        with self._lock:
+            if self.map is None:
+                return
+            if self.count >= self.capacity:
+                try:
+                    self._rotate()
+                except OSError as e:
+                    self._close_segment()
+                    journal.error(f"Activity recording stopped: {e}")
+                    return
+            RECORD.pack_into(self.map, HEADER.size + self.count * RECORD.size,
+                             int(timestamp * 1e9), x, y, source, kind)
+            self.count += 1
+            struct.pack_into("<Q", self.map, COUNT_OFFSET, self.count)
+    
+    def _open_segment(self):
+        size = HEADER.size + self.capacity * RECORD.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            existing = os.fstat(fd).st_size
+            header = os.pread(fd, HEADER.size, 0) if existing >= HEADER.size else b""
+            count = None
+            if existing == size:
+                magic, record_size, capacity, count, start_ns, wall_ns = HEADER.unpack(header)
+                boot_ns = time.time_ns() - time.monotonic_ns()
+                if (magic != MAGIC or record_size != RECORD.size or capacity != self.capacity
+                        or abs(wall_ns - start_ns - boot_ns) > BOOT_TOLERANCE_NS):
+                    count = None
+            if count is None or count >= self.capacity:
+                if existing:
+                    os.close(fd)
+                    fd = None
+                    self._shift_segments()
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                self._preallocate(fd, size)
+                count = 0
+                os.pwrite(fd, HEADER.pack(MAGIC, RECORD.size, self.capacity, 0,
+                                          time.monotonic_ns(), time.time_ns()), 0)
+            self.map = mmap.mmap(fd, size)
+        finally:
+            if fd is not None:
+                os.close(fd)  # The mapping keeps its own reference
+        self.count = count
+    
+    def _preallocate(self, fd, size):
+        # Reserve the blocks now so a full disk fails here, not as SIGBUS later
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+    
+    def _close_segment(self):
+        if self.map is not None:
+            self.map.flush()
+            self.map.close()
+            self.map = None
+    
+    def _shift_segments(self):
+        """Rename PATH to PATH.1, PATH.1 to PATH.2 and so on, dropping the oldest"""
+        if self.keep == 0:
+            os.unlink(self.path)
+        for index in range(self.keep, 0, -1):
+            source = self.path if index == 1 else f"{self.path}.{index - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index}")
+    
+    def _rotate(self):
+        self._close_segment()
+        self._shift_segments()
+        self._open_segment()
+
+def trace_dtype():
+    """Return the NumPy dtype of one record"""
+    import numpy as np
+    return np.dtype({
+        "names": ["time_ns", "x", "y", "source", "kind"],
+        "formats": ["<i8", "<i4", "<i4", "u1", "u1"],
+        "offsets": [0, 8, 12, 16, 17],
+        "itemsize": RECORD.size,
+    })
+
+class TraceSegment:
+    """One recorded segment mapped read-only
+    
+    records is a structured array viewing the mapping; keep the segment
+    open while using it.
+    """
+    
+    def __init__(self, path):
+        import numpy as np
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, capacity, count, start_ns, wall_ns = HEADER.unpack_from(self.map)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.map.close()
+            raise ValueError(f"{path} is not an activity trace")
+        self.path = path
+        self.capacity = capacity
+        self.start_ns = start_ns  # CLOCK_MONOTONIC ns when the segment was created
+        self.wall_ns = wall_ns    # Wall-clock ns at the same moment
+        self.records = np.frombuffer(self.map, dtype=trace_dtype(),
+                                     count=min(count, capacity), offset=HEADER.size)
+    
+    def wall_times(self):
+        """Return the record times as wall-clock seconds since the epoch"""
+        return (self.records["time_ns"] - self.start_ns + self.wall_ns) / 1e9
+    
+    def close(self):
+        self.records = None
+        self.map.close()
+
+def read_trace(path):
+    """Open every segment of the recording at path, oldest first"""
+    rotated = glob.glob(glob.escape(path) + ".*")
+    rotated = sorted((name for name in rotated if name.rsplit(".", 1)[1].isdigit()),
+                     key=lambda name: int(name.rsplit(".", 1)[1]), reverse=True)
+    return [TraceSegment(name) for name in rotated + [path] if os.path.exists(name)]
+
+def open_recorder(path):
+    """Return an opened ActivityRecorder for path, or None if it cannot be opened"""
+    recorder = ActivityRecorder(path)
+    try:
+        recorder.open()
+    except OSError as e:
+        journal.error(f"Error opening activity trace {path}: {e}")
+        return None
+    return recorder
@@ -0,0 +1,386 @@
+import ctypes
+import glob
+import os
+import selectors
+import struct
+import threading
+import time
+
+from services import x11
+from services.journal import journal
+from services.power_policy import set_timer_slack
+
+# Push-based user activity backends for CursorService.
+#
+# Each source runs on its own thread, blocks in the kernel until input
+# arrives and reports it through ``service.record_activity(timestamp)``
+# with a ``time.monotonic()`` timestamp. After reporting, a source stops
+# reading for ``holdoff`` seconds and lets the kernel or X server buffer
+# further events, so continuous typing costs one wakeup per holdoff
+# instead of one per keystroke.
+
+# XInput2 event types (XI2.h)
+XI_RAW_KEY_PRESS = 13
+XI_RAW_BUTTON_PRESS = 15
+XI_RAW_MOTION = 17
+XI_ALL_MASTER_DEVICES = 1
+XI_LAST_EVENT = 26
+GENERIC_EVENT = 35
+
+# evdev constants (linux/input-event-codes.h, linux/input.h)
+EV_KEY = 0x01
+EV_REL = 0x02
+EV_ABS = 0x03
+EVIOCSCLOCKID = 0x400445A0
+INPUT_EVENT = struct.Struct("llHHi")
+
+class ActivitySource:
+    """Base class for activity backends that report input to a CursorService"""
+    
+    name = "base"
+    
+    def __init__(self, service, holdoff=0.5):
+        self.service = service
+        self.holdoff = holdoff
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._wake_r, self._wake_w = None, None
+    
+    @classmethod
+    def available(cls):
+        """Return True if this backend can run on the current machine"""
+        return False
+    
+    def start(self):
+        """Start watching for activity on a background thread"""
+        if self.thread is not None:
+            return
+        self._stop_event.clear()
+        self._wake_r, self._wake_w = os.pipe()
+        self.thread = threading.Thread(target=self._run, name=f"activity-{self.name}")
+        self.thread.daemon = True
+        self.thread.start()
+    
+    def stop(self):
+        """Stop the background thread and release its resources"""
+        if self.thread is None:
+            return
+        self._stop_event.set()
+        os.write(self._wake_w, b"\0")
+        self.thread.join(timeout=1)
+        self.thread = None
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+    
+    def _run(self):
+        raise NotImplementedError
+
+class SelectorActivitySource(ActivitySource):
+    """Activity source that blocks on file descriptors until input arrives"""
+    
+    def open(self):
+        """Open the watched file objects and return them as a list"""
+        raise NotImplementedError
+    
+    def drain(self, fileobj):
+        """Consume buffered input and return the newest activity time or None"""
+        raise NotImplementedError
+    
+    def close(self):
+        """Release whatever open() acquired"""
+    
+    def _run(self):
+        try:
+            fileobjs = self.open()
+        except (OSError, x11.X11Error) as e:
+            journal.error(f"Activity source {self.name} failed: {e}")
+            return
+        
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        for fileobj in fileobjs:
+            selector.register(fileobj, selectors.EVENT_READ)
+        
+        try:
+            while not self._stop_event.is_set():
+                latest = None
+                for key, _ in selector.select():
+                    if key.fileobj == self._wake_r:
+                        return
+                    timestamp = self.drain(key.fileobj)
+                    if timestamp is not None and (latest is None or timestamp > latest):
+                        latest = timestamp
+                if latest is not None:
+                    self.service.record_activity(latest)
+                    if self.holdoff:
+                        self._stop_event.wait(self.holdoff)
+        finally:
+            selector.close()
+            self.close()
+
+class XInput2ActivitySource(SelectorActivitySource):
+    """Subscribes to XInput2 raw motion, button and key events on the root window"""
+    
+    name = "xinput2"
+    
+    @classmethod
+    def available(cls):
+        # Under XWayland only input to X clients would be seen
+        if not os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"):
+            return False
+        try:
+            x11.load_library("X11")
+            x11.load_library("Xi")
+        except x11.X11Error:
+            return False
+        return True
+    
+    def open(self):
+        self.display = x11.Display()
+        self.opcode = self.display.query_extension("XInputExtension")
+        if self.opcode is None:
+            self.display.close()
+            raise x11.X11Error("XInputExtension not available")
+        
+        xi = x11.load_library("Xi")
+        major, minor = ctypes.c_int(2), ctypes.c_int(2)
+        xi.XIQueryVersion(ctypes.c_void_p(self.display.handle),
+                          ctypes.byref(major), ctypes.byref(minor))
+        
+        mask_len = (XI_LAST_EVENT >> 3) + 1
+        mask = (ctypes.c_ubyte * mask_len)()
+        for event_type in (XI_RAW_KEY_PRESS, XI_RAW_BUTTON_PRESS, XI_RAW_MOTION):
+            mask[event_type >> 3] |= 1 << (event_type & 7)
+        event_mask = x11.XIEventMask(
+            XI_ALL_MASTER_DEVICES, mask_len,
+            ctypes.cast(mask, ctypes.POINTER(ctypes.c_ubyte))
+        )
+        xi.XISelectEvents.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(x11.XIEventMask), ctypes.c_int
+        ]
+        xi.XISelectEvents(self.display.handle, self.display.root, ctypes.byref(event_mask), 1)
+        self.display.flush()
+        
+        # Events from the XTEST devices are our own synthetic moves
+        self.ignored_devices = {
+            device_id for device_id, name in self.display.input_devices().items()
+            if "XTEST" in name or self.service.synthetic_device_name in name
+        }
+        self.event = x11.XEvent()
+        return [self.display.fileno()]
+    
+    def drain(self, fileobj):
+        timestamp = None
+        while self.display.pending():
+            self.display.next_event(self.event)
+            if (self.event.type != GENERIC_EVENT
+                    or self.event.xcookie.extension != self.opcode
+                    or not self.display.get_event_data(self.event)):
+                continue
+            raw = ctypes.cast(self.event.xcookie.data, ctypes.POINTER(x11.XIRawEvent)).contents
+            if raw.sourceid not in self.ignored_devices:
+                timestamp = time.monotonic()
+            self.display.free_event_data(self.event)
+        return timestamp
+    
+    def close(self):
+        if getattr(self, "display", None) is not None:
+            self.display.close()
+            self.display = None
+
+class EvdevActivitySource(SelectorActivitySource):
+    """Reads keyboard and pointer events directly from /dev/input with epoll"""
+    
+    name = "evdev"
+    device_glob = "/dev/input/event*"
+    
+    @classmethod
+    def available(cls):
+        return any(os.access(path, os.R_OK) for path in glob.glob(cls.device_glob))
+    
+    def open(self):
+        import fcntl
+        
+        self.fds = []
+        self.monotonic_fds = set()
+        for path in sorted(glob.glob(self.device_glob)):
+            if not self._is_input_device(path):
+                continue
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                continue
+            try:
+                # Report event timestamps on the same clock as time.monotonic()
+                fcntl.ioctl(fd, EVIOCSCLOCKID, struct.pack("i", time.CLOCK_MONOTONIC))
+                self.monotonic_fds.add(fd)
+            except OSError:
+                pass
+            self.fds.append(fd)
+        if not self.fds:
+            raise OSError("No readable input devices")
+        return self.fds
+    
+    def _is_input_device(self, path):
+        """Return True for real devices that report keys, relative or absolute axes"""
+        device_dir = f"/sys/class/input/{os.path.basename(path)}/device"
+        try:
+            with open(f"{device_dir}/name") as f:
+                if self.service.synthetic_device_name in f.read():
+                    return False
+        except OSError:
+            pass
+        caps_path = f"{device_dir}/capabilities/ev"
+        try:
+            with open(caps_path) as f:
+                caps = int(f.read().strip(), 16)
+        except (OSError, ValueError):
+            return True
+        return bool(caps & ((1 << EV_KEY) | (1 << EV_REL) | (1 << EV_ABS)))
+    
+    def drain(self, fd):
+        timestamp = None
+        while True:
+            try:
+                data = os.read(fd, INPUT_EVENT.size * 64)
+            except BlockingIOError:
+                break
+            except OSError:
+                return timestamp
+            if not data:
+                break
+            for sec, usec, event_type, _, _ in INPUT_EVENT.iter_unpack(data):
+                if event_type in (EV_KEY, EV_REL, EV_ABS):
+                    if fd in self.monotonic_fds:
+                        timestamp = sec + usec / 1_000_000
+                    else:
+                        timestamp = time.monotonic()
+        return timestamp
+    
+    def close(self):
+        for fd in getattr(self, "fds", []):
+            os.close(fd)
+        self.fds = []
+
+class IdleCounterActivitySource(ActivitySource):
+    """Derives activity from the server-side idle counter (XScreenSaver or logind)
+    
+    Rather than polling at a fixed rate, the counter is read once and the
+    next query is scheduled for the moment the user could first cross the
+    idle threshold.
+    """
+    
+    name = "idle-counter"
+    min_interval = 0.5
+    
+    @classmethod
+    def available(cls):
+        if os.environ.get("DISPLAY"):
+            try:
+                x11.load_library("Xss")
+                return True
+            except x11.X11Error:
+                pass
+        return _logind_idle_since() is not None
+    
+    def _run(self):
+        display = None
+        try:
+            display = x11.Display()
+            x11.query_idle_ms(display)
+        except x11.X11Error:
+            if display is not None:
+                display.close()
+            display = None
+        
+        try:
+            while not self._stop_event.is_set():
+                idle = self._query_idle(display)
+                if idle is None:
+                    return
+                now = time.monotonic()
+                activity_time = now - idle
+                # A counter reset caused by our own synthetic move is not activity
+                if activity_time > self.service.last_synthetic_time + 0.05:
+                    if activity_time > self.service.last_activity_time:
+                        self.service.record_activity(activity_time)
+                remaining = self.service.idle_threshold - idle
+                self._stop_event.wait(max(remaining, self.min_interval))
+        finally:
+            if display is not None:
+                display.close()
+    
+    def _query_idle(self, display):
+        """Return seconds since the last input event, or None if unknown"""
+        if display is not None:
+            return x11.query_idle_ms(display) / 1000
+        idle_since = _logind_idle_since()
+        if idle_since is None:
+            return None
+        return max(0.0, time.monotonic() - idle_since)
+
+class PollingActivitySource(ActivitySource):
+    """Fallback that compares pointer positions at a fixed interval"""
+    
+    name = "poll"
+    
+    @classmethod
+    def available(cls):
+        return True
+    
+    def _run(self):
+        # The check shares the input backend with moves, so run it on the loop.
+        # The interval and timer slack follow the service's power policy.
+        timer_slack = None
+        while True:
+            slack = self.service.power_policy.timer_slack()
+            if slack != timer_slack:
+                set_timer_slack(slack)
+                timer_slack = slack
+            if self._stop_event.wait(self.service.poll_interval):
+                break
+            self.service.call_in_loop(self.service.check_mouse_activity)
+
+def _logind_idle_since():
+    """Return logind's IdleSinceHintMonotonic for this session in seconds"""
+    try:
+        from jeepney import DBusAddress, Properties
+        from jeepney.io.blocking import open_dbus_connection
+    except ImportError:
+        return None
+    
+    session = DBusAddress(
+        "/org/freedesktop/login1/session/auto",
+        bus_name="org.freedesktop.login1",
+        interface="org.freedesktop.login1.Session",
+    )
+    try:
+        with open_dbus_connection(bus="SYSTEM") as connection:
+            reply = connection.send_and_get_reply(
+                Properties(session).get("IdleSinceHintMonotonic")
+            )
+    except Exception:
+        return None
+    signature, value = reply.body[0]
+    if not value:
+        return None
+    return value / 1_000_000
+
+ACTIVITY_SOURCES = {
+    source.name: source
+    for source in (
+        XInput2ActivitySource,
+        EvdevActivitySource,
+        IdleCounterActivitySource,
+        PollingActivitySource,
+    )
+}
+
+def create_activity_source(service, backend="auto"):
+    """Create the requested activity source, or the best available one"""
+    if backend != "auto":
+        return ACTIVITY_SOURCES[backend](service)
+    for source in ACTIVITY_SOURCES.values():
+        if source.available():
+            return source(service)
+    return PollingActivitySource(service)
@@ -0,0 +1,452 @@
+import concurrent.futures
+import errno
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+
+from services import x11
+from services.cursor_service import MODES, PATTERN_NAMES
+from services.journal import journal
+
+# Local control plane for a running CursorVibe instance.
+#
+# The running instance owns a Unix-domain socket. Clients write one JSON
+# request per line and read one JSON response line back; a connection can
+# carry any number of requests. A request is either a single command object
+# or a list of them, answered by a single result or a list of results in
+# the same order:
+#
+#   {"cmd": "status"}
+#   [{"cmd": "stop"}, {"cmd": "set", "frequency": 0.5}, {"cmd": "status"}]
+#
+# Commands: start, stop, toggle, status, set (frequency, distance,
+# idle_threshold, mode, pattern, wakeup_budget, sparse_margin, active_hours), trace
+# (action=on|off|dump|status, sample, path), events (recent journal
+# entries, limit), metrics (Prometheus text), displays, add_display,
+# update_display and remove_display (name, per-display settings; headless
+# only), workers (worker process health; headless --workers only), args
+# (argv forwarded by a second launch), ping.
+
+CONTROL_AVAILABLE = hasattr(socket, "AF_UNIX")
+
+# Connection errors that mean nobody is serving the socket; anything else,
+# such as a timeout, may be a running instance that is busy
+STALE_ERRORS = (errno.ECONNREFUSED, errno.ENOENT)
+
+# Accepted (type, minimum, maximum) of the numeric settings; the frequency
+# range is the one the settings window's slider offers
+SETTING_RANGES = {
+    "frequency": (float, 0.1, 3.0),
+    "distance": (int, 1, None),
+    "idle_threshold": (int, 1, None),
+    "sparse_margin": (int, 0, None),
+    "wakeup_budget": (int, 1, None),
+}
+
+class ControlError(Exception):
+    """Raised for invalid control requests or when no instance is running"""
+
+def default_socket_path():
+    """Return the per-user control socket path"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "cursorvibe.sock")
+    return os.path.join(tempfile.gettempdir(), f"cursorvibe-{os.getuid()}.sock")
+
+def parse_setting(name, value):
+    """Convert a numeric setting and check its range; raises ControlError"""
+    kind, minimum, maximum = SETTING_RANGES[name]
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise ControlError(f"invalid {name} {value!r}")
+    if number < minimum or (maximum is not None and number > maximum):
+        limits = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        raise ControlError(f"{name} must be {limits}, not {value!r}")
+    return number
+
+class ControlHandler:
+    """Executes control commands against the services of the running instance
+    
+    Commands run on the engine's event loop thread. on_change is called
+    there after any command that changed state, and on_args receives the
+    argv forwarded by a second launch. The display commands need a
+    DisplayManager (headless mode only).
+    """
+    
+    def __init__(self, cursor_service, settings_service, on_change=None, on_args=None,
+                 display_manager=None, schedule_timer=None):
+        self.cursor_service = cursor_service
+        self.settings_service = settings_service
+        self.display_manager = display_manager
+        self.schedule_timer = schedule_timer
+        self.on_change = on_change
+        self.on_args = on_args
+    
+    def execute(self, command):
+        """Run one command dict and return its JSON-serialisable result"""
+        if not isinstance(command, dict) or "cmd" not in command:
+            raise ControlError("command must be an object with a 'cmd' field")
+        method = getattr(self, f"cmd_{command['cmd']}", None)
+        if method is None:
+            raise ControlError(f"unknown command {command['cmd']!r}")
+        arguments = {key: value for key, value in command.items() if key != "cmd"}
+        try:
+            return method(**arguments)
+        except TypeError as e:
+            raise ControlError(str(e))
+    
+    def changed(self):
+        if self.on_change is not None:
+            self.on_change()
+    
+    def cmd_ping(self):
+        return "pong"
+    
+    def cmd_start(self):
+        started = self.cursor_service.start_simulation()
+        self.changed()
+        return {**self.cmd_status(), "changed": started}
+    
+    def cmd_stop(self):
+        stopped = self.cursor_service.stop_simulation()
+        self.changed()
+        return {**self.cmd_status(), "changed": stopped}
+    
+    def cmd_toggle(self):
+        if self.cursor_service.is_active:
+            return self.cmd_stop()
+        return self.cmd_start()
+    
+    def cmd_status(self):
+        service = self.cursor_service
+        return {
+            "active": service.is_active,
+            "mode": service.mode,
+            "active_mode": service.active_mode,
+            "idle": service.is_user_idle(),
+            "frequency": service.movement_frequency,
+            "distance": service.movement_distance,
+            "idle_threshold": service.idle_threshold,
+            "pattern": service.pattern,
+            "move_interval": service.move_interval,
+            "poll_interval": service.poll_interval,
+            "power": service.power_policy.power_state,
+            "wakeup_budget": service.power_policy.budget(),
+            "sparse_margin": service.sparse_margin,
+            "lock_timeouts": service.lock_timeouts,
+            "feedback": service.tuner.status() if service.tuner is not None else None,
+            "schedule": self.schedule_timer.status() if self.schedule_timer is not None else None,
+        }
+    
+    def cmd_set(self, frequency=None, distance=None, idle_threshold=None, mode=None,
+                wakeup_budget=None, pattern=None, sparse_margin=None, active_hours=None):
+        # Validate everything first so a bad argument changes nothing
+        if mode is not None and mode not in MODES:
+            raise ControlError(f"unknown mode {mode!r}; choose from {', '.join(MODES)}")
+        if pattern is not None and pattern not in PATTERN_NAMES:
+            raise ControlError(f"unknown pattern {pattern!r}; choose from {', '.join(PATTERN_NAMES)}")
+        if frequency is not None:
+            frequency = parse_setting("frequency", frequency)
+        if distance is not None:
+            distance = parse_setting("distance", distance)
+        if idle_threshold is not None:
+            idle_threshold = parse_setting("idle_threshold", idle_threshold)
+        if sparse_margin is not None:
+            sparse_margin = parse_setting("sparse_margin", sparse_margin)
+        if wakeup_budget is not None:
+            wakeup_budget = parse_setting("wakeup_budget", wakeup_budget)
+        schedule = None
+        if active_hours is not None:
+            if self.schedule_timer is None:
+                raise ControlError("active hours are not available in this mode")
+            from services.schedule import load_schedule
+            settings = self.settings_service
+            try:
+                schedule = load_schedule(active_hours, settings.holidays_file,
+                                         settings.schedule_timezone)
+            except ValueError as e:
+                raise ControlError(f"invalid active_hours: {e}")
+        
+        if active_hours is not None:
+            self.settings_service.save_active_hours(active_hours)
+            self.schedule_timer.set_schedule(schedule)
+        if frequency is not None:
+            self.settings_service.save_frequency(frequency)
+        if distance is not None:
+            self.settings_service.save_distance(distance)
+        if idle_threshold is not None:
+            self.settings_service.save_idle_threshold(idle_threshold)
+        if pattern is not None:
+            self.settings_service.save_pattern(pattern)
+        if sparse_margin is not None:
+            self.settings_service.save_sparse_margin(sparse_margin)
+        self.cursor_service.update_settings(
+            frequency=frequency, distance=distance, idle_threshold=idle_threshold,
+            pattern=pattern, sparse_margin=sparse_margin
+        )
+        if wakeup_budget is not None:
+            self.settings_service.save_wakeup_budget(wakeup_budget)
+            self.cursor_service.power_policy.battery_budget = wakeup_budget
+            self.cursor_service.apply_power_policy()
+        if mode is not None:
+            self.settings_service.save_keep_awake_mode(mode)
+            self.cursor_service.set_mode(mode)
+        self.changed()
+        return self.cmd_status()
+    
+    def _displays(self):
+        if self.display_manager is None:
+            raise ControlError("display targets are only available in headless mode")
+        return self.display_manager
+    
+    def cmd_displays(self):
+        return self._displays().status()
+    
+    def cmd_workers(self):
+        displays = self._displays()
+        if not hasattr(displays, "worker_status"):
+            raise ControlError("not running with --workers")
+        return displays.worker_status()
+    
+    def cmd_add_display(self, name, frequency=None, distance=None, idle_threshold=None,
+                        pattern=None):
+        settings = self.settings_service
+        try:
+            target = self._displays().add_target(
+                name,
+                frequency=(settings.movement_frequency if frequency is None
+                           else parse_setting("frequency", frequency)),
+                distance=(settings.movement_distance if distance is None
+                          else parse_setting("distance", distance)),
+                idle_threshold=(settings.idle_threshold if idle_threshold is None
+                                else parse_setting("idle_threshold", idle_threshold)),
+                pattern=pattern or settings.pattern
+            )
+        except (x11.X11Error, ValueError) as e:
+            raise ControlError(str(e))
+        return target.status()
+    
+    def cmd_update_display(self, name, frequency=None, distance=None, idle_threshold=None,
+                           pattern=None):
+        try:
+            self._displays().update_target(
+                name,
+                frequency=None if frequency is None else parse_setting("frequency", frequency),
+                distance=None if distance is None else parse_setting("distance", distance),
+                idle_threshold=(None if idle_threshold is None
+                                else parse_setting("idle_threshold", idle_threshold)),
+                pattern=pattern
+            )
+        except KeyError:
+            raise ControlError(f"display {name} is not a target")
+        return self.display_manager.targets[name].status()
+    
+    def cmd_remove_display(self, name):
+        try:
+            self._displays().remove_target(name)
+        except KeyError:
+            raise ControlError(f"display {name} is not a target")
+        return "ok"
+    
+    def cmd_trace(self, action="status", sample=None, path=None):
+        tracer = self.cursor_service.tracer
+        if action == "on":
+            tracer.enable(None if sample is None else int(sample))
+        elif action == "off":
+            tracer.disable()
+        elif action == "dump":
+            return {"path": tracer.dump(path)}
+        elif action != "status":
+            raise ControlError(f"unknown trace action {action!r}")
+        self.changed()
+        return {"enabled": tracer.enabled, "sample_every": tracer.sample_every,
+                "spans": len(tracer.spans)}
+    
+    def cmd_events(self, limit=100):
+        return journal.recent(int(limit)) + "\n"
+    
+    def cmd_metrics(self):
+        return self.cursor_service.metrics.render()
+    
+    def cmd_args(self, argv=()):
+        if self.on_args is None:
+            raise ControlError("the running instance does not take arguments; use cursorvibe-ctl")
+        self.on_args(list(argv))
+        return "ok"
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.control.handle_line(line)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class ControlServer:
+    """Serves the control socket for a ControlHandler on a background thread
+    
+    The server holds an exclusive flock on a lock file next to the socket
+    for as long as it runs; that lock, not the socket, is what keeps a
+    second instance out. ping is answered on the server thread, so a busy
+    event loop never makes a running instance look absent.
+    """
+    
+    def __init__(self, handler, loop, path=None, timeout=5.0):
+        self.handler = handler
+        self.loop = loop
+        self.path = path or default_socket_path()
+        self.lock_path = self.path + ".lock"
+        self.timeout = timeout
+        self.server = None
+        self.thread = None
+        self.lock_fd = None
+    
+    def start(self):
+        """Bind the socket and start serving; raises OSError if it is in use"""
+        import fcntl
+        
+        old_umask = os.umask(0o077)
+        try:
+            lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(lock_fd)
+                raise OSError(f"another instance is serving {self.path}")
+            # With the lock held, an existing socket is left over from a crash
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            try:
+                self.server = _UnixServer(self.path, _RequestHandler)
+            except OSError:
+                os.close(lock_fd)
+                raise
+        finally:
+            os.umask(old_umask)
+        self.lock_fd = lock_fd
+        self.server.control = self
+        self.thread = threading.Thread(target=self.server.serve_forever, name="cursorvibe-control")
+        self.thread.daemon = True
+        self.thread.start()
+    
+    def stop(self):
+        """Stop serving and remove the socket"""
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        # The lock file stays; unlinking it could let two instances lock different files
+        os.close(self.lock_fd)
+        self.lock_fd = None
+    
+    def handle_line(self, line):
+        """Decode one request line, run it on the loop and return the response"""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {"error": f"invalid JSON: {e}"}
+        if request == {"cmd": "ping"}:
+            # Liveness only; must not wait for a busy loop
+            return {"ok": True, "result": "pong"}
+        commands = request if isinstance(request, list) else [request]
+        
+        future = concurrent.futures.Future()
+        
+        def run():
+            results = []
+            for command in commands:
+                try:
+                    results.append({"ok": True, "result": self.handler.execute(command)})
+                except Exception as e:
+                    results.append({"ok": False, "error": str(e)})
+            future.set_result(results)
+        
+        self.loop.call_soon_threadsafe(run)
+        try:
+            results = future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            return {"error": "timed out waiting for the event loop"}
+        return results if isinstance(request, list) else results[0]
+
+class ControlClient:
+    """Client for the control socket of a running instance"""
+    
+    def __init__(self, path=None, timeout=5.0):
+        self.path = path or default_socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(self.path)
+        except OSError as e:
+            self.sock.close()
+            raise ControlError(f"no running instance at {self.path}: {e}") from e
+        self.reader = self.sock.makefile("rb")
+    
+    def request(self, request):
+        """Send a command or list of commands and return the decoded response"""
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+        line = self.reader.readline()
+        if not line:
+            raise ControlError("connection closed by the running instance")
+        return json.loads(line)
+    
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def _stale(error):
+    """True if a ControlClient error means no instance serves the socket"""
+    cause = error.__cause__ if isinstance(error, ControlError) else error
+    return isinstance(cause, OSError) and cause.errno in STALE_ERRORS
+
+def is_running(path=None):
+    """Return True unless the control socket is missing or refuses connections
+    
+    An instance that is slow to answer still counts as running.
+    """
+    try:
+        with ControlClient(path, timeout=1.0) as client:
+            client.request({"cmd": "ping"})
+    except (ControlError, OSError) as e:
+        return not _stale(e)
+    except ValueError:
+        pass
+    return True
+
+def forward_to_running_instance(argv, path=None):
+    """Send argv to an already running instance; return False if there is none
+    
+    Raises ControlError if the running instance rejected the arguments or
+    did not answer in time.
+    """
+    try:
+        with ControlClient(path, timeout=10.0) as client:
+            response = client.request({"cmd": "args", "argv": list(argv)})
+    except (ControlError, OSError, ValueError) as e:
+        if _stale(e):
+            return False
+        raise ControlError(f"the running instance did not answer: {e}")
+    if not response.get("ok"):
+        raise ControlError(response.get("error", "arguments rejected by the running instance"))
+    return True
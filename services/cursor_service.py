@@ -1,32 +1,399 @@
 
-import random
-import threading
+import os
+import struct
 import time
-import pyautogui
+
+from services import x11
+
+from services.activity_recorder import (KIND_ACTIVITY, KIND_MOVE, KIND_START, KIND_STOP,
+                                        NO_POSITION, SOURCE_CODES, SOURCE_ENGINE)
+from services.event_loop import AsyncioEventLoop
+from services.inhibitor import InhibitorError, InhibitorService
+from services.journal import (EVENT_ACTIVITY, EVENT_MOVE, EVENT_SETTINGS, EVENT_START,
+                              EVENT_STOP, journal)
+from services.metrics import Metrics
+from services.power_policy import POWER_BATTERY, PowerPolicy, set_timer_slack
+from services.status_bus import StatusBus
+from services.tracing import Tracer
+
+# Keep-awake modes
+MODE_MOVE = "move"        # synthetic cursor movement while the user is idle
+MODE_INHIBIT = "inhibit"  # D-Bus screensaver/sleep inhibitor, no input events
+MODE_SPARSE = "sparse"    # one move shortly before the earliest OS idle timeout
+MODE_FEEDBACK = "feedback"  # moves checked against the idle counter and tuned
+MODES = (MODE_MOVE, MODE_INHIBIT, MODE_SPARSE, MODE_FEEDBACK)
+
+# Sparse mode moves this many seconds before the earliest idle timeout
+SPARSE_MARGIN = 30
+
+# Sparse mode interval when no idle timeout could be discovered; below the
+# one-minute minimum desktops offer for blanking or locking
+SPARSE_FALLBACK_INTERVAL = 50.0
+
+# Movement patterns from services/patterns.py, listed here so choosing one
+# does not import NumPy
+PATTERN_NAMES = ("jitter", "circle", "lissajous", "recorded")
+
+# Seconds between pointer polls when no event-driven activity source works
+POLL_INTERVAL = 0.5
+
+# Seconds before opening the input backend is tried again after every
+# backend failed (e.g. pyautogui missing, or no display to connect to)
+BACKEND_RETRY_INTERVAL = 60.0
+
+# Shortest spacing of the move grid; a zero or negative interval would spin
+MIN_MOVE_INTERVAL = 0.1
+
+class InputBackend:
+    """Base class for ways of reading and moving the pointer"""
+    
+    name = "base"
+    
+    @classmethod
+    def available(cls):
+        """Return True if this backend can run on the current machine"""
+        return False
+    
+    def open(self):
+        """Acquire any connection or device the backend needs"""
+    
+    def close(self):
+        """Release what open() acquired"""
+    
+    def position(self):
+        """Return the current pointer position as (x, y)"""
+        raise NotImplementedError
+    
+    def move_relative(self, dx, dy):
+        """Move the pointer by (dx, dy) pixels"""
+        raise NotImplementedError
+    
+    def keep_alive(self, dx, dy):
+        """Generate one keep-alive movement and return the net offset applied"""
+        self.move_relative(dx, dy)
+        return dx, dy
+
+class PyAutoGUIBackend(InputBackend):
+    """Portable fallback: absolute moves through pyautogui"""
+    
+    name = "pyautogui"
+    
+    @classmethod
+    def available(cls):
+        return True
+    
+    def open(self):
+        # Imported on first use: pyautogui pulls in its screenshot/PIL stack
+        import pyautogui
+        self.pyautogui = pyautogui
+    
+    def position(self):
+        return self.pyautogui.position()
+    
+    def move_relative(self, dx, dy):
+        # pyautogui has no relative move without a position read, and sleeps
+        # for pyautogui.PAUSE after every call unless told not to
+        x, y = self.pyautogui.position()
+        self.pyautogui.moveTo(x + dx, y + dy, _pause=False)
+
+class XTestBackend(InputBackend):
+    """Native X11 backend: relative XTest motion over one persistent connection
+    
+    Moves need no position read and are flushed without waiting for a reply,
+    so a keep-alive costs a single one-way request to the X server.
+    """
+    
+    name = "xtest"
+    
+    def __init__(self, display_name=None):
+        self.display_name = display_name
+        self.display = None
+    
+    @classmethod
+    def available(cls):
+        # Under XWayland, XTest only reaches X clients, not the compositor
+        if not os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"):
+            return False
+        try:
+            x11.load_library("X11")
+            x11.load_library("Xtst")
+        except x11.X11Error:
+            return False
+        return True
+    
+    def open(self):
+        if self.display is None:
+            self.display = x11.Display(self.display_name)
+    
+    def close(self):
+        if self.display is not None:
+            self.display.close()
+            self.display = None
+    
+    def position(self):
+        return self.display.query_pointer()
+    
+    def move_relative(self, dx, dy):
+        self.display.fake_relative_motion(dx, dy)
+        self.display.flush()
+
+# uinput constants (linux/uinput.h, linux/input-event-codes.h)
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_SET_RELBIT = 0x40045566
+UI_DEV_SETUP = 0x405C5503
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+EV_SYN, EV_KEY, EV_REL = 0x00, 0x01, 0x02
+SYN_REPORT = 0
+REL_X, REL_Y = 0x00, 0x01
+BTN_LEFT = 0x110
+BUS_VIRTUAL = 0x06
+INPUT_EVENT = struct.Struct("llHHi")
+UINPUT_SETUP = struct.Struct("HHHH80sI")
+
+class UInputBackend(InputBackend):
+    """Kernel-level backend: a persistent /dev/uinput relative pointer
+    
+    Works where X-based injection cannot, such as Wayland sessions and bare
+    consoles. Each keep-alive (motion, sync, return motion, sync) is written
+    as a single batch of input_event structs, i.e. one syscall.
+    
+    Passing create_device=False skips the uinput ioctls so the events can be
+    written to a stand-in file and read back for testing.
+    """
+    
+    name = "uinput"
+    path = "/dev/uinput"
+    device_name = "CursorVibe virtual pointer"
+    
+    def __init__(self, path=None, create_device=True):
+        if path is not None:
+            self.path = path
+        self.create_device = create_device
+        self.fd = None
+        self.position_estimate = (0, 0)
+    
+    @classmethod
+    def available(cls):
+        return os.access(cls.path, os.W_OK)
+    
+    def open(self):
+        if self.fd is not None:
+            return
+        flags = os.O_WRONLY | os.O_NONBLOCK
+        if not self.create_device:
+            flags |= os.O_CREAT | os.O_APPEND
+        fd = os.open(self.path, flags)
+        if self.create_device:
+            try:
+                self._create_device(fd)
+            except OSError:
+                os.close(fd)
+                raise
+        self.fd = fd
+    
+    def _create_device(self, fd):
+        import fcntl
+        
+        fcntl.ioctl(fd, UI_SET_EVBIT, EV_KEY)
+        fcntl.ioctl(fd, UI_SET_KEYBIT, BTN_LEFT)  # lets libinput classify it as a pointer
+        fcntl.ioctl(fd, UI_SET_EVBIT, EV_REL)
+        fcntl.ioctl(fd, UI_SET_RELBIT, REL_X)
+        fcntl.ioctl(fd, UI_SET_RELBIT, REL_Y)
+        setup = UINPUT_SETUP.pack(BUS_VIRTUAL, 0x1209, 0x0001, 1,
+                                  self.device_name.encode(), 0)
+        fcntl.ioctl(fd, UI_DEV_SETUP, setup)
+        fcntl.ioctl(fd, UI_DEV_CREATE)
+    
+    def close(self):
+        if self.fd is None:
+            return
+        if self.create_device:
+            import fcntl
+            try:
+                fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+            except OSError as e:
+                journal.error(f"Error destroying uinput device: {e}")
+        os.close(self.fd)
+        self.fd = None
+    
+    def position(self):
+        # A relative device cannot read the pointer; report our own net motion
+        return self.position_estimate
+    
+    def move_relative(self, dx, dy):
+        os.write(self.fd, b"".join((
+            INPUT_EVENT.pack(0, 0, EV_REL, REL_X, dx),
+            INPUT_EVENT.pack(0, 0, EV_REL, REL_Y, dy),
+            INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0),
+        )))
+        self.position_estimate = (self.position_estimate[0] + dx,
+                                  self.position_estimate[1] + dy)
+    
+    def keep_alive(self, dx, dy):
+        # Jitter out and back in one write; the pointer ends where it was
+        os.write(self.fd, b"".join((
+            INPUT_EVENT.pack(0, 0, EV_REL, REL_X, dx),
+            INPUT_EVENT.pack(0, 0, EV_REL, REL_Y, dy),
+            INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0),
+            INPUT_EVENT.pack(0, 0, EV_REL, REL_X, -dx),
+            INPUT_EVENT.pack(0, 0, EV_REL, REL_Y, -dy),
+            INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0),
+        )))
+        return 0, 0
+
+INPUT_BACKENDS = {
+    backend.name: backend
+    for backend in (XTestBackend, UInputBackend, PyAutoGUIBackend)
+}
+
+def create_input_backend(backend="auto"):
+    """Create the requested input backend, or the best available one
+    
+    backend may also be an InputBackend instance, which is used as is.
+    """
+    if isinstance(backend, InputBackend):
+        return backend
+    if backend != "auto":
+        return INPUT_BACKENDS[backend]()
+    for backend_class in INPUT_BACKENDS.values():
+        if backend_class.available():
+            return backend_class()
+    return PyAutoGUIBackend()
+
+def plan_move(now, idle_deadline, last_move_time, interval):
+    """Place moves on the fixed grid shared by every scheduler
+    
+    Once the user is idle, moves fall on a monotonic grid that starts at
+    idle_deadline and is spaced by interval. Returns (slot, next_wakeup):
+    slot is the grid time of the move due now, or None if none is due.
+    """
+    interval = max(interval, MIN_MOVE_INTERVAL)
+    if last_move_time < idle_deadline:
+        next_move = idle_deadline
+    else:
+        next_move = last_move_time + interval
+    if now < next_move:
+        return None, next_move
+    if now - next_move >= interval:
+        # Missed ticks (suspend, long stall): resync instead of bursting
+        next_move = now
+    return next_move, next_move + interval
 
 class CursorService:
-    """Service for simulating cursor movements"""
+    """Service for simulating cursor movements
+    
+    Everything the engine depends on can be injected: the loop (which also
+    provides the waits), the clock (the loop's clock by default), the input
+    backend (a name or an InputBackend instance) and the seed of the
+    pattern RNG. services/simulation.py uses this to run the engine on a
+    virtual clock.
+    """
+    
+    # Input devices whose name contains this are ours and never count as activity
+    synthetic_device_name = "CursorVibe"
     
-    def __init__(self):
+    def __init__(self, activity_backend="auto", mode=MODE_MOVE, inhibitor=None, loop=None,
+                 input_backend="auto", metrics=None, tracer=None, power_policy=None,
+                 clock=None, seed=None, recorder=None):
         self.is_active = False
-        self.stop_thread = False
-        self.thread = None
-        self.last_activity_time = time.time()
-        self.last_mouse_position = pyautogui.position()
+        self.mode = mode
+        self.active_mode = None
+        self.inhibitor = inhibitor or InhibitorService()
+        
+        # All scheduling happens as cancellable timers on one event loop
+        self.loop = loop or AsyncioEventLoop.shared()
+        self.clock = clock or self.loop.time
+        self.timer = None
+        self.timer_deadline = None
+        self.sleep_started = None
+        self.last_move_time = float("-inf")
+        self.last_activity_time = self.clock()
+        self.last_synthetic_time = 0.0
+        self.synthetic_offset = (0, 0)
+        self.last_mouse_position = None
+        
+        # Pointer access; opened on the first position or move call
+        self.input_backend_name = input_backend
+        self.input_backend = None
+        self.input_retry_time = float("-inf")
+        
+        # Activity sources only run while the simulation is active
+        self.activity_backend = activity_backend
+        self.activity_source = None
+        
+        self.metrics = metrics or Metrics()
+        self.status = StatusBus(self.clock)  # Live status for the GUI
+        self.tracer = tracer or Tracer.from_environment()
+        self.recorder = recorder  # Optional ActivityRecorder
+        
+        # The power policy turns the settings below into the effective
+        # move_interval and poll_interval the engine actually runs at
+        self.power_policy = power_policy or PowerPolicy()
+        self.timer_slack = None
         
         # Default settings
         self.movement_frequency = 1.0  # in seconds
         self.movement_distance = 2     # in pixels
         self.idle_threshold = 3        # in seconds
+        self.pattern = "jitter"        # see services/patterns.py
+        self.pattern_file = ""         # recording for the "recorded" pattern
+        self.sparse_margin = SPARSE_MARGIN  # in seconds, sparse mode only
+        
+        # Sparse mode: OS idle timeouts found by services/lock_timeouts.py
+        self.timeout_monitor = None
+        self.lock_timeouts = None
+        self.timeout_power_state = None
+        
+        # Feedback mode: services/idle_feedback.py. feedback_tuning holds the
+        # saved tuning per display; on_tuning_change(display, tuning) is
+        # called on the loop thread when it should be saved again
+        self.feedback_tuning = {}
+        self.on_tuning_change = None
+        self.tuner = None
+        self.idle_counter = None
+        self.verify_timer = None
+        
+        # Built on the first move so NumPy only loads once moves are due
+        self.seed = seed
+        self.pattern_engine = None
+        self.pattern_stale = False
+        self.pattern_origin_time = float("-inf")
+        self.move_interval = self.movement_frequency
+        self.poll_interval = POLL_INTERVAL
     
     def start_simulation(self):
         """Start the cursor movement simulation"""
         if not self.is_active:
             self.is_active = True
-            self.stop_thread = False
-            self.thread = threading.Thread(target=self.simulate_cursor_movement)
-            self.thread.daemon = True
-            self.thread.start()
+            if self.mode == MODE_INHIBIT:
+                try:
+                    self.inhibitor.acquire()
+                    self.active_mode = MODE_INHIBIT
+                    journal.record(EVENT_START, text=MODE_INHIBIT)
+                    self.status.publish_start(MODE_INHIBIT)
+                    return True
+                except InhibitorError as e:
+                    self.report_error(f"Inhibitor unavailable, falling back to cursor movement: {e}")
+            
+            self.active_mode = self.mode if self.mode in (MODE_SPARSE, MODE_FEEDBACK) else MODE_MOVE
+            if self.active_mode == MODE_FEEDBACK and not self.start_feedback():
+                self.active_mode = MODE_MOVE
+            self.last_activity_time = self.clock()
+            self.metrics.user_state.set("active", self.last_activity_time)
+            if self.activity_source is None:
+                from services.activity_sources import create_activity_source
+                self.activity_source = create_activity_source(self, self.activity_backend)
+            self.activity_source.start()
+            if self.active_mode in (MODE_SPARSE, MODE_FEEDBACK):
+                self.start_timeout_monitor()
+            self.apply_power_policy()
+            journal.record(EVENT_START, text=f"{self.active_mode} via {self.activity_source.name}")
+            self.status.publish_start(self.active_mode, self.last_activity_time)
+            if self.recorder is not None:
+                self.recorder.record(KIND_START, self.last_activity_time,
+                                     source=SOURCE_CODES.get(self.activity_source.name, 0))
             return True
         return False
     
@@ -34,47 +401,453 @@ class CursorService:
         """Stop the cursor movement simulation"""
         if self.is_active:
             self.is_active = False
-            self.stop_thread = True
-            if self.thread:
-                self.thread.join(timeout=1)
+            if self.active_mode == MODE_INHIBIT:
+                self.inhibitor.release()
+            else:
+                self.call_in_loop(self.cancel_timer)
+                if self.activity_source is not None:
+                    self.activity_source.stop()
+                if self.timeout_monitor is not None:
+                    self.timeout_monitor.stop()
+                    self.timeout_monitor = None
+                if self.tuner is not None:
+                    self.call_in_loop(self.stop_feedback)
+                if self.input_backend is not None:
+                    self.call_in_loop(self.return_to_origin)
+                    self.call_in_loop(self.close_input_backend)
+                self.metrics.user_state.set(None)
+                if self.recorder is not None:
+                    self.recorder.record(KIND_STOP, self.clock(), source=SOURCE_ENGINE)
+            self.active_mode = None
+            journal.record(EVENT_STOP)
+            self.status.publish_stop()
             return True
         return False
     
+    def set_mode(self, mode):
+        """Switch keep-awake mode, restarting the simulation if it is running"""
+        if mode == self.mode:
+            return
+        was_active = self.is_active
+        self.stop_simulation()
+        self.mode = mode
+        if was_active:
+            self.start_simulation()
+    
+    def record_activity(self, timestamp=None, position=None):
+        """Record user input reported by an activity source"""
+        if timestamp is None:
+            timestamp = self.clock()
+        if timestamp > self.last_activity_time:
+            self.last_activity_time = timestamp
+            self.metrics.activity_detections.inc()
+            journal.record(EVENT_ACTIVITY)
+            self.status.publish_activity(timestamp)
+            if self.recorder is not None:
+                x, y = position if position is not None else (NO_POSITION, NO_POSITION)
+                source = self.activity_source.name if self.activity_source is not None else ""
+                self.recorder.record(KIND_ACTIVITY, timestamp, x, y, SOURCE_CODES.get(source, 0))
+            if self.is_active:
+                self.metrics.user_state.set("active", timestamp)
+    
+    def get_input_backend(self):
+        """Return the opened input backend, creating it on first use
+        
+        Returns None while no backend can be opened; that is retried every
+        BACKEND_RETRY_INTERVAL seconds rather than on every call.
+        """
+        if self.input_backend is None:
+            if self.clock() < self.input_retry_time:
+                return None
+            backend = create_input_backend(self.input_backend_name)
+            try:
+                backend.open()
+            except Exception as e:
+                if isinstance(backend, PyAutoGUIBackend):
+                    return self.input_unavailable(e)
+                self.report_error(f"Input backend {backend.name} failed, using pyautogui: {e}")
+                backend = PyAutoGUIBackend()
+                try:
+                    backend.open()
+                except Exception as e:
+                    return self.input_unavailable(e)
+            self.input_backend = backend
+        return self.input_backend
+    
+    def input_unavailable(self, error):
+        """Report that no input backend could be opened and return None"""
+        self.report_error(f"No input backend available, retrying in "
+                          f"{BACKEND_RETRY_INTERVAL:.0f}s: {type(error).__name__}: {error}")
+        self.input_retry_time = self.clock() + BACKEND_RETRY_INTERVAL
+        return None
+    
     def check_mouse_activity(self):
         """Check if the user has moved the mouse"""
-        current_position = pyautogui.position()
-        if current_position != self.last_mouse_position:
-            self.last_activity_time = time.time()
-            self.last_mouse_position = current_position
+        self.metrics.activity_polls.inc()
+        traced = self.tracer.enabled and self.tracer.sample()
+        if traced:
+            start = self.tracer.now()
+        backend = self.get_input_backend()
+        if backend is None:
+            if traced:
+                self.tracer.record("check_mouse_activity", start, moved=False)
+            return
+        current_position = backend.position()
+        if traced:
+            self.tracer.record("position_read", start)
+        previous_position = self.last_mouse_position
+        self.last_mouse_position = current_position
+        
+        # Discount the offset our own moves applied since the last check
+        offset_x, offset_y = self.synthetic_offset
+        self.synthetic_offset = (0, 0)
+        moved = False
+        if previous_position is not None:
+            expected_position = (previous_position[0] + offset_x, previous_position[1] + offset_y)
+            moved = tuple(current_position) != expected_position
+            if moved:
+                self.record_activity(position=tuple(current_position))
+        if traced:
+            self.tracer.record("check_mouse_activity", start, moved=moved)
     
     def is_user_idle(self):
         """Check if the user has been idle for longer than the threshold"""
-        idle_time = time.time() - self.last_activity_time
+        idle_time = self.clock() - self.last_activity_time
         return idle_time >= self.idle_threshold
     
+    def next_idle_deadline(self):
+        """Return the monotonic time at which the user becomes idle
+        
+        In sparse mode that is when the first keep-alive is due, one move
+        interval after the last input.
+        """
+        if self.active_mode == MODE_SPARSE:
+            return self.last_activity_time + self.move_interval
+        return self.last_activity_time + self.idle_threshold
+    
+    def start_timeout_monitor(self):
+        """Start discovering the OS idle timeouts for sparse mode"""
+        if self.timeout_monitor is None:
+            from services.lock_timeouts import LockTimeoutMonitor
+            self.timeout_monitor = LockTimeoutMonitor(
+                lambda timeouts: self.loop.call_soon_threadsafe(
+                    lambda: self.set_lock_timeouts(timeouts)),
+                on_battery=lambda: self.power_policy.power_state == POWER_BATTERY
+            )
+            self.timeout_power_state = self.power_policy.power_state
+            self.timeout_monitor.start()
+    
+    def set_lock_timeouts(self, timeouts):
+        """Adopt newly discovered idle timeouts (loop thread)"""
+        self.lock_timeouts = timeouts
+        self.apply_power_policy()
+        if timeouts:
+            label = min(timeouts, key=timeouts.get)
+            journal.info(f"Earliest idle timeout {label}={timeouts[label]}s; "
+                         f"keep-alive every {self.move_interval:.0f}s")
+        else:
+            journal.info(f"No idle timeouts found; keep-alive every {self.move_interval:.0f}s")
+    
+    def sparse_interval(self):
+        """Return the sparse-mode move interval: the margin before the earliest timeout"""
+        if not self.lock_timeouts:
+            return SPARSE_FALLBACK_INTERVAL
+        earliest = min(self.lock_timeouts.values())
+        return max(earliest - self.sparse_margin, earliest / 2)
+    
+    def display_name(self):
+        """Return the X display the pointer is moved on, if known"""
+        backend = self.input_backend or self.input_backend_name
+        return getattr(backend, "display_name", None)
+    
+    def start_feedback(self):
+        """Set up idle counter verification; return False if it is unavailable"""
+        from services.idle_feedback import FeedbackTuner, IdleCounter, display_key
+        display_name = self.display_name()
+        if not IdleCounter.available(display_name):
+            self.report_error("Idle counter unavailable, moving without feedback")
+            return False
+        self.idle_counter = IdleCounter(display_name)
+        self.tuner = FeedbackTuner(
+            self.movement_distance, self.movement_frequency, self.sparse_interval(),
+            saved=self.feedback_tuning.get(display_key(display_name))
+        )
+        self.pattern_stale = True
+        return True
+    
+    def stop_feedback(self):
+        """Drop the tuner and its pending verification (loop thread)"""
+        if self.verify_timer is not None:
+            self.verify_timer.cancel()
+            self.verify_timer = None
+        if self.idle_counter is not None:
+            self.idle_counter.close()
+            self.idle_counter = None
+        self.tuner = None
+        self.pattern_stale = True
+    
+    def restart_feedback(self):
+        """Restart the tuning search from the current settings (loop thread)"""
+        if self.tuner is not None:
+            self.stop_feedback()
+            self.start_feedback()
+    
+    def verify_move(self):
+        """Check that the last move reset the idle counter and tune from the result"""
+        from services.idle_feedback import VERIFY_SLACK, display_key
+        self.verify_timer = None
+        if not self.is_active or self.tuner is None:
+            return
+        if self.last_activity_time > self.last_synthetic_time:
+            return  # The user's own input reset the counter; nothing to learn
+        try:
+            idle = self.idle_counter.read()
+        except x11.X11Error as e:
+            self.report_error(f"Error reading idle counter: {e}")
+            return
+        tuner = self.tuner
+        distance = tuner.distance
+        retry = False
+        if idle <= self.clock() - self.last_synthetic_time + VERIFY_SLACK:
+            self.metrics.feedback_confirmed.inc()
+            changed = tuner.confirmed()
+        else:
+            self.metrics.feedback_missed.inc()
+            journal.info(f"Move of {distance}px every {tuner.interval:.1f}s did not reset "
+                         f"the idle counter ({idle:.1f}s idle); retrying")
+            changed = tuner.missed()
+            # Move again right away; the counter is still running
+            self.last_move_time = float("-inf")
+            retry = True
+        if changed:
+            self.pattern_stale |= tuner.distance != distance
+            journal.info(f"Feedback tuning: {tuner.distance}px every {tuner.interval:.1f}s "
+                         f"({tuner.phase})")
+        key = display_key(self.display_name())
+        if tuner.saved() != self.feedback_tuning.get(key):
+            self.feedback_tuning = {**self.feedback_tuning, key: tuner.saved()}
+            if self.on_tuning_change is not None:
+                self.on_tuning_change(key, tuner.saved())
+        if changed or retry:
+            self.apply_power_policy()
+    
+    def get_pattern_engine(self):
+        """Return the movement pattern engine, (re)building it when settings changed"""
+        if self.pattern_engine is None or self.pattern_stale:
+            from services.patterns import PatternEngine, create_pattern
+            try:
+                pattern = create_pattern(self.pattern, self.pattern_file)
+            except (OSError, ValueError) as e:
+                self.report_error(f"Error loading pattern recording {self.pattern_file}: {e}")
+                pattern = create_pattern()
+            distance = self.tuner.distance if self.tuner is not None else self.movement_distance
+            engine = PatternEngine(pattern, distance, self.seed)
+            if self.pattern_engine is not None:
+                # Keep returning to the same origin across the switch
+                engine.offset = self.pattern_engine.offset
+            self.pattern_engine = engine
+            self.pattern_stale = False
+        return self.pattern_engine
+    
+    def return_to_origin(self):
+        """Undo the offset of an unfinished pattern cycle"""
+        if self.pattern_engine is None or self.input_backend is None:
+            return
+        if self.last_activity_time <= self.pattern_origin_time:
+            move = self.pattern_engine.return_move()
+            if move is not None:
+                self.input_backend.move_relative(*move)
+        self.pattern_engine.reset()
+    
+    def move_cursor(self, traced=False):
+        """Move the cursor to the next position of the movement pattern"""
+        backend = self.get_input_backend()
+        if backend is None:
+            return
+        
+        # Take the next precomputed pattern step
+        if traced:
+            start = self.tracer.now()
+        engine = self.get_pattern_engine()
+        if self.last_activity_time > self.pattern_origin_time:
+            # The user moved the pointer: where they left it is the new origin
+            engine.reset()
+            self.pattern_origin_time = self.last_activity_time
+        move_x, move_y = engine.next_move()
+        if traced:
+            self.tracer.record("rng", start)
+        
+        # Move cursor
+        started = time.perf_counter()
+        moved_x, moved_y = backend.keep_alive(move_x, move_y)
+        engine.applied(moved_x, moved_y)
+        elapsed = time.perf_counter() - started
+        self.metrics.move_latency(backend.name).observe(elapsed)
+        if traced:
+            self.tracer.record("move", started, started + elapsed, backend=backend.name)
+        self.metrics.moves.inc()
+        self.last_synthetic_time = self.clock()
+        self.synthetic_offset = (self.synthetic_offset[0] + moved_x,
+                                 self.synthetic_offset[1] + moved_y)
+        if self.timeout_monitor is not None:
+            # Moves are rare here; re-read settings that cannot be watched (xset)
+            self.timeout_monitor.refresh()
+        if self.tuner is not None and self.verify_timer is None:
+            from services.idle_feedback import VERIFY_DELAY
+            self.verify_timer = self.loop.call_at(self.loop.time() + VERIFY_DELAY,
+                                                  self.verify_move)
+        journal.record(EVENT_MOVE, move_x, move_y)
+        self.status.publish_move(self.last_synthetic_time)
+        if self.recorder is not None:
+            self.recorder.record(KIND_MOVE, self.last_synthetic_time, moved_x, moved_y,
+                                 SOURCE_ENGINE)
+    
+    def report_error(self, text):
+        """Record an error in the journal and the live status"""
+        journal.error(text)
+        self.status.publish_error(text)
+    
+    def call_in_loop(self, callback):
+        """Run callback on the event loop, immediately if already on its thread"""
+        if self.loop.in_loop_thread():
+            callback()
+        else:
+            self.loop.call_soon_threadsafe(callback)
+    
+    def close_input_backend(self):
+        """Close the input backend; it is reopened on the next move"""
+        if self.input_backend is not None:
+            self.input_backend.close()
+            self.input_backend = None
+    
+    def cancel_timer(self):
+        """Cancel the pending scheduler timer, if any"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+            self.timer_deadline = None
+            self.sleep_started = None
+    
+    def reschedule(self):
+        """Drop the pending timer and recompute the next deadline right away"""
+        self.cancel_timer()
+        if self.is_active and self.active_mode in (MODE_MOVE, MODE_SPARSE, MODE_FEEDBACK):
+            self.simulate_cursor_movement()
+    
     def simulate_cursor_movement(self):
-        """Simulate small random cursor movements"""
-        while not self.stop_thread:
-            if self.is_user_idle():
-                # Get current cursor position
-                current_x, current_y = pyautogui.position()
-                
-                # Calculate small random movement
-                random_x = random.randint(-self.movement_distance, self.movement_distance)
-                random_y = random.randint(-self.movement_distance, self.movement_distance)
-                
-                # Move cursor
-                pyautogui.moveTo(current_x + random_x, current_y + random_y)
-                print(f"Moved cursor by ({random_x}, {random_y}) pixels")
-            
-            # Wait for the next movement
-            time.sleep(self.movement_frequency)
+        """Run one scheduler step: move if a move is due, then arm the next timer
+        
+        While the user is active the timer is armed for the moment they
+        become idle. Once idle, moves follow a fixed monotonic grid starting
+        at that deadline, so the loop only wakes when there is work to do.
+        """
+        now = self.loop.time()
+        tracer = self.tracer
+        traced = tracer.enabled and tracer.sample()
+        if traced:
+            step_start = tracer.now()
+        if self.sleep_started is not None:
+            # The wait armed by the previous step was sampled
+            tracer.record("sleep", self.sleep_started)
+            self.sleep_started = None
+        if self.timer_deadline is not None:
+            self.metrics.loop_jitter.observe(max(0.0, now - self.timer_deadline))
+        self.timer = None
+        self.timer_deadline = None
+        if not self.is_active:
+            return
+        
+        self.metrics.idle_checks.inc()
+        idle_deadline = self.next_idle_deadline()
+        if traced:
+            tracer.record("idle_check", step_start)
+        if now < idle_deadline:
+            # User is active: re-arm for when they could first be idle
+            self.arm_timer(idle_deadline, traced)
+            if traced:
+                tracer.record("simulate_cursor_movement", step_start, idle=False)
+            return
+        self.metrics.user_state.set("idle", idle_deadline)
+        
+        slot, next_move = plan_move(now, idle_deadline, self.last_move_time, self.move_interval)
+        if slot is not None:
+            self.last_move_time = slot
+            try:
+                self.move_cursor(traced)
+            except Exception as e:
+                # A failed move must not leave the grid without its next timer
+                self.report_error(f"Error moving cursor: {type(e).__name__}: {e}")
+        
+        self.arm_timer(next_move, traced)
+        if traced:
+            tracer.record("simulate_cursor_movement", step_start, idle=True)
+    
+    def arm_timer(self, when, traced=False):
+        """Schedule the next scheduler step at the monotonic time when"""
+        self.timer_deadline = when
+        self.timer = self.loop.call_at(when, self.simulate_cursor_movement)
+        if traced:
+            self.sleep_started = self.tracer.now()
     
-    def update_settings(self, frequency=None, distance=None, idle_threshold=None):
+    def update_settings(self, frequency=None, distance=None, idle_threshold=None,
+                        pattern=None, pattern_file=None, sparse_margin=None,
+                        feedback_tuning=None):
         """Update the simulation settings"""
         if frequency is not None:
             self.movement_frequency = frequency
         if distance is not None:
+            self.pattern_stale |= distance != self.movement_distance
             self.movement_distance = distance
         if idle_threshold is not None:
             self.idle_threshold = idle_threshold
+        if pattern is not None:
+            self.pattern_stale |= pattern != self.pattern
+            self.pattern = pattern
+        if pattern_file is not None:
+            self.pattern_stale |= pattern_file != self.pattern_file
+            self.pattern_file = pattern_file
+        if sparse_margin is not None:
+            self.sparse_margin = sparse_margin
+        if feedback_tuning is not None:
+            self.feedback_tuning = feedback_tuning
+        if self.tuner is not None and (frequency is not None or distance is not None):
+            # New safe defaults: start the search over from them
+            self.call_in_loop(self.restart_feedback)
+        journal.record(EVENT_SETTINGS, text=(
+            f"frequency={self.movement_frequency} distance={self.movement_distance} "
+            f"idle_threshold={self.idle_threshold} pattern={self.pattern}"
+        ))
+        self.apply_power_policy()
+    
+    def apply_power_policy(self):
+        """Derive the effective cadence from the settings and the power policy
+        
+        Call after the settings or the power state change. Also applies the
+        policy's timer slack to the loop thread and recomputes the pending
+        deadline.
+        """
+        polling = self.activity_source is not None and self.activity_source.name == "poll"
+        self.move_interval, self.poll_interval = self.power_policy.effective(
+            self.movement_frequency, POLL_INTERVAL, 2 if polling else 1
+        )
+        if self.active_mode == MODE_SPARSE:
+            # Never stretched by the budget: a later move would come too late
+            self.move_interval = self.sparse_interval()
+        elif self.active_mode == MODE_FEEDBACK and self.tuner is not None:
+            # Already the sparsest verified schedule; the budget cannot stretch it safely
+            self.pattern_stale |= self.tuner.set_max_interval(self.sparse_interval())
+            self.move_interval = self.tuner.interval
+        if self.active_mode in (MODE_SPARSE, MODE_FEEDBACK):
+            if self.timeout_monitor is not None and \
+                    self.power_policy.power_state != self.timeout_power_state:
+                self.timeout_power_state = self.power_policy.power_state
+                self.timeout_monitor.refresh()  # AC and battery timeouts differ
+        self.call_in_loop(self.apply_timer_slack)
+        self.call_in_loop(self.reschedule)
+    
+    def apply_timer_slack(self):
+        """Set the policy's timer slack on the calling (loop) thread"""
+        slack = self.power_policy.timer_slack()
+        if slack != self.timer_slack:
+            set_timer_slack(slack)
+            self.timer_slack = slack
@@ -0,0 +1,238 @@
+import heapq
+import itertools
+import os
+import time
+
+from services import x11
+from services.cursor_service import MIN_MOVE_INTERVAL, XTestBackend, plan_move
+from services.journal import EVENT_MOVE, journal
+from services.metrics import Metrics
+
+# Keeps many X displays awake from one process, e.g. every session on a VDI
+# host. Each target owns one XTest connection and its own idle state and
+# settings; activity is read from the display's XScreenSaver idle counter
+# when the target's deadline comes up, so an idle target costs nothing
+# between deadlines. A single heap of next deadlines multiplexes all
+# targets onto one loop timer.
+
+# Deadlines this close together are served by the same wakeup
+COALESCE_WINDOW = 0.01
+
+# Idle counter resets this soon after our own move are that move, not input
+SYNTHETIC_GRACE = 0.05
+
+class DisplayTarget:
+    """One display kept awake by a DisplayManager"""
+    
+    def __init__(self, display_name, frequency=1.0, distance=2, idle_threshold=3,
+                 pattern="jitter"):
+        self.display_name = display_name
+        self.frequency = frequency
+        self.distance = distance
+        self.idle_threshold = idle_threshold
+        self.pattern = pattern
+        self.backend = XTestBackend(display_name)
+        self.pattern_engine = None
+        self.last_activity_time = time.monotonic()
+        self.last_synthetic_time = float("-inf")
+        self.last_move_time = float("-inf")
+        self.moves = 0
+        self.generation = 0  # Bumped to invalidate queued deadlines
+    
+    def open(self):
+        """Connect to the display; raises X11Error if it is unreachable"""
+        self.backend.open()
+        x11.query_idle_ms(self.backend.display)
+    
+    def close(self):
+        self.backend.close()
+    
+    def abandon(self):
+        """Drop a connection the server already closed
+        
+        XCloseDisplay would hit the dead socket, and Xlib exits the process
+        on I/O errors, so only the file descriptor is released.
+        """
+        display = self.backend.display
+        if display is not None:
+            os.close(display.fileno())
+            display.handle = None
+            self.backend.display = None
+    
+    def update(self, frequency=None, distance=None, idle_threshold=None, pattern=None):
+        if frequency is not None:
+            self.frequency = frequency
+        if idle_threshold is not None:
+            self.idle_threshold = idle_threshold
+        if distance is not None and distance != self.distance:
+            self.distance = distance
+            self.pattern_engine = None  # Rebuilt on the next move
+        if pattern is not None and pattern != self.pattern:
+            self.pattern = pattern
+            self.pattern_engine = None
+    
+    def step(self, now, metrics):
+        """Read the idle counter, move if a move is due, return the next deadline"""
+        display = self.backend.display
+        if not display.connection_alive():
+            raise x11.X11Error(f"display {self.display_name} closed the connection")
+        
+        metrics.idle_checks.inc()
+        activity_time = now - x11.query_idle_ms(display) / 1000
+        if activity_time > self.last_synthetic_time + SYNTHETIC_GRACE:
+            if activity_time > self.last_activity_time:
+                self.last_activity_time = activity_time
+                if self.pattern_engine is not None:
+                    self.pattern_engine.reset()
+        
+        idle_deadline = self.last_activity_time + self.idle_threshold
+        if now < idle_deadline:
+            return idle_deadline
+        slot, next_move = plan_move(now, idle_deadline, self.last_move_time, self.frequency)
+        if slot is not None:
+            self.move(metrics)
+            self.last_move_time = slot
+        return next_move
+    
+    def move(self, metrics):
+        if self.pattern_engine is None:
+            from services.patterns import PatternEngine, create_pattern
+            self.pattern_engine = PatternEngine(create_pattern(self.pattern), self.distance)
+        dx, dy = self.pattern_engine.next_move()
+        started = time.perf_counter()
+        self.backend.move_relative(dx, dy)
+        metrics.move_latency(self.backend.name).observe(time.perf_counter() - started)
+        metrics.moves.inc()
+        self.pattern_engine.applied(dx, dy)
+        self.last_synthetic_time = time.monotonic()
+        self.moves += 1
+        journal.record(EVENT_MOVE, dx, dy, text=self.display_name)
+    
+    def status(self):
+        return {
+            "display": self.display_name,
+            "frequency": self.frequency,
+            "distance": self.distance,
+            "idle_threshold": self.idle_threshold,
+            "pattern": self.pattern,
+            "idle": time.monotonic() - self.last_activity_time >= self.idle_threshold,
+            "moves": self.moves,
+        }
+
+class DisplayManager:
+    """Multiplexes any number of DisplayTargets onto one event loop timer
+    
+    Targets are kept in a heap of (deadline, sequence, generation, target).
+    Changing or removing a target bumps its generation, so stale heap
+    entries are skipped when they surface instead of being searched for.
+    All methods must run on the loop thread. on_drop(display_name, message)
+    is called when a target is dropped because its display went away.
+    """
+    
+    def __init__(self, loop, metrics=None, on_drop=None):
+        self.loop = loop
+        self.metrics = metrics or Metrics()
+        self.on_drop = on_drop
+        self.targets = {}
+        self.deadlines = []
+        self._sequence = itertools.count()
+        self.timer = None
+        self.timer_deadline = None
+    
+    def add_target(self, display_name, **settings):
+        """Start keeping display_name awake; raises X11Error if it cannot be opened"""
+        if display_name in self.targets:
+            raise ValueError(f"display {display_name} is already a target")
+        target = DisplayTarget(display_name, **settings)
+        target.open()
+        self.targets[display_name] = target
+        self._push(target, self.loop.time())
+        journal.info(f"Added display {display_name}")
+        return target
+    
+    def remove_target(self, display_name):
+        """Stop keeping display_name awake and close its connection"""
+        target = self.targets.pop(display_name)
+        target.generation += 1
+        target.close()
+        self._arm()
+        journal.info(f"Removed display {display_name}")
+    
+    def update_target(self, display_name, **settings):
+        """Change a target's settings and recompute its deadline"""
+        target = self.targets[display_name]
+        target.update(**settings)
+        target.generation += 1
+        self._push(target, self.loop.time())
+    
+    def close(self):
+        """Remove every target and cancel the timer"""
+        for display_name in list(self.targets):
+            self.remove_target(display_name)
+        self.deadlines = []
+        self._arm()
+    
+    def _push(self, target, deadline):
+        heapq.heappush(self.deadlines, (deadline, next(self._sequence), target.generation, target))
+        self._arm()
+    
+    def _arm(self):
+        """Point the loop timer at the earliest live deadline"""
+        while self.deadlines and self.deadlines[0][2] != self.deadlines[0][3].generation:
+            heapq.heappop(self.deadlines)
+        deadline = self.deadlines[0][0] if self.deadlines else None
+        if deadline == self.timer_deadline:
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.timer_deadline = deadline
+        if deadline is not None:
+            self.timer = self.loop.call_at(deadline, self._run)
+    
+    def _run(self):
+        now = self.loop.time()
+        if self.timer_deadline is not None:
+            self.metrics.loop_jitter.observe(max(0.0, now - self.timer_deadline))
+        self.timer = None
+        self.timer_deadline = None
+        
+        due = []
+        horizon = now + COALESCE_WINDOW
+        while self.deadlines and self.deadlines[0][0] <= horizon:
+            deadline, sequence, generation, target = heapq.heappop(self.deadlines)
+            if generation == target.generation:
+                due.append(target)
+        
+        try:
+            for target in due:
+                deadline = self._step(target, now)
+                if deadline is not None:
+                    heapq.heappush(self.deadlines,
+                                   (deadline, next(self._sequence), target.generation, target))
+        finally:
+            self._arm()
+    
+    def _step(self, target, now):
+        """Step one target; return its next deadline, or None if it was dropped"""
+        try:
+            return target.step(now, self.metrics)
+        except x11.X11Error as e:
+            journal.error(f"Dropping display {target.display_name}: {e}")
+            self.targets.pop(target.display_name, None)
+            target.generation += 1
+            try:
+                target.abandon()
+                if self.on_drop is not None:
+                    self.on_drop(target.display_name, str(e))
+            except Exception as error:
+                journal.error(f"Error dropping display {target.display_name}: {error}")
+            return None
+        except Exception as e:
+            # Keep the target on its move grid; the next step may succeed
+            journal.error(f"Error keeping display {target.display_name} awake: "
+                          f"{type(e).__name__}: {e}")
+            return now + max(target.frequency, MIN_MOVE_INTERVAL)
+    
+    def status(self):
+        return [target.status() for target in self.targets.values()]
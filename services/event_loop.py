@@ -0,0 +1,265 @@
+import heapq
+import itertools
+import os
+import selectors
+import signal
+import threading
+import time
+
+from services.journal import journal
+
+# CursorService schedules all of its work as timer callbacks on an event
+# loop object with this small interface:
+#
+#   time()                         monotonic clock in seconds
+#   call_at(when, callback)        run callback at time() == when; returns a
+#                                  handle with cancel()
+#   call_soon_threadsafe(callback) run callback on the loop from any thread
+#   in_loop_thread()               True when called on the loop's thread
+#
+# HeapEventLoop also offers add_reader()/remove_reader() for the headless
+# supervisor, which waits on worker pipes.
+#
+# AsyncioEventLoop provides it on top of asyncio, HeapEventLoop without any
+# heavy imports for the headless daemon, ui/qt_event_loop.py on top of the
+# Qt event loop, and VirtualEventLoop on a simulated clock for
+# services/simulation.py.
+
+def run_callback(callback):
+    """Run one loop callback; an exception is reported instead of ending the loop"""
+    try:
+        callback()
+    except Exception as e:
+        name = getattr(callback, "__qualname__", repr(callback))
+        journal.error(f"Error in loop callback {name}: {type(e).__name__}: {e}")
+
+class AsyncioEventLoop:
+    """Event loop for CursorService backed by an asyncio loop"""
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self):
+        # asyncio is imported here rather than at module level: it is a large
+        # import and the GUI, which drives the engine from Qt, never needs it
+        import asyncio
+        
+        self.loop = asyncio.new_event_loop()
+        self.thread = None
+    
+    @classmethod
+    def shared(cls):
+        """Return a process-wide loop running on one long-lived daemon thread"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+                cls._shared.start()
+            return cls._shared
+    
+    def start(self):
+        """Run the loop on a dedicated daemon thread"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run_forever, name="cursorvibe-loop")
+            self.thread.daemon = True
+            self.thread.start()
+    
+    def run_forever(self):
+        """Run the loop on the calling thread until stop() is called"""
+        import asyncio
+        
+        asyncio.set_event_loop(self.loop)
+        self._loop_thread_id = threading.get_ident()
+        self.loop.run_forever()
+    
+    def stop(self):
+        """Stop the loop from any thread"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+    
+    def time(self):
+        return self.loop.time()
+    
+    def call_at(self, when, callback):
+        return self.loop.call_at(when, callback)
+    
+    def call_soon_threadsafe(self, callback):
+        return self.loop.call_soon_threadsafe(callback)
+    
+    def in_loop_thread(self):
+        return getattr(self, "_loop_thread_id", None) == threading.get_ident()
+
+class TimerHandle:
+    """Cancellable handle for a callback scheduled with HeapEventLoop.call_at"""
+    
+    __slots__ = ("when", "callback", "cancelled")
+    
+    def __init__(self, when, callback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+    
+    def cancel(self):
+        self.cancelled = True
+
+class HeapEventLoop:
+    """Minimal event loop: a heap of timers and a self-pipe selector
+    
+    Provides the engine interface without importing asyncio, whose import
+    alone costs about 10 MB of resident memory. Used by the headless daemon.
+    """
+    
+    def __init__(self):
+        self.timers = []
+        self.ready = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._loop_thread_id = None
+        self._signal_handlers = {}
+        
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self._wake_r, selectors.EVENT_READ)
+    
+    def time(self):
+        return time.monotonic()
+    
+    def call_at(self, when, callback):
+        handle = TimerHandle(when, callback)
+        heapq.heappush(self.timers, (when, next(self._sequence), handle))
+        return handle
+    
+    def call_soon_threadsafe(self, callback):
+        with self._lock:
+            self.ready.append(callback)
+        self._wake()
+    
+    def in_loop_thread(self):
+        return self._loop_thread_id == threading.get_ident()
+    
+    def add_reader(self, fd, callback):
+        """Run callback on the loop whenever fd is readable"""
+        self.selector.register(fd, selectors.EVENT_READ, callback)
+    
+    def remove_reader(self, fd):
+        try:
+            self.selector.unregister(fd)
+        except (KeyError, ValueError):
+            pass
+    
+    def add_signal_handler(self, signum, callback):
+        """Run callback on the loop when signum arrives (main thread only)"""
+        self._signal_handlers[signum] = callback
+        signal.signal(signum, lambda *args: None)
+        signal.set_wakeup_fd(self._wake_w)
+    
+    def stop(self):
+        """Stop the loop from any thread"""
+        self.call_soon_threadsafe(self._stop)
+    
+    def _stop(self):
+        self._stopping = True
+    
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass  # Pipe already full, so the loop is waking anyway
+    
+    def _drain_wake_pipe(self):
+        try:
+            data = os.read(self._wake_r, 4096)
+        except BlockingIOError:
+            return
+        # set_wakeup_fd writes signal numbers; call_soon_threadsafe writes zeros
+        for signum in set(data) - {0}:
+            handler = self._signal_handlers.get(signum)
+            if handler is not None:
+                run_callback(handler)
+    
+    def run_forever(self):
+        """Run the loop on the calling thread until stop() is called"""
+        self._loop_thread_id = threading.get_ident()
+        self._stopping = False
+        while not self._stopping:
+            with self._lock:
+                ready, self.ready = self.ready, []
+            for callback in ready:
+                run_callback(callback)
+            
+            now = self.time()
+            while self.timers and self.timers[0][0] <= now:
+                handle = heapq.heappop(self.timers)[2]
+                if not handle.cancelled:
+                    run_callback(handle.callback)
+            while self.timers and self.timers[0][2].cancelled:
+                heapq.heappop(self.timers)
+            
+            if self._stopping:
+                break
+            if self.ready:
+                timeout = 0
+            elif self.timers:
+                timeout = max(0, self.timers[0][0] - self.time())
+            else:
+                timeout = None
+            for key, events in self.selector.select(timeout):
+                if key.fd == self._wake_r:
+                    self._drain_wake_pipe()
+                else:
+                    run_callback(key.data)
+
+class VirtualEventLoop:
+    """Single-threaded loop on a virtual clock for deterministic simulations
+    
+    Time stands still until run_until() advances it, firing due timers at
+    exactly their deadlines, so a simulated day takes as long as the
+    callbacks themselves. skip() jumps the clock without firing anything,
+    like a suspended machine; the timers it jumped over fire late on the
+    next advance. on_timer(deadline, fired) is called before every timer
+    callback.
+    """
+    
+    def __init__(self, start=0.0):
+        self.now = start
+        self.timers = []
+        self.ready = []
+        self._sequence = itertools.count()
+        self.on_timer = None
+    
+    def time(self):
+        return self.now
+    
+    def call_at(self, when, callback):
+        handle = TimerHandle(when, callback)
+        heapq.heappush(self.timers, (when, next(self._sequence), handle))
+        return handle
+    
+    def call_soon_threadsafe(self, callback):
+        self.ready.append(callback)
+    
+    def in_loop_thread(self):
+        return True
+    
+    def run_until(self, when):
+        """Advance the clock to when, running every callback due on the way"""
+        while True:
+            while self.ready:
+                ready, self.ready = self.ready, []
+                for callback in ready:
+                    callback()
+            if not self.timers or self.timers[0][0] > when:
+                break
+            deadline, sequence, handle = heapq.heappop(self.timers)
+            if handle.cancelled:
+                continue
+            self.now = max(self.now, deadline)
+            if self.on_timer is not None:
+                self.on_timer(deadline, self.now)
+            handle.callback()
+        self.now = max(self.now, when)
+    
+    def skip(self, seconds):
+        """Move the clock forward without running anything"""
+        self.now += seconds
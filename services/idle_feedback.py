@@ -0,0 +1,175 @@
+import os
+
+from services import x11
+
+# Closed-loop tuning of the keep-alive movement.
+#
+# Whether a small synthetic move resets the session's idle timer depends on
+# the compositor: some ignore sub-threshold motion, others reset on a single
+# pixel, in which case moving every second is wasted. In "feedback" mode the
+# engine reads the X server's idle counter (MIT-SCREEN-SAVER) a moment after
+# each move to confirm it went back to zero, and a FeedbackTuner searches
+# for the sparsest schedule that keeps doing so: first the smallest
+# distance, then the longest interval up to the session's earliest idle
+# timeout (services/lock_timeouts.py). A move that did not reset the
+# counter is retried at once and sends the search back toward the
+# configured distance and frequency, which are the safe defaults.
+#
+# Tuned values are saved per display, so the next start skips the search.
+
+# Seconds between a move and reading the idle counter back
+VERIFY_DELAY = 0.25
+
+# A reset counter may read at most this much above the time since the move
+VERIFY_SLACK = 0.25
+
+# Consecutive confirmed resets before the next, sparser step is tried
+CONFIRMATIONS = 3
+
+# Factor by which each step stretches the interval
+INTERVAL_GROWTH = 1.5
+
+PHASE_DISTANCE = "distance"
+PHASE_INTERVAL = "interval"
+PHASE_SETTLED = "settled"
+
+def display_key(display_name=None):
+    """Return the name tuning is saved under for a display"""
+    return display_name or os.environ.get("DISPLAY") or "default"
+
+class IdleCounter:
+    """Reads the X server's idle counter over its own connection"""
+    
+    def __init__(self, display_name=None):
+        self.display_name = display_name
+        self.display = None
+    
+    @classmethod
+    def available(cls, display_name=None):
+        if not (display_name or os.environ.get("DISPLAY")):
+            return False
+        try:
+            x11.load_library("X11")
+            x11.load_library("Xss")
+        except x11.X11Error:
+            return False
+        return True
+    
+    def read(self):
+        """Return seconds since the last input event on the display; raises X11Error"""
+        if self.display is None:
+            self.display = x11.Display(self.display_name)
+        return x11.query_idle_ms(self.display) / 1000
+    
+    def close(self):
+        if self.display is not None:
+            self.display.close()
+            self.display = None
+
+class FeedbackTuner:
+    """Searches for the sparsest distance and interval that still reset the idle counter
+    
+    The search starts at the configured (safe) values, or at a tuning saved
+    earlier. Report the outcome of every verified move with confirmed() or
+    missed(); both return True when distance or interval changed. Steps
+    that failed are never tried again, so the search settles.
+    """
+    
+    def __init__(self, safe_distance, safe_interval, max_interval, saved=None):
+        self.safe_distance = max(1, safe_distance)
+        self.safe_interval = safe_interval
+        self.max_interval = max(max_interval, safe_interval)  # From the idle timeouts
+        self.interval_limit = float("inf")  # Learned from a failed step
+        self.min_distance = 1
+        self.distance = self.safe_distance
+        self.interval = self.safe_interval
+        self.phase = PHASE_DISTANCE
+        if saved:
+            self.distance = min(max(int(saved.get("distance", self.distance)), 1),
+                                self.safe_distance)
+            self.interval = min(max(float(saved.get("interval", self.interval)),
+                                    self.safe_interval), self.max_interval)
+            # A saved tuning already found its distance; only the interval
+            # may have room to grow if the idle timeouts were raised since
+            self.phase = PHASE_INTERVAL
+        self.good = (self.distance, self.interval)
+        self.streak = 0
+        self.confirmations = 0
+        self.misses = 0
+    
+    def set_max_interval(self, max_interval):
+        """Bound the interval, e.g. after the idle timeouts changed"""
+        self.max_interval = max(max_interval, self.safe_interval)
+        if self.interval > self.max_interval:
+            self.interval = self.max_interval
+            self.good = (self.good[0], min(self.good[1], self.max_interval))
+            return True
+        if self.phase == PHASE_SETTLED and self.interval < self.ceiling():
+            self.phase = PHASE_INTERVAL
+        return False
+    
+    def ceiling(self):
+        """Return the longest interval the search may still try"""
+        return min(self.max_interval, self.interval_limit)
+    
+    def confirmed(self):
+        """The last move reset the idle counter"""
+        self.confirmations += 1
+        self.streak += 1
+        if self.streak < CONFIRMATIONS:
+            return False
+        self.streak = 0
+        self.good = (self.distance, self.interval)
+        return self._explore()
+    
+    def _explore(self):
+        if self.phase == PHASE_DISTANCE:
+            if self.distance > self.min_distance:
+                self.distance = max(self.min_distance, self.distance // 2)
+                return True
+            self.phase = PHASE_INTERVAL
+        if self.phase == PHASE_INTERVAL:
+            if self.interval < self.ceiling():
+                self.interval = min(self.ceiling(), self.interval * INTERVAL_GROWTH)
+                return True
+            self.phase = PHASE_SETTLED
+        return False
+    
+    def missed(self):
+        """The last move did not reset the idle counter"""
+        self.misses += 1
+        self.streak = 0
+        previous = (self.distance, self.interval)
+        if previous != self.good:
+            # The step being tried went too far: keep the last good
+            # schedule and stop searching in that direction
+            if self.phase == PHASE_DISTANCE:
+                self.min_distance = self.good[0]
+                self.phase = PHASE_INTERVAL
+            else:
+                self.interval_limit = self.good[1]
+                self.phase = PHASE_SETTLED
+            self.distance, self.interval = self.good
+        else:
+            # The known-good schedule failed too: back off toward the safe
+            # defaults, distance first, and never search past that again
+            if self.distance < self.safe_distance:
+                self.distance = self.min_distance = min(self.safe_distance, self.distance * 2)
+            else:
+                self.interval = self.interval_limit = max(self.safe_interval, self.interval / 2)
+            self.good = (self.distance, self.interval)
+            self.phase = PHASE_SETTLED
+        return (self.distance, self.interval) != previous
+    
+    def saved(self):
+        """Return the tuning to persist"""
+        return {"distance": self.good[0], "interval": round(self.good[1], 3)}
+    
+    def status(self):
+        return {
+            "distance": self.distance,
+            "interval": round(self.interval, 3),
+            "phase": self.phase,
+            "confirmed": self.confirmations,
+            "missed": self.misses,
+        }
@@ -0,0 +1,127 @@
+import os
+
+from services.journal import journal
+
+# D-Bus idle/sleep inhibitor used by CursorService's "inhibit" mode.
+#
+# Two locks are taken where available: org.freedesktop.ScreenSaver.Inhibit
+# on the session bus (screensaver and screen lock) and
+# org.freedesktop.login1.Manager.Inhibit on the system bus (idle action and
+# suspend). The ScreenSaver lock is tied to our bus connection and the logind
+# lock to the returned file descriptor, so both are kept open while active.
+
+SCREENSAVER_PATHS = ("/org/freedesktop/ScreenSaver", "/ScreenSaver")
+
+class InhibitorError(Exception):
+    """Raised when no inhibitor lock could be taken"""
+
+class InhibitorService:
+    """Service for holding screensaver and sleep inhibitor locks over D-Bus"""
+    
+    def __init__(self, session_bus="SESSION", system_bus="SYSTEM",
+                 app_name="CursorVibe", reason="Keeping the session awake"):
+        # Bus addresses may be D-Bus address strings, e.g. of a private dbus-daemon
+        self.session_bus = session_bus
+        self.system_bus = system_bus
+        self.app_name = app_name
+        self.reason = reason
+        
+        self.session_connection = None
+        self.screensaver_cookie = None
+        self.screensaver_address = None
+        self.logind_fd = None
+    
+    @property
+    def is_active(self):
+        """True while at least one inhibitor lock is held"""
+        return self.screensaver_cookie is not None or self.logind_fd is not None
+    
+    @staticmethod
+    def available():
+        """Return True if the D-Bus client library is installed"""
+        try:
+            import jeepney  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    
+    def acquire(self):
+        """Take the inhibitor locks, raising InhibitorError if none succeeded"""
+        if self.is_active:
+            return
+        if not self.available():
+            raise InhibitorError("jeepney is not installed")
+        
+        errors = []
+        try:
+            self._inhibit_screensaver()
+        except Exception as e:
+            errors.append(f"ScreenSaver: {e}")
+        try:
+            self._inhibit_logind()
+        except Exception as e:
+            errors.append(f"login1: {e}")
+        
+        if not self.is_active:
+            raise InhibitorError("; ".join(errors))
+    
+    def release(self):
+        """Release any inhibitor locks held"""
+        if self.screensaver_cookie is not None:
+            try:
+                from jeepney import new_method_call
+                self.session_connection.send_and_get_reply(
+                    new_method_call(self.screensaver_address, "UnInhibit", "u",
+                                    (self.screensaver_cookie,)),
+                    timeout=1,
+                )
+            except Exception as e:
+                journal.error(f"Error releasing screensaver inhibitor: {e}")
+            self.screensaver_cookie = None
+        if self.session_connection is not None:
+            self.session_connection.close()
+            self.session_connection = None
+        if self.logind_fd is not None:
+            os.close(self.logind_fd)
+            self.logind_fd = None
+    
+    def _inhibit_screensaver(self):
+        from jeepney import DBusAddress, new_method_call
+        from jeepney.io.blocking import open_dbus_connection
+        from jeepney.wrappers import unwrap_msg
+        
+        connection = open_dbus_connection(bus=self.session_bus)
+        last_error = None
+        for path in SCREENSAVER_PATHS:
+            address = DBusAddress(path, bus_name="org.freedesktop.ScreenSaver",
+                                  interface="org.freedesktop.ScreenSaver")
+            try:
+                reply = connection.send_and_get_reply(
+                    new_method_call(address, "Inhibit", "ss", (self.app_name, self.reason)),
+                    timeout=2,
+                )
+                (self.screensaver_cookie,) = unwrap_msg(reply)
+            except Exception as e:
+                last_error = e
+                continue
+            self.screensaver_address = address
+            self.session_connection = connection
+            return
+        connection.close()
+        raise last_error
+    
+    def _inhibit_logind(self):
+        from jeepney import DBusAddress, new_method_call
+        from jeepney.io.blocking import open_dbus_connection
+        from jeepney.wrappers import unwrap_msg
+        
+        address = DBusAddress("/org/freedesktop/login1", bus_name="org.freedesktop.login1",
+                              interface="org.freedesktop.login1.Manager")
+        with open_dbus_connection(bus=self.system_bus, enable_fds=True) as connection:
+            reply = connection.send_and_get_reply(
+                new_method_call(address, "Inhibit", "ssss",
+                                ("idle:sleep", self.app_name, self.reason, "block")),
+                timeout=2,
+            )
+            (fd,) = unwrap_msg(reply)
+        self.logind_fd = fd.to_raw_fd()
@@ -0,0 +1,182 @@
+import array
+import sys
+import threading
+import time
+
+# Bounded in-memory journal of runtime events.
+#
+# Records go into preallocated parallel arrays used as a ring buffer, so
+# recording an event never performs I/O, never blocks on a full pipe, and
+# the journal's memory use is fixed for the life of the process. Free-form
+# text (error messages, setting changes) is truncated to TEXT_LIMIT. An
+# optional LogSink copies new records to a stream from its own thread at a
+# limited rate.
+
+EVENT_INFO = 0
+EVENT_ERROR = 1
+EVENT_START = 2
+EVENT_STOP = 3
+EVENT_MOVE = 4
+EVENT_ACTIVITY = 5
+EVENT_SETTINGS = 6
+
+EVENT_NAMES = ("info", "error", "start", "stop", "move", "activity", "settings")
+
+# Records kept in memory
+JOURNAL_CAPACITY = 4096
+
+# Characters of text kept per record
+TEXT_LIMIT = 160
+
+class Journal:
+    """Fixed-size ring buffer of compact event records"""
+    
+    def __init__(self, capacity=JOURNAL_CAPACITY):
+        self.capacity = capacity
+        self.times = array.array("d", [0.0]) * capacity
+        self.codes = array.array("B", [0]) * capacity
+        self.args_a = array.array("i", [0]) * capacity
+        self.args_b = array.array("i", [0]) * capacity
+        self.texts = [None] * capacity
+        self.count = 0  # Records ever written; the newest is at (count - 1) % capacity
+        self._lock = threading.Lock()
+    
+    def record(self, code, a=0, b=0, text=None):
+        """Append one event; the oldest record is overwritten when full"""
+        if text is not None and len(text) > TEXT_LIMIT:
+            text = text[:TEXT_LIMIT]
+        now = time.time()
+        with self._lock:
+            slot = self.count % self.capacity
+            self.times[slot] = now
+            self.codes[slot] = code
+            self.args_a[slot] = a
+            self.args_b[slot] = b
+            self.texts[slot] = text
+            self.count += 1
+    
+    def info(self, text):
+        self.record(EVENT_INFO, text=text)
+    
+    def error(self, text):
+        self.record(EVENT_ERROR, text=text)
+    
+    def records(self, start=0, limit=None):
+        """Return (sequence, time, code, a, b, text) tuples from sequence start on
+        
+        Records already overwritten are skipped; limit keeps only the newest.
+        """
+        with self._lock:
+            end = self.count
+            start = max(start, end - self.capacity)
+            if limit is not None:
+                start = max(start, end - limit)
+            result = []
+            for sequence in range(start, end):
+                slot = sequence % self.capacity
+                result.append((sequence, self.times[slot], self.codes[slot],
+                               self.args_a[slot], self.args_b[slot], self.texts[slot]))
+        return result
+    
+    def recent(self, limit=100):
+        """Return the newest records formatted one per line"""
+        return "\n".join(format_record(record) for record in self.records(limit=limit))
+    
+    def dump(self, path):
+        """Write every record still in memory to path"""
+        with open(path, "w") as f:
+            for record in self.records():
+                f.write(format_record(record) + "\n")
+        return path
+
+def format_record(record):
+    sequence, timestamp, code, a, b, text = record
+    clock = time.strftime("%H:%M:%S", time.localtime(timestamp))
+    line = f"{clock}.{int(timestamp % 1 * 1000):03d} {EVENT_NAMES[code]}"
+    if code == EVENT_MOVE:
+        line += f" dx={a} dy={b}"
+    if text:
+        line += f" {text}"
+    return line
+
+class LogSink:
+    """Copies new journal records to a stream from a background thread
+    
+    The thread wakes every interval seconds and writes at most
+    max_per_second records per second of elapsed time; anything beyond
+    that is summarised as a count of dropped records. A slow or blocked
+    stream only ever stalls this thread.
+    """
+    
+    def __init__(self, journal, stream=None, interval=1.0, max_per_second=20):
+        self.journal = journal
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.max_per_second = max_per_second
+        self.position = journal.count
+        self.owns_stream = False
+        self.thread = None
+        self._stop_event = threading.Event()
+    
+    @classmethod
+    def open(cls, journal, path, **kwargs):
+        """Create a sink for a file path, or stderr for "-" """
+        if path == "-":
+            return cls(journal, sys.stderr, **kwargs)
+        sink = cls(journal, open(path, "a", buffering=1), **kwargs)
+        sink.owns_stream = True
+        return sink
+    
+    def start(self):
+        if self.thread is None:
+            self._stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="journal-sink")
+            self.thread.daemon = True
+            self.thread.start()
+    
+    def stop(self):
+        """Write what is left and stop the thread"""
+        if self.thread is None:
+            return
+        self._stop_event.set()
+        self.thread.join(timeout=2)
+        self.thread = None
+        if self.owns_stream:
+            self.stream.close()
+    
+    def _run(self):
+        # Token bucket allowing bursts of up to one second's worth of records
+        budget = self.max_per_second
+        last = time.monotonic()
+        while True:
+            stopping = self._stop_event.wait(self.interval)
+            now = time.monotonic()
+            budget = min(budget + (now - last) * self.max_per_second, self.max_per_second)
+            last = now
+            budget = self.flush(budget)
+            if stopping:
+                return
+    
+    def flush(self, budget):
+        """Write up to budget new records and return the budget left"""
+        if self.journal.count == self.position:
+            return budget
+        records = self.journal.records(self.position)
+        if not records:
+            return budget
+        lost = records[0][0] - self.position
+        self.position = records[-1][0] + 1
+        written = records[:int(budget)]
+        dropped = lost + len(records) - len(written)
+        try:
+            for record in written:
+                self.stream.write(format_record(record) + "\n")
+            if dropped:
+                self.stream.write(f"... {dropped} events not logged (rate limit)\n")
+            self.stream.flush()
+        except (OSError, ValueError):
+            pass  # Nowhere left to report a broken log stream
+        return budget - len(written)
+
+# Process-wide journal shared by all services
+journal = Journal()
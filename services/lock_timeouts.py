@@ -0,0 +1,341 @@
+import ctypes
+import os
+import selectors
+import shutil
+import struct
+import subprocess
+import threading
+
+from services import x11
+from services.journal import journal
+
+# Discovery of the idle timeouts a keep-alive has to beat.
+#
+# The screen blanks, locks or the machine suspends after some period
+# without input; a single synthetic event shortly before the earliest of
+# those timeouts is all that "sparse" mode needs. Each TimeoutReader knows
+# one place those timeouts are configured and returns them as
+# {label: seconds}, leaving out disabled ones:
+#
+#   x11     the X server's screen saver and DPMS timeouts (what `xset q` shows)
+#   gnome   gsettings: session idle-delay and the power plugin's sleep timeouts
+#   kde     kreadconfig: kscreensaverrc and powerdevilrc
+#
+# A LockTimeoutMonitor thread reads every available reader, and reads them
+# again when one of their configuration files changes (inotify) or when
+# asked to, e.g. after each sparse keep-alive, which catches `xset` changes.
+
+# inotify constants (sys/inotify.h)
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+# Re-read interval where inotify is unavailable
+TIMEOUT_POLL_INTERVAL = 60.0
+
+# Configuration writes come in bursts; wait this long before re-reading
+SETTLE_DELAY = 0.5
+
+def _config_home():
+    return os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+
+def _run(args):
+    """Return the stripped stdout of a short command, or None on failure"""
+    try:
+        result = subprocess.run(args, capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+class TimeoutReader:
+    """Base class for sources of idle timeouts"""
+    
+    name = "base"
+    
+    @classmethod
+    def available(cls):
+        return False
+    
+    def read(self, on_battery=False):
+        """Return {label: seconds} of the enabled timeouts"""
+        raise NotImplementedError
+    
+    def watch_paths(self):
+        """Return the files whose changes may change the timeouts"""
+        return []
+    
+    def close(self):
+        pass
+
+class XServerTimeoutReader(TimeoutReader):
+    """Screen saver and DPMS timeouts of the X server"""
+    
+    name = "x11"
+    
+    def __init__(self):
+        self.display = None
+    
+    @classmethod
+    def available(cls):
+        if not os.environ.get("DISPLAY"):
+            return False
+        try:
+            x11.load_library("X11")
+        except x11.X11Error:
+            return False
+        return True
+    
+    def read(self, on_battery=False):
+        if self.display is None:
+            self.display = x11.Display()
+        timeouts = {}
+        screensaver = self.display.screensaver_timeout()
+        if screensaver:
+            timeouts["screensaver"] = screensaver
+        try:
+            dpms = x11.query_dpms_timeouts(self.display)
+        except x11.X11Error:
+            dpms = None
+        if dpms is not None:
+            for label, seconds in zip(("dpms-standby", "dpms-suspend", "dpms-off"), dpms):
+                if seconds:
+                    timeouts[label] = seconds
+        return timeouts
+    
+    def close(self):
+        if self.display is not None:
+            self.display.close()
+            self.display = None
+
+class GnomeTimeoutReader(TimeoutReader):
+    """GNOME session idle delay and automatic suspend, via gsettings"""
+    
+    name = "gnome"
+    
+    @classmethod
+    def available(cls):
+        return (shutil.which("gsettings") is not None
+                and _run(["gsettings", "get", "org.gnome.desktop.session", "idle-delay"]) is not None)
+    
+    def _get(self, schema, key):
+        value = _run(["gsettings", "get", schema, key])
+        if value is None:
+            return None
+        # GVariant text such as "uint32 300", "1200" or "'suspend'"
+        return value.split()[-1].strip("'")
+    
+    def read(self, on_battery=False):
+        timeouts = {}
+        idle_delay = self._get("org.gnome.desktop.session", "idle-delay")
+        if idle_delay and idle_delay.isdigit() and int(idle_delay):
+            timeouts["idle-delay"] = int(idle_delay)
+        power = "org.gnome.settings-daemon.plugins.power"
+        supply = "battery" if on_battery else "ac"
+        if self._get(power, f"sleep-inactive-{supply}-type") not in (None, "nothing"):
+            sleep = self._get(power, f"sleep-inactive-{supply}-timeout")
+            if sleep and sleep.isdigit() and int(sleep):
+                timeouts[f"sleep-{supply}"] = int(sleep)
+        return timeouts
+    
+    def watch_paths(self):
+        # gsettings writes go to the dconf user database
+        return [os.path.join(_config_home(), "dconf", "user")]
+
+class KdeTimeoutReader(TimeoutReader):
+    """KDE Plasma screen locker and PowerDevil timeouts, via kreadconfig"""
+    
+    name = "kde"
+    
+    def __init__(self):
+        self.command = shutil.which("kreadconfig6") or shutil.which("kreadconfig5")
+    
+    @classmethod
+    def available(cls):
+        return ("KDE" in os.environ.get("XDG_CURRENT_DESKTOP", "")
+                and (shutil.which("kreadconfig6") or shutil.which("kreadconfig5")) is not None)
+    
+    def _get(self, file, groups, key):
+        args = [self.command, "--file", file]
+        for group in groups:
+            args += ["--group", group]
+        value = _run(args + ["--key", key])
+        try:
+            return int(value) if value else None
+        except ValueError:
+            return value
+    
+    def read(self, on_battery=False):
+        timeouts = {}
+        if self._get("kscreensaverrc", ["ScreenSaver"], "Autolock") != "false":
+            minutes = self._get("kscreensaverrc", ["ScreenSaver"], "Timeout")
+            timeouts["screen-lock"] = (minutes if isinstance(minutes, int) else 5) * 60
+        
+        profile = "Battery" if on_battery else "AC"
+        # Plasma 6 keys in seconds, then Plasma 5 keys (display seconds, suspend ms)
+        display = self._get("powerdevilrc", [profile, "Display"], "TurnOffDisplayIdleTimeoutSec")
+        if display is None:
+            display = self._get("powerdevilrc", [profile, "DPMSControl"], "idleTime")
+        suspend = self._get("powerdevilrc", [profile, "SuspendAndShutdown"],
+                            "AutoSuspendIdleTimeoutSec")
+        if suspend is None:
+            suspend_ms = self._get("powerdevilrc", [profile, "SuspendSession"], "idleTime")
+            suspend = suspend_ms // 1000 if isinstance(suspend_ms, int) else None
+        if isinstance(display, int) and display > 0:
+            timeouts["display-off"] = display
+        if isinstance(suspend, int) and suspend > 0:
+            timeouts["suspend"] = suspend
+        return timeouts
+    
+    def watch_paths(self):
+        return [os.path.join(_config_home(), name) for name in ("kscreensaverrc", "powerdevilrc")]
+
+TIMEOUT_READERS = (XServerTimeoutReader, GnomeTimeoutReader, KdeTimeoutReader)
+
+def earliest_timeout(timeouts):
+    """Return the (label, seconds) of the earliest timeout, or None"""
+    if not timeouts:
+        return None
+    return min(timeouts.items(), key=lambda item: item[1])
+
+class LockTimeoutMonitor:
+    """Reads the idle timeouts on a background thread and reports changes
+    
+    on_change(timeouts) is called from the monitor thread with the merged
+    {"reader.label": seconds} of every available reader, once at start and
+    again whenever the result changes. on_battery is a callable choosing
+    the AC or battery power timeouts.
+    """
+    
+    def __init__(self, on_change, on_battery=None, readers=None):
+        self.on_change = on_change
+        self.on_battery = on_battery or (lambda: False)
+        self.readers = readers
+        self.timeouts = None
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._wake_r, self._wake_w = None, None
+    
+    def start(self):
+        if self.thread is not None:
+            return
+        if self.readers is None:
+            self.readers = [reader() for reader in TIMEOUT_READERS if reader.available()]
+        self._stop_event.clear()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_w, False)
+        self.thread = threading.Thread(target=self._run, name="lock-timeouts")
+        self.thread.daemon = True
+        self.thread.start()
+    
+    def stop(self):
+        if self.thread is None:
+            return
+        self._stop_event.set()
+        os.write(self._wake_w, b"\0")
+        self.thread.join(timeout=6)
+        self.thread = None
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+    
+    def refresh(self):
+        """Ask the thread to read the timeouts again (from any thread)"""
+        if self.thread is not None:
+            try:
+                os.write(self._wake_w, b"\1")
+            except BlockingIOError:
+                pass
+    
+    def read(self):
+        on_battery = self.on_battery()
+        timeouts = {}
+        for reader in self.readers:
+            try:
+                values = reader.read(on_battery)
+            except (OSError, x11.X11Error) as e:
+                journal.error(f"Error reading {reader.name} idle timeouts: {e}")
+                continue
+            timeouts.update((f"{reader.name}.{label}", seconds)
+                            for label, seconds in values.items())
+        return timeouts
+    
+    def _check(self):
+        timeouts = self.read()
+        if timeouts != self.timeouts:
+            self.timeouts = timeouts
+            self.on_change(timeouts)
+    
+    def _open_inotify(self):
+        """Return (fd, watched names) for the readers' config directories, or None"""
+        paths = [path for reader in self.readers for path in reader.watch_paths()]
+        if not paths:
+            return None, set()
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None, set()
+        if fd < 0:
+            return None, set()
+        # Editors and dconf replace files, so watch the directories
+        watched = 0
+        for directory in {os.path.dirname(path) for path in paths}:
+            if libc.inotify_add_watch(fd, os.fsencode(directory),
+                                      IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) >= 0:
+                watched += 1
+        if not watched:
+            os.close(fd)
+            return None, set()
+        return fd, {os.path.basename(path) for path in paths}
+    
+    def _drain_inotify(self, fd, names):
+        """Read pending events; return True if one concerns a watched file"""
+        relevant = False
+        while True:
+            try:
+                data = os.read(fd, 4096)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset + INOTIFY_EVENT.size <= len(data):
+                wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+                offset += INOTIFY_EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+                relevant |= name in names
+    
+    def _run(self):
+        inotify_fd, names = self._open_inotify()
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        if inotify_fd is not None:
+            selector.register(inotify_fd, selectors.EVENT_READ)
+        timeout = None if inotify_fd is not None or not names else TIMEOUT_POLL_INTERVAL
+        try:
+            self._check()
+            while not self._stop_event.is_set():
+                ready = selector.select(timeout)
+                if self._stop_event.is_set():
+                    break
+                changed = not ready  # Poll timeout
+                for key, events in ready:
+                    if key.fd == self._wake_r:
+                        os.read(self._wake_r, 64)
+                        changed = True
+                    elif self._drain_inotify(inotify_fd, names):
+                        if self._stop_event.wait(SETTLE_DELAY):
+                            break
+                        self._drain_inotify(inotify_fd, names)
+                        changed = True
+                if changed:
+                    self._check()
+        finally:
+            selector.close()
+            if inotify_fd is not None:
+                os.close(inotify_fd)
+            for reader in self.readers:
+                reader.close()
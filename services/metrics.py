@@ -0,0 +1,290 @@
+import bisect
+import os
+import tempfile
+import threading
+import time
+
+from services.journal import journal
+
+# In-process metrics for the keep-alive engine, exported in the Prometheus
+# text format. Updates are plain attribute arithmetic on preallocated
+# objects, with no formatting or I/O; only idle/active transitions take a
+# lock. All the work happens in render(), which runs when an exporter asks.
+
+# Seconds; covers sub-millisecond input calls up to second-long stalls
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Seconds between textfile rewrites
+TEXTFILE_INTERVAL = 15.0
+
+class Counter:
+    """Monotonically increasing value"""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0
+    
+    def inc(self, amount=1):
+        self.value += amount
+
+class Gauge:
+    """Value that can go up and down"""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0
+    
+    def set(self, value):
+        self.value = value
+
+class Histogram:
+    """Bucketed distribution of observed values"""
+    
+    __slots__ = ("buckets", "counts", "sum", "count")
+    
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class StateTimer:
+    """Accumulates the seconds spent in each of a set of states"""
+    
+    def __init__(self, states):
+        self.totals = dict.fromkeys(states, 0.0)
+        self.state = None
+        self.since = 0.0
+        self._lock = threading.Lock()
+    
+    def set(self, state, now=None):
+        """Enter state (None for untracked) as of the monotonic time now"""
+        if state == self.state:
+            return
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            if self.state is not None:
+                self.totals[self.state] += max(0.0, now - self.since)
+            self.state = state
+            self.since = now
+    
+    def snapshot(self):
+        """Return the totals including the time spent in the current state"""
+        with self._lock:
+            totals = dict(self.totals)
+            if self.state is not None:
+                totals[self.state] += max(0.0, time.monotonic() - self.since)
+        return totals
+
+class Metrics:
+    """Registry of the engine's counters and histograms"""
+    
+    def __init__(self):
+        self.families = {}
+        self.moves = self.counter(
+            "cursorvibe_moves_total", "Synthetic keep-alive moves issued")
+        self.idle_checks = self.counter(
+            "cursorvibe_idle_checks_total", "Scheduler evaluations of the idle deadline")
+        self.activity_polls = self.counter(
+            "cursorvibe_activity_polls_total", "Pointer position polls by the polling activity source")
+        self.activity_detections = self.counter(
+            "cursorvibe_activity_detections_total", "User input reports that moved the activity time forward")
+        self.feedback_confirmed = self.counter(
+            "cursorvibe_feedback_checks_total", "Moves verified against the idle counter",
+            result="reset")
+        self.feedback_missed = self.counter(
+            "cursorvibe_feedback_checks_total", "Moves verified against the idle counter",
+            result="missed")
+        self.loop_jitter = self.histogram(
+            "cursorvibe_loop_jitter_seconds", "Actual minus scheduled scheduler wakeup time")
+        self.user_state = StateTimer(("idle", "active"))
+        self._move_latency = {}
+    
+    def counter(self, name, help, **labels):
+        return self._metric(name, help, "counter", labels, Counter)
+    
+    def gauge(self, name, help, **labels):
+        return self._metric(name, help, "gauge", labels, Gauge)
+    
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS, **labels):
+        return self._metric(name, help, "histogram", labels, lambda: Histogram(buckets))
+    
+    def _metric(self, name, help, kind, labels, factory):
+        family = self.families.setdefault(name, (help, kind, {}))
+        key = tuple(sorted(labels.items()))
+        children = family[2]
+        if key not in children:
+            children[key] = factory()
+        return children[key]
+    
+    def move_latency(self, backend):
+        """Return the move latency histogram for an input backend"""
+        histogram = self._move_latency.get(backend)
+        if histogram is None:
+            # Looked up on every move, so the labelled child is cached
+            histogram = self._move_latency[backend] = self.histogram(
+                "cursorvibe_move_latency_seconds", "Time spent in the input backend per move",
+                backend=backend)
+        return histogram
+    
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, (help, kind, children) in sorted(self.families.copy().items()):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, metric in sorted(children.copy().items()):
+                if kind in ("counter", "gauge"):
+                    lines.append(f"{name}{_labels(key)} {metric.value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), metric.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(key)} {metric.sum!r}")
+                lines.append(f"{name}_count{_labels(key)} {metric.count}")
+        
+        lines.append("# HELP cursorvibe_user_state_seconds_total Seconds the user spent idle or active while running")
+        lines.append("# TYPE cursorvibe_user_state_seconds_total counter")
+        for state, seconds in self.user_state.snapshot().items():
+            lines.append(f'cursorvibe_user_state_seconds_total{{state="{state}"}} {seconds:.3f}')
+        
+        lines.extend(_process_lines())
+        return "\n".join(lines) + "\n"
+
+def _labels(key):
+    if not key:
+        return ""
+    return "{" + ",".join(f'{label}="{value}"' for label, value in key) + "}"
+
+def _process_lines():
+    """Process CPU time and context switches from getrusage (os.times on Windows)"""
+    try:
+        import resource
+    except ImportError:
+        times = os.times()
+        user, system = times.user, times.system
+        switches = None
+    else:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        user, system = usage.ru_utime, usage.ru_stime
+        switches = (usage.ru_nvcsw, usage.ru_nivcsw)
+    
+    lines = [
+        "# HELP cursorvibe_process_cpu_seconds_total CPU time consumed by the process",
+        "# TYPE cursorvibe_process_cpu_seconds_total counter",
+        f'cursorvibe_process_cpu_seconds_total{{mode="user"}} {user:.6f}',
+        f'cursorvibe_process_cpu_seconds_total{{mode="system"}} {system:.6f}',
+    ]
+    if switches is not None:
+        lines += [
+            "# HELP cursorvibe_process_context_switches_total Context switches of the process",
+            "# TYPE cursorvibe_process_context_switches_total counter",
+            f'cursorvibe_process_context_switches_total{{kind="voluntary"}} {switches[0]}',
+            f'cursorvibe_process_context_switches_total{{kind="involuntary"}} {switches[1]}',
+        ]
+    return lines
+
+class TextfileExporter:
+    """Rewrites a .prom file on an interval for the node_exporter textfile collector"""
+    
+    def __init__(self, metrics, loop, path, interval=TEXTFILE_INTERVAL):
+        self.metrics = metrics
+        self.loop = loop
+        self.path = path
+        self.interval = interval
+        self.timer = None
+    
+    def start(self):
+        self.loop.call_soon_threadsafe(self._tick)
+    
+    def stop(self):
+        def cancel():
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        self.loop.call_soon_threadsafe(cancel)
+    
+    def _tick(self):
+        self.write()
+        self.timer = self.loop.call_at(self.loop.time() + self.interval, self._tick)
+    
+    def write(self):
+        """Write the current metrics; the rename keeps scrapes from seeing a partial file"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".cursorvibe-", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, "w") as f:
+                f.write(self.metrics.render())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            journal.error(f"Error writing metrics file {self.path}: {e}")
+
+class HTTPExporter:
+    """Serves /metrics on a localhost port from a background thread"""
+    
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        self.metrics = metrics
+        self.port = port
+        self.host = host
+        self.server = None
+    
+    def start(self):
+        """Bind and start serving; raises OSError if the port is taken"""
+        # http.server is only imported when the endpoint is enabled
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        
+        metrics = self.metrics
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass  # One line per scrape is noise
+        
+        self.server = HTTPServer((self.host, self.port), Handler)
+        thread = threading.Thread(target=self.server.serve_forever, name="cursorvibe-metrics")
+        thread.daemon = True
+        thread.start()
+    
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+def start_exporters(metrics, loop, textfile="", port=0, interval=TEXTFILE_INTERVAL):
+    """Start the exporters enabled in settings and return them for stopping"""
+    exporters = []
+    if textfile:
+        exporters.append(TextfileExporter(metrics, loop, textfile, interval))
+    if port:
+        exporters.append(HTTPExporter(metrics, port))
+    started = []
+    for exporter in exporters:
+        try:
+            exporter.start()
+            started.append(exporter)
+        except OSError as e:
+            journal.error(f"Error starting metrics export: {e}")
+    return started
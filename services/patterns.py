@@ -0,0 +1,203 @@
+import json
+import math
+
+import numpy as np
+
+# Keep-alive movement patterns.
+#
+# A pattern produces closed cycles of pointer positions relative to the
+# origin (where the user left the pointer). Every cycle ends exactly at
+# (0, 0), so the offsets of a cycle sum to zero and the pointer cannot drift
+# however long the session stays idle. Patterns generate many cycles at a
+# time as one NumPy array. PatternEngine hands out the resulting moves one
+# tick at a time from a precomputed buffer.
+#
+# This module imports NumPy, so CursorService only imports it when the
+# first keep-alive move is due.
+
+# Moves precomputed per refill; a refill happens every few minutes at most
+BATCH_MOVES = 256
+
+def _drop_repeats(positions):
+    """Remove positions equal to their predecessor; they would be no-op moves"""
+    previous = np.vstack((np.zeros((1, 2), dtype=positions.dtype), positions[:-1]))
+    return positions[np.any(positions != previous, axis=1)]
+
+def _closed_cycles(points):
+    """Round float cycles shaped (cycles, steps, 2) and end each one at the origin"""
+    positions = np.rint(points).astype(np.int64)
+    positions[:, -1, :] = 0
+    return positions.reshape(-1, 2)
+
+class Pattern:
+    """Base class for keep-alive movement patterns"""
+    
+    name = "base"
+    
+    def cycle_length(self, distance):
+        """Return the number of positions in one cycle"""
+        raise NotImplementedError
+    
+    def cycles(self, rng, distance, count):
+        """Return count cycles as a (count, cycle_length, 2) float array"""
+        raise NotImplementedError
+    
+    def batch(self, rng, distance, moves=BATCH_MOVES):
+        """Return at least one full cycle of integer positions, shaped (n, 2)"""
+        count = max(1, moves // self.cycle_length(distance))
+        return _drop_repeats(_closed_cycles(self.cycles(rng, distance, count)))
+
+class JitterPattern(Pattern):
+    """Step to a random nearby point, then straight back"""
+    
+    name = "jitter"
+    
+    def cycle_length(self, distance):
+        return 2
+    
+    def cycles(self, rng, distance, count):
+        points = rng.integers(-distance, distance + 1, size=(count, 2, 2)).astype(float)
+        # Never stand still on the outward step
+        still = np.all(points[:, 0, :] == 0, axis=1)
+        points[still, 0, 0] = distance
+        return points
+
+class CirclePattern(Pattern):
+    """Trace a small circle through the origin, in a random direction per cycle"""
+    
+    name = "circle"
+    
+    def cycle_length(self, distance):
+        # About one pixel of travel per move
+        return max(8, math.ceil(2 * math.pi * distance))
+    
+    def cycles(self, rng, distance, count):
+        steps = self.cycle_length(distance)
+        theta = np.linspace(0, 2 * np.pi, steps + 1)[1:]
+        direction = rng.choice((-1.0, 1.0), size=(count, 1))
+        x = distance * (np.cos(theta) - 1)
+        y = distance * np.sin(theta) * direction
+        return np.stack((np.broadcast_to(x, y.shape), y), axis=-1)
+
+class LissajousPattern(Pattern):
+    """Trace a 3:2 Lissajous figure through the origin"""
+    
+    name = "lissajous"
+    
+    def cycle_length(self, distance):
+        return max(16, math.ceil(4 * math.pi * distance))
+    
+    def cycles(self, rng, distance, count):
+        steps = self.cycle_length(distance)
+        theta = np.linspace(0, 2 * np.pi, steps + 1)[1:]
+        points = np.stack((distance * np.sin(3 * theta), distance * np.sin(2 * theta)), axis=-1)
+        return np.broadcast_to(points, (count, steps, 2))
+
+class RecordedPattern(Pattern):
+    """Replay a recorded pointer path, or synthesise a human-like one
+    
+    A recording is a JSON list of [x, y] points. It is shifted to start at
+    the origin and scaled to the movement distance, and the cycle closes
+    back at the origin. Without a recording every cycle is a fresh smoothed
+    random walk pinned to the origin at both ends (a Brownian bridge),
+    which wanders like a resting hand.
+    """
+    
+    name = "recorded"
+    steps = 24
+    
+    def __init__(self, path=None):
+        self.recording = None
+        if path:
+            with open(path) as f:
+                points = np.asarray(json.load(f), dtype=float).reshape(-1, 2)
+            if len(points) < 2 or not np.any(points != points[0]):
+                # Every position would be dropped as a repeat, leaving nothing to replay
+                raise ValueError("a recording needs at least two distinct points")
+            points = points - points[0]
+            self.recording = np.vstack((points[1:], np.zeros((1, 2))))
+    
+    def cycle_length(self, distance):
+        if self.recording is not None:
+            return len(self.recording)
+        return self.steps
+    
+    def cycles(self, rng, distance, count):
+        if self.recording is not None:
+            scale = np.abs(self.recording).max() or 1.0
+            points = self.recording * (distance / scale)
+            return np.broadcast_to(points, (count,) + points.shape)
+        
+        walk = np.cumsum(rng.normal(size=(count, self.steps, 2)), axis=1)
+        fraction = np.arange(1, self.steps + 1)[None, :, None] / self.steps
+        bridge = walk - fraction * walk[:, -1:, :]
+        # Three-point moving average smooths the hand tremor into drift
+        smoothed = (bridge + np.roll(bridge, 1, axis=1) + np.roll(bridge, -1, axis=1)) / 3
+        scale = np.abs(smoothed).max(axis=(1, 2), keepdims=True)
+        return smoothed * (distance / np.where(scale == 0, 1, scale))
+
+PATTERNS = {
+    pattern.name: pattern
+    for pattern in (JitterPattern, CirclePattern, LissajousPattern, RecordedPattern)
+}
+
+def create_pattern(name="jitter", path=None):
+    """Create the named pattern; path is a recording for the recorded pattern"""
+    if name == RecordedPattern.name:
+        return RecordedPattern(path)
+    return PATTERNS.get(name, JitterPattern)()
+
+class PatternEngine:
+    """Hands out keep-alive moves from a precomputed buffer of pattern positions
+    
+    next_move() is an index into a list of precomputed position tuples and
+    two subtractions; the RNG and trigonometry run once per batch. The
+    engine tracks the pointer's actual offset from the origin (some input
+    backends undo their own moves), so every move aims at the next pattern
+    position and each cycle lands back on the origin.
+    """
+    
+    def __init__(self, pattern, distance, seed=None):
+        self.pattern = pattern
+        self.distance = max(1, int(distance))
+        self.rng = np.random.default_rng(seed)
+        self.positions = []
+        self.index = 0
+        self.offset = (0, 0)
+    
+    def refill(self):
+        batch = self.pattern.batch(self.rng, self.distance)
+        self.positions = list(zip(batch[:, 0].tolist(), batch[:, 1].tolist()))
+        self.index = 0
+    
+    def next_move(self):
+        """Return the (dx, dy) that takes the pointer to the next pattern position
+        
+        Positions the pointer is already at are skipped: a backend that
+        moves out and back (uinput) never leaves the origin, and a (0, 0)
+        move would generate no input at all.
+        """
+        skipped = 0
+        while True:
+            if self.index >= len(self.positions):
+                self.refill()
+            x, y = self.positions[self.index]
+            self.index += 1
+            dx, dy = x - self.offset[0], y - self.offset[1]
+            if dx or dy or skipped >= len(self.positions):
+                return dx, dy
+            skipped += 1
+    
+    def applied(self, dx, dy):
+        """Record the net offset an input backend actually applied"""
+        self.offset = (self.offset[0] + dx, self.offset[1] + dy)
+    
+    def return_move(self):
+        """Return the (dx, dy) back to the origin, or None if already there"""
+        if self.offset == (0, 0):
+            return None
+        return -self.offset[0], -self.offset[1]
+    
+    def reset(self):
+        """Treat the current pointer position as the new origin"""
+        self.offset = (0, 0)
@@ -0,0 +1,224 @@
+import os
+import selectors
+import socket
+import threading
+
+from services.journal import journal
+
+# Power policy for the keep-alive engine.
+#
+# The user's settings say how often they would like the cursor to move; the
+# policy decides how often the engine may actually wake up. On AC power the
+# settings win. On battery, moves and pointer polls are stretched so that
+# together they stay within a wakeups-per-minute budget, and the worker
+# thread gets a large timer slack so the kernel can batch its wakeups with
+# everyone else's and keep the CPU in deep idle states longer.
+
+POWER_SUPPLY_ROOT = "/sys/class/power_supply"
+
+POWER_AC = "ac"
+POWER_BATTERY = "battery"
+POWER_UNKNOWN = "unknown"
+
+# Default wakeups per minute allowed on battery (0 means no limit)
+BATTERY_WAKEUP_BUDGET = 4
+
+# Timer slack for the worker thread on battery, in seconds
+BATTERY_TIMER_SLACK = 0.1
+
+# prctl option and netlink protocol numbers from the Linux headers
+PR_SET_TIMERSLACK = 29
+NETLINK_KOBJECT_UEVENT = 15
+
+# Re-read interval where power change notifications are unavailable
+POWER_POLL_INTERVAL = 60.0
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def read_power_state(root=POWER_SUPPLY_ROOT):
+    """Return POWER_AC, POWER_BATTERY or POWER_UNKNOWN from sysfs"""
+    try:
+        supplies = os.listdir(root)
+    except OSError:
+        return POWER_UNKNOWN
+    
+    external_online = None
+    has_battery = False
+    discharging = False
+    for supply in supplies:
+        path = os.path.join(root, supply)
+        kind = _read(os.path.join(path, "type"))
+        if kind == "Battery":
+            # Peripheral batteries (mice, headsets) do not power the machine
+            if _read(os.path.join(path, "scope")) == "Device":
+                continue
+            has_battery = True
+            if _read(os.path.join(path, "status")) == "Discharging":
+                discharging = True
+        elif kind in ("Mains", "USB", "USB_C", "USB_PD"):
+            online = _read(os.path.join(path, "online")) == "1"
+            external_online = bool(external_online) or online
+    
+    if external_online:
+        return POWER_AC
+    if has_battery and (discharging or external_online is False):
+        return POWER_BATTERY
+    return POWER_UNKNOWN
+
+def set_timer_slack(seconds):
+    """Set the calling thread's timer slack; 0 restores the default"""
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        prctl = libc.prctl
+    except (OSError, AttributeError):
+        return False
+    return prctl(PR_SET_TIMERSLACK, ctypes.c_ulong(int(seconds * 1e9)), 0, 0, 0) == 0
+
+class PowerPolicy:
+    """Turns user settings and the power state into the engine's effective cadence"""
+    
+    def __init__(self, battery_budget=BATTERY_WAKEUP_BUDGET, root=POWER_SUPPLY_ROOT):
+        self.battery_budget = battery_budget
+        self.root = root
+        self.power_state = read_power_state(root)
+        self.monitor = None
+    
+    def budget(self):
+        """Return the wakeups per minute currently allowed, or None for no limit"""
+        if self.power_state == POWER_BATTERY and self.battery_budget > 0:
+            return self.battery_budget
+        return None
+    
+    def effective(self, frequency, poll_interval, wakeup_sources=1):
+        """Return the (move interval, poll interval) that fit the budget
+        
+        wakeup_sources is the number of periodic wakeups sharing the budget:
+        the move timer, plus the pointer poll when the polling activity
+        source is in use.
+        """
+        budget = self.budget()
+        if budget is None:
+            return frequency, poll_interval
+        min_interval = 60.0 * wakeup_sources / budget
+        return max(frequency, min_interval), max(poll_interval, min_interval)
+    
+    def timer_slack(self):
+        """Return the timer slack the worker threads should use, in seconds"""
+        return BATTERY_TIMER_SLACK if self.budget() is not None else 0
+    
+    def describe(self, move_interval):
+        """Return a one-line summary for the tray tooltip"""
+        budget = self.budget()
+        if budget is None:
+            source = "On battery" if self.power_state == POWER_BATTERY else "On AC power"
+            return f"{source}: moving every {move_interval:.1f}s"
+        return f"On battery: {budget} wakeups/min, moving every {move_interval:.1f}s"
+    
+    def refresh(self):
+        """Re-read the power state; return True if it changed"""
+        state = read_power_state(self.root)
+        if state == self.power_state:
+            return False
+        self.power_state = state
+        return True
+    
+    def start_monitor(self, on_change):
+        """Call on_change (from a background thread) whenever the power state changes"""
+        if self.monitor is None:
+            self.monitor = PowerMonitor(self, on_change)
+            self.monitor.start()
+    
+    def stop_monitor(self):
+        if self.monitor is not None:
+            self.monitor.stop()
+            self.monitor = None
+
+class PowerMonitor:
+    """Watches kernel power_supply uevents, falling back to periodic re-reads"""
+    
+    def __init__(self, policy, on_change):
+        self.policy = policy
+        self.on_change = on_change
+        self.thread = None
+        self._stop_event = threading.Event()
+        self._wake_r, self._wake_w = None, None
+    
+    def start(self):
+        if self.thread is not None:
+            return
+        self._stop_event.clear()
+        self._wake_r, self._wake_w = os.pipe()
+        self.thread = threading.Thread(target=self._run, name="power-monitor")
+        self.thread.daemon = True
+        self.thread.start()
+    
+    def stop(self):
+        if self.thread is None:
+            return
+        self._stop_event.set()
+        os.write(self._wake_w, b"\0")
+        self.thread.join(timeout=1)
+        self.thread = None
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+    
+    def _open_uevent_socket(self):
+        if not hasattr(socket, "AF_NETLINK"):
+            return None
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, 1))  # Group 1: kernel uevents
+        except OSError as e:
+            journal.error(f"Power uevents unavailable, polling instead: {e}")
+            return None
+        sock.setblocking(False)
+        return sock
+    
+    def _check(self):
+        if self.policy.refresh():
+            self.on_change()
+    
+    def _run(self):
+        sock = self._open_uevent_socket()
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        if sock is not None:
+            selector.register(sock, selectors.EVENT_READ)
+        timeout = None if sock is not None else POWER_POLL_INTERVAL
+        try:
+            while not self._stop_event.is_set():
+                ready = selector.select(timeout)
+                if self._stop_event.is_set():
+                    break
+                if not ready:
+                    self._check()
+                    continue
+                power_event = False
+                for key, events in ready:
+                    if key.fileobj is sock:
+                        power_event |= self._drain(sock)
+                if power_event:
+                    self._check()
+        finally:
+            selector.close()
+            if sock is not None:
+                sock.close()
+    
+    def _drain(self, sock):
+        """Read pending uevents; return True if any came from a power supply"""
+        power_event = False
+        while True:
+            try:
+                message = sock.recv(8192)
+            except BlockingIOError:
+                return power_event
+            except OSError:
+                return True  # ENOBUFS: events were lost, so re-read to be safe
+            if b"\0SUBSYSTEM=power_supply\0" in message:
+                power_event = True
@@ -0,0 +1,364 @@
+import ctypes
+import datetime
+import errno
+import os
+import re
+import selectors
+import threading
+import time
+
+from services.journal import journal
+
+# Active hours: keep-alive only during configured windows of the week.
+#
+# A schedule is a few lines (';' also separates them):
+#
+#   mon-fri 09:00-17:30          weekday windows; several per line with ','
+#   sat 10:00-12:00,14:00-16:00
+#   fri 22:00-02:00              a window ending before it starts runs past midnight
+#   2026-12-24 09:00-12:00       a date exception replaces that day's windows
+#   2026-12-31 off
+#
+# Days are mon..sun, ranges such as fri-mon, lists such as sat,sun, or
+# daily. A holidays file lists dates that are off, one "YYYY-MM-DD [name]"
+# per line; exceptions win over holidays.
+#
+# Times are wall-clock times in the schedule's time zone (the system's by
+# default), so 09:00 stays 09:00 across DST changes. A ScheduleTimer thread
+# computes the next on/off transition and sleeps on a single CLOCK_REALTIME
+# timerfd armed for it with TFD_TIMER_CANCEL_ON_SET: the kernel wakes it at
+# the transition, after a suspend that slept through one, or when the wall
+# clock is set, and it never polls the clock in between.
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_SECONDS = 86400
+
+# Days ahead searched for the next transition; covers yearly exceptions
+LOOKAHEAD_DAYS = 370
+
+# timerfd constants (sys/timerfd.h, time.h)
+CLOCK_REALTIME = 0
+TFD_NONBLOCK = 0o4000
+TFD_CLOEXEC = 0o2000000
+TFD_TIMER_ABSTIME = 1
+TFD_TIMER_CANCEL_ON_SET = 2
+
+# Longest wait where timerfd is unavailable, so clock changes are noticed
+FALLBACK_WAIT = 300.0
+
+_WINDOW = re.compile(r"^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})$")
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+def parse_days(text):
+    """Return the set of weekday numbers (Monday is 0) for mon-fri, sat,sun or daily"""
+    if text in ("daily", "*"):
+        return set(range(7))
+    days = set()
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        try:
+            start = DAYS.index(first)
+            end = DAYS.index(last) if last else start
+        except ValueError:
+            raise ValueError(f"unknown day {part!r}")
+        days.update((start + offset) % 7 for offset in range((end - start) % 7 + 1))
+    return days
+
+def parse_windows(text):
+    """Return [(start, end)] seconds after midnight for windows like 09:00-17:30,22:00-02:00"""
+    windows = []
+    for part in text.split(","):
+        match = _WINDOW.match(part)
+        if match is None:
+            raise ValueError(f"invalid window {part!r}; expected HH:MM-HH:MM")
+        start_h, start_m, end_h, end_m = (int(value) for value in match.groups())
+        if start_h > 23 or end_h > 24 or start_m > 59 or end_m > 59 or (end_h == 24 and end_m):
+            raise ValueError(f"invalid time in {part!r}")
+        start = start_h * 3600 + start_m * 60
+        end = end_h * 3600 + end_m * 60
+        if end <= start:
+            end += DAY_SECONDS  # Runs past midnight
+        windows.append((start, end))
+    return windows
+
+def parse_holidays(text):
+    """Return the dates listed in a holidays file"""
+    dates = set()
+    for number, line in enumerate(text.splitlines(), 1):
+        words = line.split("#", 1)[0].split()
+        if not words:
+            continue
+        try:
+            dates.add(datetime.date.fromisoformat(words[0]))
+        except ValueError:
+            raise ValueError(f"line {number}: invalid date {words[0]!r}")
+    return dates
+
+class ActiveHours:
+    """Weekly windows with date exceptions and holidays"""
+    
+    def __init__(self, weekly, exceptions=None, holidays=None, tz=None):
+        self.weekly = weekly                # weekday -> [(start, end)]
+        self.exceptions = exceptions or {}  # date -> [(start, end)], [] is off
+        self.holidays = holidays or set()
+        self.tz = tz                        # tzinfo, or None for system local time
+    
+    @classmethod
+    def parse(cls, text, holidays=None, tz=None):
+        """Build a schedule from its text form; raises ValueError"""
+        weekly = {day: [] for day in range(7)}
+        exceptions = {}
+        for number, line in enumerate(re.split(r"[;\n]", text), 1):
+            words = line.split("#", 1)[0].split()
+            if not words:
+                continue
+            if len(words) != 2:
+                raise ValueError(f"rule {number}: expected 'DAYS HH:MM-HH:MM' or 'YYYY-MM-DD off'")
+            when, windows = words
+            try:
+                if _DATE.match(when):
+                    date = datetime.date.fromisoformat(when)
+                    exceptions[date] = [] if windows == "off" else parse_windows(windows)
+                else:
+                    parsed = parse_windows(windows)
+                    for day in parse_days(when.lower()):
+                        weekly[day].extend(parsed)
+            except ValueError as e:
+                raise ValueError(f"rule {number}: {e}")
+        return cls(weekly, exceptions, holidays, tz)
+    
+    def windows_on(self, date):
+        """Return the windows that start on date"""
+        if date in self.exceptions:
+            return self.exceptions[date]
+        if date in self.holidays:
+            return []
+        return self.weekly.get(date.weekday(), [])
+    
+    def _timestamp(self, date, seconds):
+        """Return the POSIX time of a wall-clock time seconds after midnight of date"""
+        midnight = datetime.datetime.combine(date, datetime.time(), tzinfo=self.tz)
+        # Wall-clock arithmetic: the offset is that of the resulting local time
+        return (midnight + datetime.timedelta(seconds=seconds)).timestamp()
+    
+    def intervals(self, first_date, days):
+        """Return the merged (start, end) POSIX times of windows starting in the date range"""
+        spans = []
+        for offset in range(days):
+            date = first_date + datetime.timedelta(days=offset)
+            spans.extend((self._timestamp(date, start), self._timestamp(date, end))
+                         for start, end in self.windows_on(date))
+        merged = []
+        for start, end in sorted(spans):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            elif end > start:
+                merged.append([start, end])
+        return merged
+    
+    def state_at(self, now):
+        """Return (active, next_transition) at POSIX time now
+        
+        next_transition is the POSIX time the state next flips, or None if it
+        stays the same for the whole lookahead.
+        """
+        today = datetime.datetime.fromtimestamp(now, self.tz).date()
+        # Windows from yesterday may run past midnight into today
+        start_date = today - datetime.timedelta(days=1)
+        for start, end in self.intervals(start_date, LOOKAHEAD_DAYS + 1):
+            if start <= now < end:
+                return True, end
+            if start > now:
+                return False, start
+        return False, None
+
+def load_zone(name):
+    """Return the ZoneInfo for an IANA name, or None for system local time"""
+    if not name:
+        return None
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        journal.error(f"Unknown schedule time zone {name!r}, using local time: {e}")
+        return None
+
+def load_schedule(text, holidays_file="", timezone=""):
+    """Return the ActiveHours for the settings, or None if no schedule is set
+    
+    Raises ValueError for an invalid schedule. An unreadable holidays file
+    is reported and ignored.
+    """
+    if not text.strip():
+        return None
+    holidays = set()
+    if holidays_file:
+        try:
+            with open(holidays_file) as f:
+                holidays = parse_holidays(f.read())
+        except (OSError, ValueError) as e:
+            journal.error(f"Error reading holidays file {holidays_file}: {e}")
+    return ActiveHours.parse(text, holidays, load_zone(timezone))
+
+class itimerspec(ctypes.Structure):
+    _fields_ = [
+        ("interval_sec", ctypes.c_long), ("interval_nsec", ctypes.c_long),
+        ("value_sec", ctypes.c_long), ("value_nsec", ctypes.c_long),
+    ]
+
+class RealtimeTimer:
+    """A CLOCK_REALTIME timerfd armed at absolute times and cancelled on clock changes"""
+    
+    def __init__(self):
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.libc.timerfd_settime.argtypes = [
+            ctypes.c_int, ctypes.c_int, ctypes.POINTER(itimerspec), ctypes.c_void_p
+        ]
+        self.fd = self.libc.timerfd_create(CLOCK_REALTIME, TFD_NONBLOCK | TFD_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "timerfd_create failed")
+    
+    def fileno(self):
+        return self.fd
+    
+    def arm(self, when):
+        """Fire at POSIX time when; None disarms"""
+        spec = itimerspec()
+        if when is not None:
+            spec.value_sec = int(when)
+            # An all-zero value would disarm; anything in the past fires at once
+            spec.value_nsec = int((when - int(when)) * 1e9) or 1
+        flags = TFD_TIMER_ABSTIME | TFD_TIMER_CANCEL_ON_SET
+        if self.libc.timerfd_settime(self.fd, flags, ctypes.byref(spec), None) < 0:
+            raise OSError(ctypes.get_errno(), "timerfd_settime failed")
+    
+    def consume(self):
+        """Read the expiry; return False if the wall clock was set instead"""
+        try:
+            os.read(self.fd, 8)
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            if e.errno == errno.ECANCELED:
+                return False
+            raise
+        return True
+    
+    def close(self):
+        os.close(self.fd)
+
+class ScheduleTimer:
+    """Reports active-hours transitions from a background thread
+    
+    on_transition(active) is called from the timer thread whenever the
+    schedule's state differs from the last one reported, starting with the
+    state at the moment a schedule is set.
+    """
+    
+    def __init__(self, on_transition):
+        self.on_transition = on_transition
+        self.schedule = None
+        self.active = None
+        self.next_transition = None
+        self.thread = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_r, self._wake_w = None, None
+    
+    def set_schedule(self, schedule):
+        """Follow a new ActiveHours, or stop following any for None"""
+        with self._lock:
+            self.schedule = schedule
+            self.active = None
+            self.next_transition = None
+        if schedule is None:
+            self.stop()
+        elif self.thread is None:
+            self._stop_event.clear()
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_w, False)
+            self.thread = threading.Thread(target=self._run, name="active-hours")
+            self.thread.daemon = True
+            self.thread.start()
+        else:
+            self._wake()
+    
+    def stop(self):
+        if self.thread is None:
+            return
+        self._stop_event.set()
+        self._wake()
+        self.thread.join(timeout=5)
+        self.thread = None
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+    
+    def _wake(self):
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass
+    
+    def status(self):
+        with self._lock:
+            if self.schedule is None:
+                return None
+            return {
+                "active": self.active,
+                "next_transition": (None if self.next_transition is None else
+                                    datetime.datetime.fromtimestamp(self.next_transition)
+                                    .astimezone().isoformat(timespec="seconds")),
+            }
+    
+    def _evaluate(self, not_before=0.0):
+        """Report the current state if it changed; return the next transition"""
+        with self._lock:
+            schedule = self.schedule
+        if schedule is None:
+            return None
+        # A timer can fire a hair before time.time() catches up with it
+        active, next_transition = schedule.state_at(max(time.time(), not_before))
+        with self._lock:
+            changed = active != self.active
+            self.active = active
+            self.next_transition = next_transition
+        if changed:
+            journal.info(f"Active hours {'begin' if active else 'end'}")
+            self.on_transition(active)
+        return next_transition
+    
+    def _run(self):
+        try:
+            timer = RealtimeTimer()
+        except (OSError, AttributeError) as e:
+            journal.error(f"timerfd unavailable, checking the schedule every "
+                          f"{FALLBACK_WAIT:.0f}s: {e}")
+            timer = None
+        selector = selectors.DefaultSelector()
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        if timer is not None:
+            selector.register(timer, selectors.EVENT_READ)
+        not_before = 0.0
+        try:
+            while not self._stop_event.is_set():
+                next_transition = self._evaluate(not_before)
+                timeout = None
+                if timer is not None:
+                    timer.arm(next_transition)
+                elif next_transition is not None:
+                    timeout = min(max(next_transition - time.time(), 0.0), FALLBACK_WAIT)
+                else:
+                    timeout = FALLBACK_WAIT
+                not_before = 0.0
+                for key, events in selector.select(timeout):
+                    if key.fileobj is timer:
+                        if timer.consume():
+                            not_before = next_transition or 0.0
+                        else:
+                            journal.info("Wall clock changed; rescheduling active hours")
+                    else:
+                        os.read(self._wake_r, 64)
+        finally:
+            selector.close()
+            if timer is not None:
+                timer.close()
@@ -1,53 +1,269 @@
-
+import json
 import os
 import sys
-import winreg as reg
-from PyQt5.QtCore import QSettings
+import tempfile
+import threading
 
-class SettingsService:
-    """Service for managing application settings"""
+from services.cursor_service import SPARSE_MARGIN
+from services.journal import journal
+from services.power_policy import BATTERY_WAKEUP_BUDGET
+
+# Seconds between the first unsaved change and the write-behind flush
+FLUSH_DELAY = 1.0
+
+# Seconds before a failed flush is tried again
+FLUSH_RETRY_DELAY = 30.0
+
+# Seconds a hidden settings window is kept before it is destroyed (-1: never)
+SETTINGS_WINDOW_TIMEOUT = 60
+
+class QSettingsBackend:
+    """Settings storage backed by QSettings (registry on Windows, INI elsewhere)"""
     
     def __init__(self):
+        from PyQt5.QtCore import QSettings
         self.settings = QSettings("CursorVibe", "CursorVibe")
-        
-        # Load settings with defaults
+    
+    def value(self, key, default, type):
+        return self.settings.value(key, default, type=type)
+    
+    def set_value(self, key, value):
+        self.settings.setValue(key, value)
+    
+    def sync(self):
+        self.settings.sync()
+    
+    def reload(self):
+        self.settings.sync()
+
+class FileSettingsBackend:
+    """Qt-free settings storage in a JSON file"""
+    
+    def __init__(self, path=None):
+        self.path = path or self.default_path()
+        self.values = {}
+        self.reload()
+    
+    @staticmethod
+    def default_path():
+        """Return the per-user settings file location"""
+        if sys.platform == "win32":
+            base = os.environ.get("APPDATA", os.path.expanduser("~"))
+        else:
+            base = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
+        return os.path.join(base, "CursorVibe", "CursorVibe.json")
+    
+    def value(self, key, default, type):
+        value = self.values.get(key, default)
+        try:
+            return type(value)
+        except (TypeError, ValueError):
+            return default
+    
+    def set_value(self, key, value):
+        self.values[key] = value
+    
+    def sync(self):
+        """Write all values with an atomic replace so readers never see a partial file"""
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".CursorVibe-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.values, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def reload(self):
+        try:
+            with open(self.path) as f:
+                self.values = json.load(f)
+        except FileNotFoundError:
+            self.values = {}
+        except (OSError, ValueError) as e:
+            journal.error(f"Error reading settings file {self.path}: {e}")
+
+class SettingsService:
+    """Service for managing application settings
+    
+    Saves are write-behind: they update the in-memory value and a dirty set,
+    and one coalescing timer flushes the whole set flush_delay seconds after
+    the first unsaved change. A slider drag therefore costs one storage
+    write instead of one per valueChanged. A flush_delay of 0 writes through.
+    The timer runs on loop (see services/event_loop.py) when given, else on
+    a threading.Timer. A flush that fails keeps its changes pending and is
+    tried again after FLUSH_RETRY_DELAY. Call flush() before quitting.
+    """
+    
+    def __init__(self, backend=None, loop=None, flush_delay=FLUSH_DELAY):
+        self.settings = backend or QSettingsBackend()
+        self.loop = loop
+        self.flush_delay = flush_delay
+        self.dirty = {}
+        self.flush_timer = None
+        self._lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        """Load settings with defaults"""
         self.movement_frequency = self.settings.value("frequency", 1.0, type=float)
         self.movement_distance = self.settings.value("distance", 2, type=int)
         self.idle_threshold = self.settings.value("idle_threshold", 3, type=int)
         self.run_on_startup = self.settings.value("run_on_startup", False, type=bool)
+        self.start_in_tray = self.settings.value("start_in_tray", False, type=bool)
+        self.settings_window_timeout = self.settings.value(
+            "settings_window_timeout", SETTINGS_WINDOW_TIMEOUT, type=int)
+        self.keep_awake_mode = self.settings.value("keep_awake_mode", "move", type=str)
+        self.input_backend = self.settings.value("input_backend", "auto", type=str)
+        self.metrics_textfile = self.settings.value("metrics_textfile", "", type=str)
+        self.metrics_port = self.settings.value("metrics_port", 0, type=int)
+        self.wakeup_budget = self.settings.value("wakeup_budget", BATTERY_WAKEUP_BUDGET, type=int)
+        self.log_file = self.settings.value("log_file", "", type=str)
+        self.pattern = self.settings.value("pattern", "jitter", type=str)
+        self.pattern_file = self.settings.value("pattern_file", "", type=str)
+        self.activity_trace = self.settings.value("activity_trace", "", type=str)
+        self.sparse_margin = self.settings.value("sparse_margin", SPARSE_MARGIN, type=int)
+        self.active_hours = self.settings.value("active_hours", "", type=str)
+        self.holidays_file = self.settings.value("holidays_file", "", type=str)
+        self.schedule_timezone = self.settings.value("schedule_timezone", "", type=str)
+        try:
+            # Per-display tuning found by feedback mode, as a JSON object
+            self.feedback_tuning = json.loads(self.settings.value("feedback_tuning", "{}", type=str))
+        except ValueError:
+            self.feedback_tuning = {}
+    
+    def reload(self):
+        """Re-read settings from storage, e.g. after the file was edited"""
+        self.flush()
+        self.settings.reload()
+        self.load()
+    
+    def pending(self):
+        """Return the changes not yet written to storage"""
+        with self._lock:
+            return dict(self.dirty)
+    
+    def flush(self):
+        """Write all pending changes to storage now"""
+        with self._lock:
+            dirty, self.dirty = self.dirty, {}
+            if self.flush_timer is not None:
+                self.flush_timer.cancel()
+                self.flush_timer = None
+        if not dirty:
+            return
+        try:
+            for key, value in dirty.items():
+                self.settings.set_value(key, value)
+            self.settings.sync()
+        except OSError as e:
+            journal.error(f"Error saving settings, retrying in {FLUSH_RETRY_DELAY:.0f}s: {e}")
+            with self._lock:
+                # Keep the unsaved values, except those changed again meanwhile
+                self.dirty = {**dirty, **self.dirty}
+                if self.flush_delay > 0:
+                    self._schedule_flush(max(self.flush_delay, FLUSH_RETRY_DELAY))
+    
+    def _schedule_flush(self, delay):
+        # Caller holds the lock
+        if self.flush_timer is not None:
+            return
+        if self.loop is not None:
+            self.flush_timer = self.loop.call_at(self.loop.time() + delay, self._timed_flush)
+        else:
+            self.flush_timer = threading.Timer(delay, self._timed_flush)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+    
+    def _save(self, key, value):
+        """Record a changed value and make sure a flush is scheduled"""
+        with self._lock:
+            self.dirty[key] = value
+            if self.flush_delay > 0:
+                self._schedule_flush(self.flush_delay)
+        if self.flush_delay <= 0:
+            self.flush()
+    
+    def _timed_flush(self):
+        with self._lock:
+            self.flush_timer = None
+        self.flush()
     
     def save_frequency(self, value):
         """Save the movement frequency setting"""
         self.movement_frequency = value
-        self.settings.setValue("frequency", value)
+        self._save("frequency", value)
     
     def save_distance(self, value):
         """Save the movement distance setting"""
         self.movement_distance = value
-        self.settings.setValue("distance", value)
+        self._save("distance", value)
     
     def save_idle_threshold(self, value):
         """Save the idle threshold setting"""
         self.idle_threshold = value
-        self.settings.setValue("idle_threshold", value)
+        self._save("idle_threshold", value)
+    
+    def save_keep_awake_mode(self, value):
+        """Save the keep-awake mode ("move", "inhibit" or "sparse" or "feedback")"""
+        self.keep_awake_mode = value
+        self._save("keep_awake_mode", value)
+    
+    def save_sparse_margin(self, value):
+        """Save how many seconds before the earliest idle timeout sparse mode moves"""
+        self.sparse_margin = value
+        self._save("sparse_margin", value)
+    
+    def save_feedback_tuning(self, display, tuning):
+        """Save the distance and interval feedback mode found for a display"""
+        self.feedback_tuning = {**self.feedback_tuning, display: tuning}
+        self._save("feedback_tuning", json.dumps(self.feedback_tuning))
+    
+    def save_active_hours(self, value):
+        """Save the active-hours schedule (see services/schedule.py; "" for always)"""
+        self.active_hours = value
+        self._save("active_hours", value)
+    
+    def load_schedule(self):
+        """Return the ActiveHours for the schedule settings, or None; raises ValueError"""
+        from services.schedule import load_schedule
+        return load_schedule(self.active_hours, self.holidays_file, self.schedule_timezone)
+    
+    def save_pattern(self, value):
+        """Save the movement pattern name"""
+        self.pattern = value
+        self._save("pattern", value)
+    
+    def save_wakeup_budget(self, value):
+        """Save the wakeups per minute allowed on battery (0 for no limit)"""
+        self.wakeup_budget = value
+        self._save("wakeup_budget", value)
     
     def save_run_on_startup(self, value):
         """Save the run on startup setting and update the registry"""
         self.run_on_startup = value
-        self.settings.setValue("run_on_startup", value)
+        self._save("run_on_startup", value)
         self.update_startup_registry()
     
     def update_startup_registry(self):
         """Update the Windows registry for startup"""
+        if sys.platform != "win32":
+            return
+        import winreg as reg
+        
         key_path = r"Software\Microsoft\Windows\CurrentVersion\Run"
         
         try:
             key = reg.OpenKey(reg.HKEY_CURRENT_USER, key_path, 0, reg.KEY_SET_VALUE)
             
             if self.run_on_startup:
-                # Get the path of the current script
+                # Get the path of the current script; logon starts go to the tray
                 app_path = os.path.abspath(sys.argv[0])
-                reg.SetValueEx(key, "CursorVibe", 0, reg.REG_SZ, app_path)
+                reg.SetValueEx(key, "CursorVibe", 0, reg.REG_SZ, f'"{app_path}" --tray')
             else:
                 try:
                     reg.DeleteValue(key, "CursorVibe")
@@ -56,7 +272,7 @@ class SettingsService:
             
             reg.CloseKey(key)
         except Exception as e:
-            print(f"Error updating registry: {e}")
+            journal.error(f"Error updating registry: {e}")
     
     def get_all_settings(self):
         """Get all settings as a dictionary"""
@@ -64,5 +280,21 @@ class SettingsService:
             "movement_frequency": self.movement_frequency,
             "movement_distance": self.movement_distance,
             "idle_threshold": self.idle_threshold,
-            "run_on_startup": self.run_on_startup
+            "run_on_startup": self.run_on_startup,
+            "start_in_tray": self.start_in_tray,
+            "settings_window_timeout": self.settings_window_timeout,
+            "keep_awake_mode": self.keep_awake_mode,
+            "input_backend": self.input_backend,
+            "metrics_textfile": self.metrics_textfile,
+            "metrics_port": self.metrics_port,
+            "wakeup_budget": self.wakeup_budget,
+            "log_file": self.log_file,
+            "pattern": self.pattern,
+            "pattern_file": self.pattern_file,
+            "activity_trace": self.activity_trace,
+            "sparse_margin": self.sparse_margin,
+            "feedback_tuning": self.feedback_tuning,
+            "active_hours": self.active_hours,
+            "holidays_file": self.holidays_file,
+            "schedule_timezone": self.schedule_timezone
         }
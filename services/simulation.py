@@ -0,0 +1,249 @@
+import re
+import time
+
+from services.cursor_service import MODE_MOVE, CursorService, InputBackend
+from services.event_loop import VirtualEventLoop
+from services.power_policy import POWER_AC, POWER_BATTERY, PowerPolicy
+from services.tracing import Tracer
+
+# Runs the real CursorService on a virtual clock.
+#
+# An activity trace is a time-ordered list of events: (t, INPUT) for user
+# input at t seconds, and (t, SUSPEND, seconds) for a machine that sleeps
+# at t. Traces come from a script of segments, a journal dump of a real
+# session, or a binary activity recording (services/activity_recorder.py).
+# A Simulation feeds the trace into the engine through a VirtualEventLoop
+# and a SimulatedPointer and reports every synthetic move, every engine
+# wakeup and every deadline that fired late. Each simulated move runs the
+# engine's full move path (journal, metrics, status), so a 24-hour day
+# takes about a second to simulate at one move per second and about a
+# third of a second at one move every five.
+#
+# Script syntax, one segment per line ('#' starts a comment):
+#
+#   active 2h          user input every second for two hours
+#   active 10m every 5s
+#   idle 45m           no input
+#   suspend 30m        the machine sleeps; no timers fire
+#
+# Durations are plain seconds or combinations like 90s, 15m, 1h30m.
+
+INPUT = "input"
+SUSPEND = "suspend"
+
+# A day with work, breaks, a suspended commute and two nights of idling
+WORKDAY_SCRIPT = """
+idle 8h
+active 2h
+idle 5m
+active 1h30m
+idle 45m  # lunch
+active 3h
+idle 20m
+active 1h
+suspend 30m
+idle 6h50m
+"""
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)([hms]?)")
+_UNITS = {"h": 3600, "m": 60, "s": 1, "": 1}
+
+def parse_duration(text):
+    """Return seconds for durations like 90, 45s, 15m or 1h30m"""
+    text = text.strip()
+    matches = list(_DURATION.finditer(text))
+    if not matches or "".join(match.group(0) for match in matches) != text:
+        raise ValueError(f"invalid duration {text!r}")
+    return sum(float(match.group(1)) * _UNITS[match.group(2)] for match in matches)
+
+def parse_script(text):
+    """Turn a trace script into a list of events"""
+    events = []
+    now = 0.0
+    for number, line in enumerate(text.splitlines(), 1):
+        words = line.split("#", 1)[0].split()
+        if not words:
+            continue
+        try:
+            kind, duration = words[0], parse_duration(words[1])
+            every = 1.0
+            if len(words) == 4 and words[2] == "every":
+                every = parse_duration(words[3])
+            elif len(words) != 2:
+                raise ValueError("expected 'KIND DURATION [every INTERVAL]'")
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"line {number}: {e}")
+        if kind == "active":
+            count = int(duration // every)
+            events.extend((now + i * every, INPUT) for i in range(count))
+        elif kind == SUSPEND:
+            events.append((now, SUSPEND, duration))
+        elif kind != "idle":
+            raise ValueError(f"line {number}: unknown segment {kind!r}")
+        now += duration
+    return events, now
+
+def load_journal_trace(path):
+    """Read the activity events of a journal dump (services/journal.py)
+    
+    Times are relative to the first record; a dump spanning midnight is
+    unwrapped.
+    """
+    events = []
+    start = previous = None
+    offset = 0.0
+    with open(path) as f:
+        for line in f:
+            words = line.split()
+            if len(words) < 2:
+                continue
+            try:
+                hours, minutes, seconds = words[0].split(":")
+                clock = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+            except ValueError:
+                continue
+            if previous is not None and clock < previous - 43200:
+                offset += 86400
+            previous = clock
+            if start is None:
+                start = clock
+            if words[1] == "activity":
+                events.append((clock + offset - start, INPUT))
+    duration = events[-1][0] if events else 0.0
+    return events, duration
+
+def load_activity_recording(path):
+    """Read the activity records of a binary recording and its rotated segments"""
+    from services.activity_recorder import KIND_ACTIVITY, read_trace
+    times = []
+    for segment in read_trace(path):
+        activity = segment.records["kind"] == KIND_ACTIVITY
+        times.extend(segment.wall_times()[activity].tolist())
+        segment.close()
+    if not times:
+        return [], 0.0
+    start = times[0]
+    events = [(t - start, INPUT) for t in times]
+    return events, events[-1][0]
+
+class SimulatedPointer(InputBackend):
+    """Input backend that records moves against the simulation clock"""
+    
+    name = "simulated"
+    
+    def __init__(self, clock):
+        self.clock = clock
+        self.x = self.y = 0
+        self.moves = []
+    
+    def position(self):
+        return self.x, self.y
+    
+    def move_relative(self, dx, dy):
+        self.x += dx
+        self.y += dy
+        self.moves.append((self.clock(), dx, dy))
+
+class ScriptedActivity:
+    """Activity source stand-in; the simulation reports input itself"""
+    
+    name = "script"
+    
+    def start(self):
+        pass
+    
+    def stop(self):
+        pass
+
+class SimulationReport:
+    """What the engine did during one simulated run"""
+    
+    def __init__(self, duration, moves, wakeups, missed, inputs, elapsed):
+        self.duration = duration
+        self.moves = moves      # (time, dx, dy)
+        self.wakeups = wakeups  # engine timer firing times
+        self.missed = missed    # (deadline, fired) of late timers
+        self.inputs = inputs    # user input times
+        self.elapsed = elapsed  # real seconds the simulation took
+    
+    def longest_gap(self):
+        """Return the longest stretch without user input or a synthetic move"""
+        times = sorted([0.0, self.duration] + self.inputs + [move[0] for move in self.moves])
+        return max(later - earlier for earlier, later in zip(times, times[1:]))
+    
+    def summary(self):
+        return {
+            "moves": len(self.moves),
+            "wakeups": len(self.wakeups),
+            "missed": len(self.missed),
+            "longest_gap": round(self.longest_gap(), 3),
+            "elapsed": round(self.elapsed, 3),
+        }
+    
+    def timeline(self):
+        """Yield (time, kind, detail) for every move, wakeup and missed deadline"""
+        entries = [(t, "wakeup", "") for t in self.wakeups]
+        entries += [(t, "move", f"dx={dx} dy={dy}") for t, dx, dy in self.moves]
+        entries += [(fired, "missed", f"deadline={deadline:.3f} late={fired - deadline:.3f}s")
+                    for deadline, fired in self.missed]
+        return sorted(entries, key=lambda entry: entry[0])
+
+class Simulation:
+    """Replays an activity trace through a real CursorService on a virtual clock
+    
+    wakeup_budget simulates running on battery with that many wakeups per
+    minute. A timer that fires more than tolerance seconds after its
+    deadline counts as missed; only suspends make that happen.
+    """
+    
+    def __init__(self, events, duration, frequency=1.0, distance=2, idle_threshold=3,
+                 pattern="jitter", seed=0, wakeup_budget=None, tolerance=0.0):
+        self.events = events
+        self.duration = duration
+        self.settings = {
+            "frequency": frequency,
+            "distance": distance,
+            "idle_threshold": idle_threshold,
+            "pattern": pattern,
+        }
+        self.seed = seed
+        self.wakeup_budget = wakeup_budget
+        self.tolerance = tolerance
+    
+    def run(self):
+        started = time.perf_counter()
+        loop = VirtualEventLoop()
+        pointer = SimulatedPointer(loop.time)
+        power_policy = PowerPolicy(battery_budget=self.wakeup_budget or 0)
+        power_policy.power_state = POWER_BATTERY if self.wakeup_budget else POWER_AC
+        service = CursorService(mode=MODE_MOVE, loop=loop, input_backend=pointer,
+                                tracer=Tracer(), power_policy=power_policy, seed=self.seed)
+        service.activity_source = ScriptedActivity()
+        # The virtual loop has no real timers to slacken
+        service.timer_slack = power_policy.timer_slack()
+        service.update_settings(**self.settings)
+        
+        wakeups, missed, inputs = [], [], []
+        
+        def on_timer(deadline, fired):
+            wakeups.append(fired)
+            if fired - deadline > self.tolerance:
+                missed.append((deadline, fired))
+        
+        loop.on_timer = on_timer
+        service.start_simulation()
+        for event in self.events:
+            if event[0] > self.duration:
+                break
+            loop.run_until(event[0])
+            if event[1] == INPUT:
+                inputs.append(event[0])
+                service.record_activity(event[0])
+            else:
+                loop.skip(event[2])
+        loop.run_until(self.duration)
+        # The return-to-origin move on stop is not a keep-alive
+        moves = list(pointer.moves)
+        service.stop_simulation()
+        return SimulationReport(self.duration, moves, wakeups, missed, inputs,
+                                time.perf_counter() - started)
@@ -0,0 +1,120 @@
+import threading
+import time
+
+# Live status of the keep-alive engine for displays that want it.
+#
+# CursorService publishes into its StatusBus as it works: start and stop,
+# every move, every input the activity sources report (from their own
+# threads) and its errors. Publishing only overwrites a few fields under a
+# lock. The notify callback runs on the first change after a snapshot was
+# taken and not again until the next snapshot(), so a consumer is woken
+# once however often the engine publishes in between, and a consumer that
+# stops taking snapshots costs the engine nothing more. Ages such as the
+# idle time are worked out when the snapshot is taken, so they need no
+# publishing at all.
+
+class StatusBus:
+    """Thread-safe latest status of one engine with coalesced change notification
+    
+    notify() is called from the publishing thread and must only hand the
+    wake-up over to the consumer, e.g. by emitting a queued Qt signal.
+    """
+    
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.notify = None
+        self.pending = False
+        self.active = False
+        self.mode = None
+        self.moves = 0
+        self.last_move = None
+        self.last_activity = None
+        self.error = None
+        self.errors = 0
+        self._lock = threading.Lock()
+    
+    def _changed(self):
+        # Caller holds the lock; returns the callback to run once it is released
+        if self.pending or self.notify is None:
+            return None
+        self.pending = True
+        return self.notify
+    
+    def _publish(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            notify = self._changed()
+        if notify is not None:
+            notify()
+    
+    def publish_start(self, mode, timestamp=None):
+        """The engine started in mode; timestamp starts the idle time, if tracked"""
+        self._publish(active=True, mode=mode, moves=0, last_move=None,
+                      last_activity=timestamp)
+    
+    def publish_stop(self):
+        self._publish(active=False, mode=None)
+    
+    def publish_move(self, timestamp):
+        with self._lock:
+            self.moves += 1
+            self.last_move = timestamp
+            notify = self._changed()
+        if notify is not None:
+            notify()
+    
+    def publish_activity(self, timestamp):
+        with self._lock:
+            self.last_activity = timestamp
+            notify = self._changed()
+        if notify is not None:
+            notify()
+    
+    def publish_error(self, text):
+        with self._lock:
+            self.errors += 1
+            self.error = text
+            notify = self._changed()
+        if notify is not None:
+            notify()
+    
+    def snapshot(self):
+        """Return the current status as a dict and re-arm notification
+        
+        idle and since_move are seconds as of now, or None when unknown.
+        """
+        now = self.clock()
+        with self._lock:
+            self.pending = False
+            status = {
+                "active": self.active,
+                "mode": self.mode,
+                "moves": self.moves,
+                "idle": None,
+                "since_move": None,
+                "error": self.error,
+                "errors": self.errors,
+            }
+            if self.active and self.last_activity is not None:
+                status["idle"] = max(0.0, now - self.last_activity)
+            if self.active and self.last_move is not None:
+                status["since_move"] = max(0.0, now - self.last_move)
+        return status
+
+def describe_status(status):
+    """Return a one-line summary of a snapshot for tooltips and labels"""
+    if not status["active"]:
+        return "Not running"
+    parts = []
+    if status["idle"] is not None:
+        parts.append(f"idle {status['idle']:.0f}s")
+    if status["mode"] != "inhibit":
+        moves = status["moves"]
+        parts.append(f"{moves} move{'s' if moves != 1 else ''}")
+        if status["since_move"] is not None:
+            parts.append(f"last {status['since_move']:.0f}s ago")
+    if status["errors"]:
+        errors = status["errors"]
+        parts.append(f"{errors} error{'s' if errors != 1 else ''}")
+    return ", ".join(parts).capitalize() if parts else "Running"
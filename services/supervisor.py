@@ -0,0 +1,360 @@
+import bisect
+import hashlib
+import multiprocessing
+import os
+import signal
+import time
+
+from services import x11
+from services.journal import journal
+from services.metrics import Metrics
+
+# Shards display targets across worker processes.
+#
+# A single DisplayManager keeps every target on one core; past a few
+# thousand sessions the X round trips of the idle checks saturate it. The
+# Supervisor runs one worker process per core, each with its own
+# HeapEventLoop and DisplayManager, and assigns every target to a worker by
+# consistent hashing of the display name. When a worker dies its targets
+# move to the survivors straight away and a replacement is spawned; once the
+# replacement is ready only the targets that hash to it move back.
+#
+# Supervisor and workers talk over one multiprocessing pipe per worker:
+#
+#   supervisor -> worker   ("add", name, settings), ("update", name, settings),
+#                          ("remove", name), ("stop",)
+#   worker -> supervisor   ("ready",), ("health", stats), ("dropped", name, message)
+#
+# The Supervisor has the DisplayManager interface (add_target, update_target,
+# remove_target, targets, status, close), so the control socket drives it
+# unchanged.
+
+# Points per worker on the hash ring; more points even out the shares
+VIRTUAL_NODES = 100
+
+# Seconds between worker health reports
+HEALTH_INTERVAL = 5.0
+
+# A worker silent for this long is killed and replaced
+HEALTH_TIMEOUT = 3 * HEALTH_INTERVAL
+
+# Delay before replacing a dead worker, doubled while replacements keep dying
+RESPAWN_DELAY = 1.0
+RESPAWN_MAX_DELAY = 60.0
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+class HashRing:
+    """Consistent hash ring mapping keys to nodes"""
+    
+    def __init__(self, virtual_nodes=VIRTUAL_NODES):
+        self.virtual_nodes = virtual_nodes
+        self.points = []  # Sorted (hash, node)
+        self.nodes = set()
+    
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for replica in range(self.virtual_nodes):
+            bisect.insort(self.points, (_hash(f"{node}#{replica}"), node))
+    
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        self.points = [point for point in self.points if point[1] != node]
+    
+    def lookup(self, key):
+        """Return the node owning key, or None when the ring is empty"""
+        if not self.points:
+            return None
+        index = bisect.bisect(self.points, (_hash(key),))
+        return self.points[index % len(self.points)][1]
+
+def worker_main(worker_id, conn):
+    """Worker process entry point: serve targets until told to stop or orphaned"""
+    import resource  # Unix only; importing it at module level breaks --headless on Windows
+    
+    from services.display_manager import DisplayManager
+    from services.event_loop import HeapEventLoop
+    
+    # Ctrl-C reaches the whole process group; the supervisor decides when we stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    loop = HeapEventLoop()
+    
+    def send(message):
+        try:
+            conn.send(message)
+        except OSError:
+            loop.stop()  # Supervisor is gone
+    
+    manager = DisplayManager(loop, on_drop=lambda name, message: send(("dropped", name, message)))
+    
+    def report_health():
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        send(("health", {
+            "pid": os.getpid(),
+            "targets": len(manager.targets),
+            "moves": manager.metrics.moves.value,
+            "idle_checks": manager.metrics.idle_checks.value,
+            "wakeups": manager.metrics.loop_jitter.count,
+            "cpu_seconds": usage.ru_utime + usage.ru_stime,
+            "max_rss_bytes": usage.ru_maxrss * 1024,
+        }))
+        loop.call_at(loop.time() + HEALTH_INTERVAL, report_health)
+    
+    def handle(message):
+        command, args = message[0], message[1:]
+        if command == "add":
+            name, settings = args
+            try:
+                manager.add_target(name, **settings)
+            except (x11.X11Error, ValueError) as e:
+                send(("dropped", name, str(e)))
+        elif command == "update":
+            name, settings = args
+            if name in manager.targets:
+                manager.update_target(name, **settings)
+        elif command == "remove":
+            if args[0] in manager.targets:
+                manager.remove_target(args[0])
+        elif command == "stop":
+            manager.close()
+            loop.stop()
+    
+    def on_readable():
+        try:
+            while conn.poll():
+                handle(conn.recv())
+        except (EOFError, OSError):
+            manager.close()
+            loop.stop()
+    
+    loop.add_reader(conn.fileno(), on_readable)
+    send(("ready",))
+    report_health()
+    loop.run_forever()
+    conn.close()
+
+class SupervisedTarget:
+    """A display target as the supervisor sees it"""
+    
+    def __init__(self, display_name, settings):
+        self.display_name = display_name
+        self.settings = settings
+        self.worker_id = None
+    
+    def status(self):
+        status = {"display": self.display_name, "worker": self.worker_id}
+        status.update(self.settings)
+        return status
+
+class WorkerHandle:
+    """Supervisor-side state of one worker process"""
+    
+    def __init__(self, worker_id, process, conn):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.started = time.monotonic()
+        self.last_health = self.started
+        self.ready = False
+        self.alive = True
+        self.health = {}
+    
+    def send(self, message):
+        try:
+            self.conn.send(message)
+        except OSError:
+            pass  # The sentinel reports the death
+
+class Supervisor:
+    """Runs display targets in worker processes, one per core by default
+    
+    All methods must run on the loop thread; the loop must be a
+    HeapEventLoop, which can wait on the worker pipes.
+    """
+    
+    def __init__(self, loop, workers=None, metrics=None):
+        self.loop = loop
+        self.worker_count = workers or os.cpu_count() or 1
+        self.metrics = metrics or Metrics()
+        self.context = multiprocessing.get_context("spawn")  # No inherited threads or sockets
+        self.ring = HashRing()
+        self.workers = {}  # worker_id -> WorkerHandle
+        self.targets = {}
+        self.respawn_delays = {}
+        self.restarts = {}
+        self.watchdog = None
+        self.closing = False
+    
+    def start(self):
+        for worker_id in range(self.worker_count):
+            self._spawn(worker_id)
+        self.watchdog = self.loop.call_at(self.loop.time() + HEALTH_INTERVAL, self._check_health)
+        journal.info(f"Supervising {self.worker_count} worker processes")
+    
+    def add_target(self, display_name, **settings):
+        """Assign display_name to a worker; connection errors arrive later as drops"""
+        if display_name in self.targets:
+            raise ValueError(f"display {display_name} is already a target")
+        target = SupervisedTarget(display_name, settings)
+        self.targets[display_name] = target
+        self._assign(target)
+        journal.info(f"Added display {display_name}")
+        return target
+    
+    def update_target(self, display_name, **settings):
+        target = self.targets[display_name]
+        target.settings.update((key, value) for key, value in settings.items() if value is not None)
+        if target.worker_id is not None:
+            self.workers[target.worker_id].send(("update", display_name, settings))
+    
+    def remove_target(self, display_name):
+        target = self.targets.pop(display_name)
+        if target.worker_id is not None:
+            self.workers[target.worker_id].send(("remove", display_name))
+        journal.info(f"Removed display {display_name}")
+    
+    def close(self):
+        """Stop every worker, waiting briefly before killing stragglers"""
+        self.closing = True
+        if self.watchdog is not None:
+            self.watchdog.cancel()
+            self.watchdog = None
+        handles = list(self.workers.values())
+        for handle in handles:
+            handle.send(("stop",))
+        deadline = time.monotonic() + 2
+        for handle in handles:
+            handle.process.join(max(0, deadline - time.monotonic()))
+            if handle.process.is_alive():
+                handle.process.kill()
+                handle.process.join()
+            self._forget(handle)
+        self.workers = {}
+    
+    def status(self):
+        return [target.status() for target in self.targets.values()]
+    
+    def worker_status(self):
+        """Return the latest health report of every worker"""
+        now = time.monotonic()
+        return [{
+            "worker": handle.worker_id,
+            "pid": handle.process.pid,
+            "ready": handle.ready,
+            "assigned": sum(1 for target in self.targets.values()
+                            if target.worker_id == handle.worker_id),
+            "restarts": self.restarts.get(handle.worker_id, 0),
+            "last_report": round(now - handle.last_health, 1),
+            **handle.health,
+        } for handle in sorted(self.workers.values(), key=lambda handle: handle.worker_id)]
+    
+    def _spawn(self, worker_id):
+        if self.closing:
+            return
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=worker_main, args=(worker_id, child_conn),
+                                       name=f"cursorvibe-worker-{worker_id}", daemon=True)
+        process.start()
+        child_conn.close()
+        handle = WorkerHandle(worker_id, process, parent_conn)
+        self.workers[worker_id] = handle
+        self.loop.add_reader(parent_conn.fileno(), lambda: self._on_readable(handle))
+        self.loop.add_reader(process.sentinel, lambda: self._on_exit(handle))
+    
+    def _forget(self, handle):
+        self.loop.remove_reader(handle.conn.fileno())
+        self.loop.remove_reader(handle.process.sentinel)
+        handle.conn.close()
+    
+    def _on_readable(self, handle):
+        try:
+            while handle.conn.poll():
+                self._handle_message(handle, handle.conn.recv())
+        except (EOFError, OSError):
+            self._on_exit(handle)
+    
+    def _handle_message(self, handle, message):
+        kind = message[0]
+        if kind == "ready":
+            handle.ready = True
+            self.ring.add(handle.worker_id)
+            self._rebalance()
+        elif kind == "health":
+            handle.health = message[1]
+            handle.last_health = time.monotonic()
+            if handle.last_health - handle.started > HEALTH_INTERVAL:
+                self.respawn_delays.pop(handle.worker_id, None)  # Stable again
+            self._export_health(handle)
+        elif kind == "dropped":
+            name, error = message[1], message[2]
+            target = self.targets.get(name)
+            if target is not None and target.worker_id == handle.worker_id:
+                del self.targets[name]
+                journal.error(f"Dropping display {name}: {error}")
+    
+    def _on_exit(self, handle):
+        if not handle.alive:
+            return
+        handle.alive = False
+        self._forget(handle)
+        handle.process.join()
+        if self.workers.get(handle.worker_id) is handle:
+            del self.workers[handle.worker_id]
+        if self.closing:
+            return
+        
+        journal.error(f"Worker {handle.worker_id} exited with code {handle.process.exitcode}")
+        self.ring.remove(handle.worker_id)
+        for target in self.targets.values():
+            if target.worker_id == handle.worker_id:
+                target.worker_id = None
+        self._rebalance()
+        
+        self.restarts[handle.worker_id] = self.restarts.get(handle.worker_id, 0) + 1
+        self.metrics.counter("cursorvibe_worker_restarts_total", "Worker processes replaced",
+                             worker=str(handle.worker_id)).inc()
+        delay = self.respawn_delays.get(handle.worker_id, RESPAWN_DELAY)
+        self.respawn_delays[handle.worker_id] = min(delay * 2, RESPAWN_MAX_DELAY)
+        self.loop.call_at(self.loop.time() + delay, lambda: self._spawn(handle.worker_id))
+    
+    def _check_health(self):
+        now = time.monotonic()
+        for handle in list(self.workers.values()):
+            if handle.alive and now - handle.last_health > HEALTH_TIMEOUT:
+                journal.error(f"Worker {handle.worker_id} stopped reporting; killing it")
+                handle.process.kill()  # The sentinel triggers the replacement
+        self.watchdog = self.loop.call_at(self.loop.time() + HEALTH_INTERVAL, self._check_health)
+    
+    def _assign(self, target):
+        worker_id = self.ring.lookup(target.display_name)
+        target.worker_id = worker_id
+        if worker_id is not None:
+            self.workers[worker_id].send(("add", target.display_name, target.settings))
+    
+    def _rebalance(self):
+        """Move every target whose ring owner changed; unassigned targets get one"""
+        for target in self.targets.values():
+            owner = self.ring.lookup(target.display_name)
+            if owner == target.worker_id:
+                continue
+            if target.worker_id is not None:
+                self.workers[target.worker_id].send(("remove", target.display_name))
+            self._assign(target)
+    
+    def _export_health(self, handle):
+        worker = str(handle.worker_id)
+        health = handle.health
+        metrics = self.metrics
+        metrics.gauge("cursorvibe_worker_targets", "Display targets served by a worker",
+                      worker=worker).set(health["targets"])
+        metrics.gauge("cursorvibe_worker_moves", "Keep-alive moves by the current worker process",
+                      worker=worker).set(health["moves"])
+        metrics.gauge("cursorvibe_worker_cpu_seconds", "CPU time of the current worker process",
+                      worker=worker).set(round(health["cpu_seconds"], 3))
+        metrics.gauge("cursorvibe_worker_max_rss_bytes", "Peak RSS of the current worker process",
+                      worker=worker).set(health["max_rss_bytes"])
@@ -3,11 +3,21 @@ from PyQt5.QtWidgets import QSystemTrayIcon, QMenu, QAction
 from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import Qt
 
+MODE_LABELS = {
+    "move": "Mode: Cursor movement",
+    "inhibit": "Mode: Sleep inhibitor",
+    "sparse": "Mode: Move before lock",
+    "feedback": "Mode: Self-tuning movement",
+}
+
 class SystemTrayService:
     """Service for managing the system tray icon and menu"""
     
     def __init__(self, parent=None):
         self.parent = parent
+        self.show_callback = None
+        self.power_text = None
+        self.live_text = None
         
         # Create the system tray icon
         self.tray_icon = QSystemTrayIcon(parent)
@@ -27,36 +37,18 @@ class SystemTrayService:
     
     def setup_menu(self):
         """Set up the system tray menu"""
-        # Define colors for menu styling
-        colors = {
-            "card": "#FFFFFF",
-            "border": "#DEE2E6",
-            "primary": "#0ACDFF",
-        }
-        
-        self.tray_menu.setStyleSheet(f"""
-            QMenu {{
-                background-color: {colors["card"]};
-                border: 1px solid {colors["border"]};
-                border-radius: 4px;
-                padding: 5px;
-            }}
-            QMenu::item {{
-                padding: 6px 25px 6px 20px;
-                border-radius: 3px;
-                margin: 2px;
-            }}
-            QMenu::item:selected {{
-                background-color: {colors["primary"]};
-                color: white;
-            }}
-        """)
+        # Styled by the application stylesheet (ui/custom_widgets.py)
+        self.tray_menu.setProperty("role", "tray")
         
         # Add actions to the menu
         self.status_action = QAction("Status: Inactive", self.parent)
         self.status_action.setEnabled(False)
         self.tray_menu.addAction(self.status_action)
         
+        self.mode_action = QAction(MODE_LABELS["move"], self.parent)
+        self.mode_action.setEnabled(False)
+        self.tray_menu.addAction(self.mode_action)
+        
         self.tray_menu.addSeparator()
         
         self.toggle_action = QAction("Start", self.parent)
@@ -67,11 +59,26 @@ class SystemTrayService:
         
         self.tray_menu.addSeparator()
         
+        # Diagnostics
+        self.trace_action = QAction("Trace Scheduler", self.parent)
+        self.trace_action.setCheckable(True)
+        self.tray_menu.addAction(self.trace_action)
+        
+        self.dump_trace_action = QAction("Save Trace", self.parent)
+        self.tray_menu.addAction(self.dump_trace_action)
+        
+        self.dump_events_action = QAction("Save Recent Events", self.parent)
+        self.tray_menu.addAction(self.dump_events_action)
+        
+        self.tray_menu.addSeparator()
+        
         self.quit_action = QAction("Quit", self.parent)
         self.tray_menu.addAction(self.quit_action)
     
-    def update_status(self, is_active):
-        """Update the status text in the menu"""
+    def update_status(self, is_active, mode=None):
+        """Update the status and keep-awake mode text in the menu"""
+        if mode is not None:
+            self.mode_action.setText(MODE_LABELS.get(mode, f"Mode: {mode}"))
         if is_active:
             self.status_action.setText("Status: Active")
             self.toggle_action.setText("Stop")
@@ -79,16 +86,50 @@ class SystemTrayService:
             self.status_action.setText("Status: Inactive")
             self.toggle_action.setText("Start")
     
-    def connect_signals(self, toggle_callback, show_callback, quit_callback):
+    def update_power(self, text):
+        """Show the power state and effective cadence in the tooltip"""
+        self.power_text = text
+        self.update_tooltip()
+    
+    def update_live(self, text):
+        """Show the live engine status in the tooltip"""
+        if text != self.live_text:
+            self.live_text = text
+            self.update_tooltip()
+    
+    def update_tooltip(self):
+        lines = ["CursorVibe"] + [text for text in (self.live_text, self.power_text) if text]
+        self.tray_icon.setToolTip("\n".join(lines))
+    
+    def set_tracing(self, enabled):
+        """Reflect the tracer state in the menu"""
+        self.trace_action.setChecked(enabled)
+    
+    def show_message(self, title, message):
+        """Show a short notification from the tray icon"""
+        self.tray_icon.showMessage(title, message, QSystemTrayIcon.Information, 5000)
+    
+    def connect_signals(self, toggle_callback, show_callback, quit_callback,
+                        trace_callback=None, dump_trace_callback=None,
+                        dump_events_callback=None, menu_callback=None):
         """Connect menu actions to callbacks"""
         self.toggle_action.triggered.connect(toggle_callback)
+        self.show_callback = show_callback
         self.show_action.triggered.connect(show_callback)
         self.quit_action.triggered.connect(quit_callback)
+        if trace_callback is not None:
+            self.trace_action.toggled.connect(trace_callback)
+        if dump_trace_callback is not None:
+            self.dump_trace_action.triggered.connect(dump_trace_callback)
+        if dump_events_callback is not None:
+            self.dump_events_action.triggered.connect(dump_events_callback)
+        if menu_callback is not None:
+            self.tray_menu.aboutToShow.connect(menu_callback)
         self.tray_icon.activated.connect(self.icon_activated)
     
     def icon_activated(self, reason):
         """Handle tray icon activation"""
         if reason == QSystemTrayIcon.DoubleClick:
-            # Show the main window when the tray icon is double-clicked
-            if self.parent and hasattr(self.parent, 'show'):
-                self.parent.show()
+            # Show the settings window when the tray icon is double-clicked
+            if self.show_callback is not None:
+                self.show_callback()
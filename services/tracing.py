@@ -0,0 +1,99 @@
+import collections
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Opt-in span tracing for the scheduler hot path.
+#
+# Callers guard every span with one attribute check so that tracing costs
+# nothing measurable when it is off:
+#
+#   traced = tracer.enabled and tracer.sample()
+#   if traced:
+#       start = tracer.now()
+#   ...
+#   if traced:
+#       tracer.record("move", start)
+#
+# Spans land in a bounded ring buffer (the oldest are dropped) and can be
+# dumped as Chrome trace-event JSON for chrome://tracing or Perfetto.
+# CURSORVIBE_TRACE=N turns tracing on at startup, keeping one scheduler
+# step in N (1 traces every step).
+
+TRACE_ENV = "CURSORVIBE_TRACE"
+
+# Spans kept in memory; about 100 bytes each
+TRACE_CAPACITY = 100000
+
+class Tracer:
+    """Collects sampled timing spans in a ring buffer"""
+    
+    def __init__(self, enabled=False, sample_every=1, capacity=TRACE_CAPACITY):
+        self.enabled = enabled
+        self.sample_every = max(1, sample_every)
+        self.spans = collections.deque(maxlen=capacity)
+        self._counter = 0
+        self._pid = os.getpid()
+    
+    @classmethod
+    def from_environment(cls):
+        """Create a tracer configured by the CURSORVIBE_TRACE variable"""
+        value = os.environ.get(TRACE_ENV, "")
+        try:
+            sample_every = int(value)
+        except ValueError:
+            sample_every = 0
+        return cls(enabled=sample_every > 0, sample_every=sample_every or 1)
+    
+    def enable(self, sample_every=None):
+        if sample_every is not None:
+            self.sample_every = max(1, sample_every)
+        self.enabled = True
+    
+    def disable(self):
+        self.enabled = False
+    
+    def sample(self):
+        """Return True for one call in every sample_every"""
+        self._counter += 1
+        return self._counter % self.sample_every == 0
+    
+    def now(self):
+        return time.perf_counter()
+    
+    def record(self, name, start, end=None, **args):
+        """Store a completed span; start and end come from now()"""
+        if end is None:
+            end = time.perf_counter()
+        self.spans.append((name, start, end, threading.get_ident(), args))
+    
+    def clear(self):
+        self.spans.clear()
+    
+    def chrome_trace(self):
+        """Return the buffered spans as a Chrome trace-event document"""
+        events = []
+        for name, start, end, thread_id, args in list(self.spans):
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self._pid,
+                "tid": thread_id,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+    
+    def dump(self, path=None):
+        """Write the trace to path (a new file in the temp directory by default)"""
+        if path is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(tempfile.gettempdir(), f"cursorvibe-trace-{stamp}.json")
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
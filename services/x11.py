@@ -0,0 +1,272 @@
+import ctypes
+import ctypes.util
+import os
+import select
+
+# Thin ctypes bindings for the handful of Xlib extension calls CursorVibe
+# needs. Libraries are loaded lazily so importing this module never touches
+# the X server and works on machines without X libraries installed.
+
+_libraries = {}
+
+class X11Error(Exception):
+    """Raised when an X11 library or display is unavailable"""
+
+def load_library(name):
+    """Load and cache an X11 shared library such as 'X11' or 'Xss'"""
+    if name not in _libraries:
+        path = ctypes.util.find_library(name)
+        if path is None:
+            raise X11Error(f"lib{name} not found")
+        _libraries[name] = ctypes.CDLL(path)
+    return _libraries[name]
+
+class XScreenSaverInfo(ctypes.Structure):
+    _fields_ = [
+        ("window", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+        ("kind", ctypes.c_int),
+        ("til_or_since", ctypes.c_ulong),
+        ("idle", ctypes.c_ulong),
+        ("event_mask", ctypes.c_ulong),
+    ]
+
+class XIEventMask(ctypes.Structure):
+    _fields_ = [
+        ("deviceid", ctypes.c_int),
+        ("mask_len", ctypes.c_int),
+        ("mask", ctypes.POINTER(ctypes.c_ubyte)),
+    ]
+
+class XGenericEventCookie(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("extension", ctypes.c_int),
+        ("evtype", ctypes.c_int),
+        ("cookie", ctypes.c_uint),
+        ("data", ctypes.c_void_p),
+    ]
+
+class XIRawEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("extension", ctypes.c_int),
+        ("evtype", ctypes.c_int),
+        ("time", ctypes.c_ulong),
+        ("deviceid", ctypes.c_int),
+        ("sourceid", ctypes.c_int),
+    ]
+
+class XIDeviceInfo(ctypes.Structure):
+    _fields_ = [
+        ("deviceid", ctypes.c_int),
+        ("name", ctypes.c_char_p),
+        ("use", ctypes.c_int),
+        ("attachment", ctypes.c_int),
+        ("enabled", ctypes.c_int),
+        ("num_classes", ctypes.c_int),
+        ("classes", ctypes.c_void_p),
+    ]
+
+class XEvent(ctypes.Union):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("xcookie", XGenericEventCookie),
+        ("pad", ctypes.c_long * 24),
+    ]
+
+class Display:
+    """An open connection to an X server"""
+    
+    def __init__(self, name=None):
+        self.xlib = load_library("X11")
+        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self.xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self.xlib.XConnectionNumber.argtypes = [ctypes.c_void_p]
+        self.xlib.XPending.argtypes = [ctypes.c_void_p]
+        self.xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.POINTER(XEvent)]
+        self.xlib.XFlush.argtypes = [ctypes.c_void_p]
+        self.xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xlib.XFree.argtypes = [ctypes.c_void_p]
+        
+        self._fake_motion = None
+        
+        self.name = name or os.environ.get("DISPLAY")
+        encoded = self.name.encode() if self.name else None
+        self.handle = self.xlib.XOpenDisplay(encoded)
+        if not self.handle:
+            raise X11Error(f"Cannot open display {self.name!r}")
+        self.root = self.xlib.XDefaultRootWindow(self.handle)
+    
+    def fileno(self):
+        """Return the socket file descriptor of the connection"""
+        return self.xlib.XConnectionNumber(self.handle)
+    
+    def pending(self):
+        """Return the number of events already received from the server"""
+        return self.xlib.XPending(self.handle)
+    
+    def next_event(self, event):
+        """Read the next queued event into the given XEvent"""
+        self.xlib.XNextEvent(self.handle, ctypes.byref(event))
+    
+    def flush(self):
+        """Send buffered requests without waiting for replies"""
+        self.xlib.XFlush(self.handle)
+    
+    def query_extension(self, name):
+        """Return the major opcode of an extension, or None if missing"""
+        opcode = ctypes.c_int()
+        event = ctypes.c_int()
+        error = ctypes.c_int()
+        self.xlib.XQueryExtension.argtypes = [
+            ctypes.c_void_p, ctypes.c_char_p,
+            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_int),
+        ]
+        found = self.xlib.XQueryExtension(
+            self.handle, name.encode(),
+            ctypes.byref(opcode), ctypes.byref(event), ctypes.byref(error)
+        )
+        return opcode.value if found else None
+    
+    def query_pointer(self):
+        """Return the pointer position on the root window (one round trip)"""
+        window = ctypes.c_ulong()
+        root_x, root_y = ctypes.c_int(), ctypes.c_int()
+        win_x, win_y = ctypes.c_int(), ctypes.c_int()
+        mask = ctypes.c_uint()
+        self.xlib.XQueryPointer.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong,
+            ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_uint),
+        ]
+        self.xlib.XQueryPointer(
+            self.handle, self.root, ctypes.byref(window), ctypes.byref(window),
+            ctypes.byref(root_x), ctypes.byref(root_y),
+            ctypes.byref(win_x), ctypes.byref(win_y), ctypes.byref(mask)
+        )
+        return root_x.value, root_y.value
+    
+    def fake_relative_motion(self, dx, dy):
+        """Queue an XTest relative pointer motion; call flush() to send it"""
+        if self._fake_motion is None:
+            xtst = load_library("Xtst")
+            xtst.XTestFakeRelativeMotionEvent.argtypes = [
+                ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_ulong
+            ]
+            self._fake_motion = xtst.XTestFakeRelativeMotionEvent
+        self._fake_motion(self.handle, dx, dy, 0)
+    
+    def get_event_data(self, event):
+        """Fetch the payload of a generic event cookie, returning True on success"""
+        self.xlib.XGetEventData.argtypes = [ctypes.c_void_p, ctypes.POINTER(XGenericEventCookie)]
+        return bool(self.xlib.XGetEventData(self.handle, ctypes.byref(event.xcookie)))
+    
+    def free_event_data(self, event):
+        """Release the payload fetched by get_event_data()"""
+        self.xlib.XFreeEventData.argtypes = [ctypes.c_void_p, ctypes.POINTER(XGenericEventCookie)]
+        self.xlib.XFreeEventData(self.handle, ctypes.byref(event.xcookie))
+    
+    def input_devices(self):
+        """Return a dict of XInput2 device ids to device names"""
+        xi = load_library("Xi")
+        xi.XIQueryDevice.restype = ctypes.POINTER(XIDeviceInfo)
+        xi.XIQueryDevice.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.POINTER(ctypes.c_int)]
+        xi.XIFreeDeviceInfo.argtypes = [ctypes.POINTER(XIDeviceInfo)]
+        count = ctypes.c_int()
+        info = xi.XIQueryDevice(self.handle, 0, ctypes.byref(count))
+        try:
+            return {
+                info[i].deviceid: info[i].name.decode(errors="replace")
+                for i in range(count.value)
+            }
+        finally:
+            xi.XIFreeDeviceInfo(info)
+    
+    def screensaver_timeout(self):
+        """Return the server's screen saver timeout in seconds (0: disabled)"""
+        timeout, interval = ctypes.c_int(), ctypes.c_int()
+        blanking, exposures = ctypes.c_int(), ctypes.c_int()
+        self.xlib.XGetScreenSaver.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+        self.xlib.XGetScreenSaver(
+            self.handle, ctypes.byref(timeout), ctypes.byref(interval),
+            ctypes.byref(blanking), ctypes.byref(exposures)
+        )
+        return max(0, timeout.value)
+    
+    def connection_alive(self):
+        """Return False once the server has hung up on this connection
+        
+        Xlib exits the whole process on a connection I/O error, so code that
+        serves many displays checks this before every request to a server
+        that may have gone away.
+        """
+        hangup = select.POLLHUP | select.POLLERR | getattr(select, "POLLRDHUP", 0)
+        poller = select.poll()
+        poller.register(self.fileno(), select.POLLIN | hangup)
+        for fd, events in poller.poll(0):
+            if events & hangup:
+                return False
+        return True
+    
+    def close(self):
+        """Close the connection"""
+        if self.handle:
+            self.xlib.XCloseDisplay(self.handle)
+            self.handle = None
+
+def query_idle_ms(display):
+    """Return the server-side idle counter of a display in milliseconds"""
+    xss = load_library("Xss")
+    xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+    xss.XScreenSaverQueryInfo.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)
+    ]
+    info = xss.XScreenSaverAllocInfo()
+    try:
+        if not xss.XScreenSaverQueryInfo(display.handle, display.root, info):
+            raise X11Error("MIT-SCREEN-SAVER extension not available")
+        return info.contents.idle
+    finally:
+        display.xlib.XFree(info)
+
+def query_dpms_timeouts(display):
+    """Return the DPMS (standby, suspend, off) timeouts in seconds
+    
+    Returns None when DPMS is unsupported or disabled; a timeout of 0 is
+    disabled.
+    """
+    xext = load_library("Xext")
+    xext.DPMSCapable.argtypes = [ctypes.c_void_p]
+    xext.DPMSInfo.argtypes = [
+        ctypes.c_void_p, ctypes.POINTER(ctypes.c_ushort), ctypes.POINTER(ctypes.c_ubyte)
+    ]
+    xext.DPMSGetTimeouts.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_ushort)] * 3
+    event_base, error_base = ctypes.c_int(), ctypes.c_int()
+    xext.DPMSQueryExtension.argtypes = [
+        ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+    ]
+    if not xext.DPMSQueryExtension(display.handle, ctypes.byref(event_base),
+                                   ctypes.byref(error_base)):
+        return None
+    if not xext.DPMSCapable(display.handle):
+        return None
+    level, enabled = ctypes.c_ushort(), ctypes.c_ubyte()
+    xext.DPMSInfo(display.handle, ctypes.byref(level), ctypes.byref(enabled))
+    if not enabled.value:
+        return None
+    standby, suspend, off = ctypes.c_ushort(), ctypes.c_ushort(), ctypes.c_ushort()
+    xext.DPMSGetTimeouts(display.handle, ctypes.byref(standby), ctypes.byref(suspend),
+                         ctypes.byref(off))
+    return standby.value, suspend.value, off.value
@@ -0,0 +1,91 @@
+import os
+import time
+
+import pytest
+
+from services.activity_recorder import (
+    HEADER, KIND_ACTIVITY, KIND_MOVE, KIND_START, NO_POSITION, RECORD, SOURCE_CODES,
+    SOURCE_ENGINE, ActivityRecorder, open_recorder, read_trace,
+)
+
+pytest.importorskip("numpy")
+
+def recorded(path):
+    """Return every record of the recording at path as tuples, oldest first"""
+    rows = []
+    for segment in read_trace(path):
+        rows.extend((int(row["time_ns"]), int(row["x"]), int(row["y"]), int(row["source"]),
+                     int(row["kind"])) for row in segment.records)
+        segment.close()
+    return rows
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "trace")
+    recorder = ActivityRecorder(path, capacity=16)
+    recorder.open()
+    assert os.path.getsize(path) == HEADER.size + 16 * RECORD.size
+    now = time.monotonic()
+    recorder.record(KIND_START, now, source=SOURCE_CODES["evdev"])
+    recorder.record(KIND_ACTIVITY, now + 1, 100, 200, SOURCE_CODES["evdev"])
+    recorder.record(KIND_MOVE, now + 2, 2, -1, SOURCE_ENGINE)
+    recorder.close()
+    rows = recorded(path)
+    assert [row[1:] for row in rows] == [
+        (NO_POSITION, NO_POSITION, SOURCE_CODES["evdev"], KIND_START),
+        (100, 200, SOURCE_CODES["evdev"], KIND_ACTIVITY),
+        (2, -1, SOURCE_ENGINE, KIND_MOVE),
+    ]
+    assert rows[1][0] - rows[0][0] == pytest.approx(1e9, abs=1000)
+
+def test_wall_times_follow_the_wall_clock(tmp_path):
+    path = str(tmp_path / "trace")
+    recorder = ActivityRecorder(path, capacity=4)
+    recorder.open()
+    recorder.record(KIND_ACTIVITY, time.monotonic())
+    recorder.close()
+    (segment,) = read_trace(path)
+    assert segment.wall_times()[0] == pytest.approx(time.time(), abs=5)
+    segment.close()
+
+def test_reopening_continues_the_segment(tmp_path):
+    path = str(tmp_path / "trace")
+    for number in range(3):
+        recorder = ActivityRecorder(path, capacity=16)
+        recorder.open()
+        recorder.record(KIND_ACTIVITY, time.monotonic(), number, 0)
+        recorder.close()
+    assert [row[1] for row in recorded(path)] == [0, 1, 2]
+    assert not os.path.exists(path + ".1")
+
+def test_full_segments_rotate_and_the_oldest_is_dropped(tmp_path):
+    path = str(tmp_path / "trace")
+    recorder = ActivityRecorder(path, capacity=4, keep=2)
+    recorder.open()
+    now = time.monotonic()
+    for number in range(14):
+        recorder.record(KIND_ACTIVITY, now + number, number, 0)
+    recorder.close()
+    assert sorted(os.listdir(tmp_path)) == ["trace", "trace.1", "trace.2"]
+    # Segments of 4: 0-3 was dropped, then 4-7, 8-11 and the active 12-13
+    assert [row[1] for row in recorded(path)] == list(range(4, 14))
+
+def test_segment_with_other_capacity_is_rotated_away(tmp_path):
+    path = str(tmp_path / "trace")
+    recorder = ActivityRecorder(path, capacity=4)
+    recorder.open()
+    recorder.record(KIND_ACTIVITY, time.monotonic(), 7, 0)
+    recorder.close()
+    recorder = ActivityRecorder(path, capacity=8)
+    recorder.open()
+    recorder.close()
+    assert [row[1] for row in recorded(path)] == [7]
+    assert [segment.capacity for segment in read_trace(path)] == [4, 8]
+
+def test_foreign_files_are_rejected(tmp_path):
+    path = tmp_path / "trace"
+    path.write_bytes(b"not a trace" + bytes(HEADER.size))
+    with pytest.raises(ValueError, match="not an activity trace"):
+        read_trace(str(path))
+
+def test_unopenable_recording_is_reported(tmp_path):
+    assert open_recorder(str(tmp_path / "missing" / "trace")) is None
@@ -0,0 +1,68 @@
+import socket
+
+import pytest
+
+from services.control_server import (
+    CONTROL_AVAILABLE, ControlError, ControlHandler, ControlServer, forward_to_running_instance,
+    is_running,
+)
+
+pytestmark = pytest.mark.skipif(not CONTROL_AVAILABLE, reason="needs Unix-domain sockets")
+
+class BusyLoop:
+    """An engine loop that never gets round to its callbacks"""
+    
+    def call_soon_threadsafe(self, callback):
+        pass
+
+class DirectLoop:
+    """An engine loop that runs callbacks at once on the calling thread"""
+    
+    def call_soon_threadsafe(self, callback):
+        callback()
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cursorvibe.sock")
+
+@pytest.fixture
+def servers():
+    started = []
+    yield started
+    for server in started:
+        server.stop()
+
+def serve(servers, loop, path, timeout=5.0):
+    server = ControlServer(ControlHandler(None, None, on_args=lambda argv: None), loop,
+                           path=path, timeout=timeout)
+    server.start()
+    servers.append(server)
+    return server
+
+def test_busy_instance_is_still_running(servers, path):
+    serve(servers, BusyLoop(), path, timeout=0.2)
+    assert is_running(path)
+    # The forward reaches the instance but times out on its loop
+    with pytest.raises(ControlError, match="timed out"):
+        forward_to_running_instance(["--tray"], path)
+    with pytest.raises(OSError, match="another instance"):
+        serve(servers, DirectLoop(), path)
+
+def test_forward_reaches_a_responsive_instance(servers, path):
+    serve(servers, DirectLoop(), path)
+    assert forward_to_running_instance(["--tray"], path) is True
+
+def test_stale_socket_is_replaced(servers, path):
+    leftover = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    leftover.bind(path)
+    leftover.close()
+    assert not is_running(path)
+    assert forward_to_running_instance([], path) is False
+    serve(servers, DirectLoop(), path)
+    assert is_running(path)
+
+def test_lock_is_released_on_stop(servers, path):
+    serve(servers, DirectLoop(), path)
+    servers.pop().stop()
+    assert not is_running(path)
+    serve(servers, DirectLoop(), path)
@@ -0,0 +1,135 @@
+import pytest
+
+from services import display_manager, x11
+from services.display_manager import DisplayManager
+from services.event_loop import VirtualEventLoop
+
+class FakeTarget:
+    """Stands in for a DisplayTarget: steps on a fixed period, no X connection"""
+    
+    def __init__(self, display_name, period=1.0, steps=None):
+        self.display_name = display_name
+        self.period = period
+        self.frequency = period  # Move interval, as on a DisplayTarget
+        self.steps = steps
+        self.generation = 0
+        self.closed = False
+        self.fail_at = None
+    
+    def open(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def abandon(self):
+        self.closed = True
+    
+    def update(self, period=None):
+        if period is not None:
+            self.period = self.frequency = period
+    
+    def step(self, now, metrics):
+        if self.fail_at is not None and now >= self.fail_at:
+            raise x11.X11Error(f"display {self.display_name} closed the connection")
+        self.steps.append((now, self.display_name))
+        return now + self.period
+
+@pytest.fixture
+def manager(monkeypatch):
+    """A DisplayManager on a virtual clock whose targets log to manager.steps"""
+    monkeypatch.setattr(display_manager, "DisplayTarget", FakeTarget)
+    manager = DisplayManager(VirtualEventLoop())
+    manager.steps = []
+    manager.dropped = []
+    manager.on_drop = lambda name, message: manager.dropped.append(name)
+    return manager
+
+def add(manager, name, period):
+    return manager.add_target(name, period=period, steps=manager.steps)
+
+def test_targets_step_in_deadline_order(manager):
+    add(manager, ":1", 1.0)
+    add(manager, ":2", 1.5)
+    add(manager, ":3", 0.75)
+    manager.loop.run_until(3.0)
+    # Equal deadlines run in the order they were queued
+    assert manager.steps == [
+        (0.0, ":1"), (0.0, ":2"), (0.0, ":3"),
+        (0.75, ":3"), (1.0, ":1"), (1.5, ":2"), (1.5, ":3"),
+        (2.0, ":1"), (2.25, ":3"), (3.0, ":2"), (3.0, ":1"), (3.0, ":3"),
+    ]
+    # One live entry per target, and the timer points at the earliest
+    assert len(manager.deadlines) == 3
+    assert manager.timer_deadline == min(entry[0] for entry in manager.deadlines)
+
+def test_close_deadlines_share_one_wakeup(manager):
+    wakeups = []
+    manager.loop.on_timer = lambda deadline, fired: wakeups.append(fired)
+    add(manager, ":1", 1.0)
+    add(manager, ":2", 1.0 + display_manager.COALESCE_WINDOW / 2)
+    manager.loop.run_until(1.5)
+    assert manager.steps[2:] == [(1.0, ":1"), (1.0, ":2")]
+    assert wakeups == [0.0, 1.0]
+
+def test_update_invalidates_the_queued_deadline(manager):
+    add(manager, ":1", 10.0)
+    manager.loop.run_until(1.0)
+    manager.update_target(":1", period=2.0)
+    manager.loop.run_until(12.0)
+    # The old deadline at 10.0 surfaces as a stale entry and is skipped
+    assert manager.steps == [
+        (0.0, ":1"), (1.0, ":1"), (3.0, ":1"), (5.0, ":1"),
+        (7.0, ":1"), (9.0, ":1"), (11.0, ":1"),
+    ]
+
+def test_removed_target_never_steps_again(manager):
+    add(manager, ":1", 1.0)
+    second = add(manager, ":2", 5.0)
+    manager.loop.run_until(0.5)
+    manager.remove_target(":1")
+    # The stale head entry is popped and the timer moves to the next live one
+    assert manager.timer_deadline == 5.0
+    manager.loop.run_until(6.0)
+    assert manager.steps == [(0.0, ":1"), (0.0, ":2"), (5.0, ":2")]
+    assert second.closed is False
+
+def test_unreachable_display_is_dropped(manager):
+    first = add(manager, ":1", 1.0)
+    add(manager, ":2", 1.0)
+    first.fail_at = 2.0
+    manager.loop.run_until(3.0)
+    assert manager.dropped == [":1"]
+    assert list(manager.targets) == [":2"]
+    assert first.closed
+    assert [name for now, name in manager.steps if now >= 2.0] == [":2", ":2"]
+
+def test_failing_target_does_not_stop_the_others(manager):
+    first = add(manager, ":1", 1.0)
+    add(manager, ":2", 1.0)
+    failures = []
+    step = first.step
+    
+    def flaky(now, metrics):
+        if now == 1.0:
+            failures.append(now)
+            raise IndexError("pop from empty list")
+        return step(now, metrics)
+    
+    first.step = flaky
+    manager.loop.run_until(3.0)
+    assert failures == [1.0]
+    assert manager.steps[2:] == [(1.0, ":2"), (2.0, ":1"), (2.0, ":2"), (3.0, ":1"), (3.0, ":2")]
+
+def test_failing_drop_callback_keeps_the_timer_armed(manager):
+    first = add(manager, ":1", 1.0)
+    add(manager, ":2", 1.0)
+    first.fail_at = 1.0
+    
+    def on_drop(name, message):
+        raise RuntimeError("listener failed")
+    
+    manager.on_drop = on_drop
+    manager.loop.run_until(3.0)
+    assert list(manager.targets) == [":2"]
+    assert [name for now, name in manager.steps if now >= 1.0] == [":2", ":2", ":2"]
@@ -0,0 +1,60 @@
+from services.cursor_service import CursorService, PyAutoGUIBackend
+from services.event_loop import HeapEventLoop
+from services.journal import EVENT_ERROR, journal
+
+def test_failing_callbacks_do_not_end_the_loop():
+    loop = HeapEventLoop()
+    ran = []
+    
+    def fail():
+        raise RuntimeError("boom")
+    
+    start = journal.count
+    loop.call_soon_threadsafe(fail)
+    loop.call_at(loop.time(), fail)
+    loop.call_at(loop.time() + 0.01, lambda: ran.append(True))
+    loop.call_at(loop.time() + 0.02, loop.stop)
+    loop.run_forever()
+    assert ran == [True]
+    errors = [record for record in journal.records(start) if record[2] == EVENT_ERROR]
+    assert len(errors) == 2
+    assert "RuntimeError: boom" in errors[0][5]
+
+def test_missing_input_backend_is_not_fatal():
+    class Unavailable(PyAutoGUIBackend):
+        def open(self):
+            raise ModuleNotFoundError("No module named 'pyautogui'")
+    
+    service = CursorService(input_backend=Unavailable(), seed=1)
+    service.check_mouse_activity()
+    service.move_cursor()
+    assert service.input_backend is None
+    # Not retried on every poll
+    retry_time = service.input_retry_time
+    service.check_mouse_activity()
+    assert service.input_retry_time == retry_time
+
+def test_failed_move_keeps_the_grid_running():
+    from services.event_loop import VirtualEventLoop
+    from services.simulation import ScriptedActivity, SimulatedPointer
+    
+    class FlakyPointer(SimulatedPointer):
+        def move_relative(self, dx, dy):
+            if len(self.moves) == 1:
+                self.moves.append(None)
+                raise OSError("device gone")
+            super().move_relative(dx, dy)
+    
+    loop = VirtualEventLoop()
+    pointer = FlakyPointer(loop.time)
+    service = CursorService(loop=loop, input_backend=pointer, seed=1)
+    service.activity_source = ScriptedActivity()
+    service.update_settings(frequency=1.0, idle_threshold=3)
+    start = journal.count
+    service.start_simulation()
+    loop.run_until(100)
+    assert service.is_active and service.timer is not None
+    assert len(pointer.moves) > 90
+    assert service.status.snapshot()["errors"] == 1
+    errors = [record for record in journal.records(start) if record[2] == EVENT_ERROR]
+    assert "OSError: device gone" in errors[0][5]
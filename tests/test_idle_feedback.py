@@ -0,0 +1,84 @@
+from services.idle_feedback import (
+    CONFIRMATIONS, PHASE_DISTANCE, PHASE_INTERVAL, PHASE_SETTLED, FeedbackTuner,
+)
+
+def settle(tuner, resets, limit=1000):
+    """Feed the tuner the outcome of each move until the search settles"""
+    for _ in range(limit):
+        if tuner.phase == PHASE_SETTLED:
+            return
+        if resets(tuner.distance, tuner.interval):
+            tuner.confirmed()
+        else:
+            tuner.missed()
+    raise AssertionError(f"search did not settle: {tuner.status()}")
+
+def compositor(distance, interval):
+    # Ignores single-pixel motion; locks after 20s without input
+    return distance >= 2 and interval <= 20
+
+def test_search_converges_on_the_sparsest_working_schedule():
+    tuner = FeedbackTuner(safe_distance=8, safe_interval=1.0, max_interval=60.0)
+    assert (tuner.distance, tuner.interval, tuner.phase) == (8, 1.0, PHASE_DISTANCE)
+    settle(tuner, compositor)
+    assert tuner.distance == 2
+    assert 20 / 1.5 < tuner.interval <= 20
+    assert tuner.saved() == {"distance": 2, "interval": round(tuner.interval, 3)}
+    # Each failed step was a single move
+    assert tuner.misses == 2
+
+def test_steps_wait_for_enough_confirmations():
+    tuner = FeedbackTuner(safe_distance=8, safe_interval=1.0, max_interval=60.0)
+    for _ in range(CONFIRMATIONS - 1):
+        assert tuner.confirmed() is False
+    assert tuner.confirmed() is True
+    assert tuner.distance == 4
+    # A miss on the new step restores the last good one and keeps its distance
+    assert tuner.missed() is True
+    assert (tuner.distance, tuner.interval, tuner.phase) == (8, 1.0, PHASE_INTERVAL)
+
+def test_search_never_passes_the_idle_timeouts():
+    tuner = FeedbackTuner(safe_distance=1, safe_interval=1.0, max_interval=30.0)
+    settle(tuner, lambda distance, interval: True)
+    assert tuner.interval == 30.0
+    # Lower timeouts pull the interval in at once
+    assert tuner.set_max_interval(10.0) is True
+    assert tuner.interval == 10.0 and tuner.saved()["interval"] == 10.0
+    # Raised ones resume the search
+    assert tuner.set_max_interval(60.0) is False
+    assert tuner.phase == PHASE_INTERVAL
+    settle(tuner, lambda distance, interval: True)
+    assert tuner.interval == 60.0
+
+def test_saved_tuning_restores_without_searching_distance():
+    saved = {"distance": 2, "interval": 17.086}
+    tuner = FeedbackTuner(safe_distance=8, safe_interval=1.0, max_interval=60.0, saved=saved)
+    assert (tuner.distance, tuner.interval, tuner.phase) == (2, 17.086, PHASE_INTERVAL)
+    settle(tuner, compositor)
+    assert tuner.saved() == saved
+    assert tuner.confirmations == CONFIRMATIONS and tuner.misses == 1
+
+def test_saved_tuning_is_clamped_to_the_safe_values():
+    saved = {"distance": 50, "interval": 0.1}
+    tuner = FeedbackTuner(safe_distance=8, safe_interval=1.0, max_interval=60.0, saved=saved)
+    assert (tuner.distance, tuner.interval) == (8, 1.0)
+    tuner = FeedbackTuner(safe_distance=8, safe_interval=1.0, max_interval=60.0,
+                          saved={"distance": 0, "interval": 900})
+    assert (tuner.distance, tuner.interval) == (1, 60.0)
+
+def test_failing_known_good_schedule_backs_off_toward_safe():
+    saved = {"distance": 2, "interval": 17.086}
+    tuner = FeedbackTuner(safe_distance=8, safe_interval=1.0, max_interval=60.0, saved=saved)
+    # The compositor now wants bigger moves: distance doubles first
+    assert tuner.missed() is True
+    assert (tuner.distance, tuner.interval, tuner.phase) == (4, 17.086, PHASE_SETTLED)
+    tuner.missed()
+    assert (tuner.distance, tuner.interval) == (8, 17.086)
+    # Then the interval halves, but never below the configured one
+    tuner.missed()
+    assert tuner.interval == 8.543
+    for _ in range(4):
+        tuner.missed()
+    assert (tuner.distance, tuner.interval) == (8, 1.0)
+    assert tuner.missed() is False
+    assert tuner.saved() == {"distance": 8, "interval": 1.0}
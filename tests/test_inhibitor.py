@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+jeepney = pytest.importorskip("jeepney")
+from jeepney import FileDescriptor, new_error, new_method_return  # noqa: E402
+import jeepney.io.blocking  # noqa: E402
+
+from services.inhibitor import InhibitorError, InhibitorService  # noqa: E402
+
+class FakeConnection:
+    """Stands in for a jeepney blocking connection; answers with canned replies"""
+    
+    def __init__(self, bus, replies):
+        self.bus = bus
+        self.replies = replies
+        self.sent = []
+        self.closed = False
+    
+    def send_and_get_reply(self, message, timeout=None):
+        self.sent.append(message)
+        header = message.header.fields
+        key = (self.bus, str(header[jeepney.HeaderFields.path]),
+               header[jeepney.HeaderFields.member])
+        return self.replies[key](message)
+    
+    def close(self):
+        self.closed = True
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+@pytest.fixture
+def bus(monkeypatch):
+    """Patch jeepney to hand out FakeConnections; returns (replies, connections)"""
+    replies = {}
+    connections = []
+    
+    def open_dbus_connection(bus="SESSION", enable_fds=False):
+        connection = FakeConnection(bus, replies)
+        connections.append(connection)
+        return connection
+    
+    monkeypatch.setattr(jeepney.io.blocking, "open_dbus_connection", open_dbus_connection)
+    return replies, connections
+
+def cookie(value):
+    return lambda message: new_method_return(message, "u", (value,))
+
+def unknown_method(message):
+    return new_error(message, "org.freedesktop.DBus.Error.UnknownMethod", "s", ("no",))
+
+def logind_fd(fds):
+    def reply(message):
+        read_fd, write_fd = os.pipe()
+        os.close(write_fd)
+        fds.append(read_fd)
+        return new_method_return(message, "h", (FileDescriptor(read_fd),))
+    return reply
+
+def test_cookie_is_released_on_the_connection_that_took_it(bus):
+    replies, connections = bus
+    fds = []
+    replies["SESSION", "/org/freedesktop/ScreenSaver", "Inhibit"] = cookie(42)
+    replies["SESSION", "/org/freedesktop/ScreenSaver", "UnInhibit"] = \
+        lambda message: new_method_return(message)
+    replies["SYSTEM", "/org/freedesktop/login1", "Inhibit"] = logind_fd(fds)
+    
+    inhibitor = InhibitorService()
+    inhibitor.acquire()
+    assert inhibitor.is_active
+    assert inhibitor.screensaver_cookie == 42
+    session = inhibitor.session_connection
+    assert session.bus == "SESSION" and not session.closed
+    assert inhibitor.logind_fd is not None
+    
+    inhibitor.release()
+    uninhibit = session.sent[-1]
+    assert uninhibit.header.fields[jeepney.HeaderFields.member] == "UnInhibit"
+    assert uninhibit.body == (42,)
+    assert session.closed
+    assert not inhibitor.is_active
+    assert inhibitor.screensaver_cookie is None and inhibitor.logind_fd is None
+    with pytest.raises(OSError):
+        os.fstat(fds[0])  # The logind lock was closed
+
+def test_falls_back_to_the_legacy_screensaver_path(bus):
+    replies, connections = bus
+    replies["SESSION", "/org/freedesktop/ScreenSaver", "Inhibit"] = unknown_method
+    replies["SESSION", "/ScreenSaver", "Inhibit"] = cookie(7)
+    replies["SYSTEM", "/org/freedesktop/login1", "Inhibit"] = unknown_method
+    
+    inhibitor = InhibitorService()
+    inhibitor.acquire()
+    assert inhibitor.screensaver_cookie == 7
+    assert str(inhibitor.screensaver_address.object_path) == "/ScreenSaver"
+    assert inhibitor.logind_fd is None
+    
+    replies["SESSION", "/ScreenSaver", "UnInhibit"] = lambda message: new_method_return(message)
+    inhibitor.release()
+    assert connections[0].sent[-1].body == (7,)
+
+def test_acquire_fails_and_closes_connections_when_no_lock_is_granted(bus):
+    replies, connections = bus
+    for path in ("/org/freedesktop/ScreenSaver", "/ScreenSaver"):
+        replies["SESSION", path, "Inhibit"] = unknown_method
+    replies["SYSTEM", "/org/freedesktop/login1", "Inhibit"] = unknown_method
+    
+    inhibitor = InhibitorService()
+    with pytest.raises(InhibitorError):
+        inhibitor.acquire()
+    assert not inhibitor.is_active
+    assert all(connection.closed for connection in connections)
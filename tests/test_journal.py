@@ -0,0 +1,88 @@
+import io
+
+from services.journal import (
+    EVENT_ERROR, EVENT_INFO, EVENT_MOVE, TEXT_LIMIT, Journal, LogSink, format_record,
+)
+
+def test_ring_buffer_keeps_the_newest_records():
+    journal = Journal(capacity=4)
+    for number in range(6):
+        journal.record(EVENT_MOVE, number, -number)
+    assert journal.count == 6
+    records = journal.records()
+    assert [record[0] for record in records] == [2, 3, 4, 5]
+    assert [(record[3], record[4]) for record in records] == [(2, -2), (3, -3), (4, -4), (5, -5)]
+    # Sequences already overwritten are skipped
+    assert [record[0] for record in journal.records(start=1)] == [2, 3, 4, 5]
+    assert [record[0] for record in journal.records(start=4)] == [4, 5]
+    assert [record[0] for record in journal.records(limit=2)] == [4, 5]
+
+def test_text_is_truncated_and_formatted():
+    journal = Journal(capacity=8)
+    journal.error("x" * (TEXT_LIMIT + 50))
+    journal.record(EVENT_MOVE, 3, -1)
+    journal.info("Settings reloaded")
+    error, move, info = journal.records()
+    assert error[2] == EVENT_ERROR and len(error[5]) == TEXT_LIMIT
+    assert format_record(move).endswith(" move dx=3 dy=-1")
+    assert info[2] == EVENT_INFO
+    assert format_record(info).endswith(" info Settings reloaded")
+    assert journal.recent(limit=1) == format_record(info)
+
+def test_dump_writes_every_record(tmp_path):
+    journal = Journal(capacity=8)
+    journal.info("one")
+    journal.info("two")
+    path = journal.dump(str(tmp_path / "events.log"))
+    lines = open(path).read().splitlines()
+    assert [line.split(" ", 2)[2] for line in lines] == ["one", "two"]
+
+def test_sink_writes_new_records_only():
+    journal = Journal(capacity=16)
+    journal.info("before the sink")
+    stream = io.StringIO()
+    sink = LogSink(journal, stream, max_per_second=100)
+    journal.info("first")
+    journal.info("second")
+    assert sink.flush(100) == 98
+    assert [line.split(" ", 2)[2] for line in stream.getvalue().splitlines()] == ["first", "second"]
+    # Nothing new: nothing written, budget untouched
+    assert sink.flush(5) == 5
+    assert stream.getvalue().count("\n") == 2
+
+def test_sink_rate_limit_and_overwritten_records_are_counted():
+    journal = Journal(capacity=4)
+    stream = io.StringIO()
+    sink = LogSink(journal, stream)
+    for number in range(10):
+        journal.info(f"event {number}")
+    # Six records were overwritten before the sink ran; two more exceed the budget
+    assert sink.flush(2) == 0
+    lines = stream.getvalue().splitlines()
+    assert [line.split(" ", 2)[2] for line in lines[:2]] == ["event 6", "event 7"]
+    assert lines[2] == "... 8 events not logged (rate limit)"
+    assert sink.position == 10
+
+def test_sink_thread_flushes_on_stop(tmp_path):
+    journal = Journal(capacity=16)
+    path = tmp_path / "cursorvibe.log"
+    sink = LogSink.open(journal, str(path), interval=60)
+    sink.start()
+    journal.info("written on stop")
+    sink.stop()
+    assert sink.stream.closed
+    assert path.read_text().rstrip().endswith("info written on stop")
+
+def test_broken_stream_is_ignored():
+    class BrokenStream:
+        def write(self, text):
+            raise OSError(32, "Broken pipe")
+        
+        def flush(self):
+            pass
+    
+    journal = Journal(capacity=4)
+    sink = LogSink(journal, BrokenStream())
+    journal.info("lost")
+    sink.flush(10)
+    assert sink.position == 1
@@ -0,0 +1,115 @@
+import pytest
+
+from services import lock_timeouts, x11
+from services.cursor_service import SPARSE_FALLBACK_INTERVAL, CursorService
+from services.event_loop import VirtualEventLoop
+from services.lock_timeouts import (
+    GnomeTimeoutReader, KdeTimeoutReader, LockTimeoutMonitor, TimeoutReader,
+    XServerTimeoutReader, earliest_timeout,
+)
+
+@pytest.fixture
+def commands(monkeypatch):
+    """Answer _run from a table of command lines; anything else fails"""
+    table = {}
+    monkeypatch.setattr(lock_timeouts, "_run", lambda args: table.get(" ".join(args[1:])))
+    return table
+
+def test_gnome_timeouts(commands):
+    power = "org.gnome.settings-daemon.plugins.power"
+    commands.update({
+        "get org.gnome.desktop.session idle-delay": "uint32 300",
+        f"get {power} sleep-inactive-ac-type": "'suspend'",
+        f"get {power} sleep-inactive-ac-timeout": "3600",
+        f"get {power} sleep-inactive-battery-type": "'nothing'",
+        f"get {power} sleep-inactive-battery-timeout": "900",
+    })
+    reader = GnomeTimeoutReader()
+    assert reader.read() == {"idle-delay": 300, "sleep-ac": 3600}
+    # Suspend is disabled on battery whatever its timeout says
+    assert reader.read(on_battery=True) == {"idle-delay": 300}
+    # An idle delay of 0 means never
+    commands["get org.gnome.desktop.session idle-delay"] = "uint32 0"
+    assert reader.read() == {"sleep-ac": 3600}
+
+def test_gnome_without_the_power_plugin(commands):
+    commands["get org.gnome.desktop.session idle-delay"] = "uint32 600"
+    assert GnomeTimeoutReader().read() == {"idle-delay": 600}
+
+def kde(commands, file, groups, key, value):
+    args = ["--file", file]
+    for group in groups:
+        args += ["--group", group]
+    commands[" ".join(args + ["--key", key])] = value
+
+def test_kde_plasma6_timeouts(commands):
+    kde(commands, "kscreensaverrc", ["ScreenSaver"], "Timeout", "10")
+    kde(commands, "powerdevilrc", ["AC", "Display"], "TurnOffDisplayIdleTimeoutSec", "300")
+    kde(commands, "powerdevilrc", ["AC", "SuspendAndShutdown"], "AutoSuspendIdleTimeoutSec", "900")
+    reader = KdeTimeoutReader()
+    reader.command = "kreadconfig6"
+    assert reader.read() == {"screen-lock": 600, "display-off": 300, "suspend": 900}
+    # Nothing configured for battery: only the screen locker applies
+    assert reader.read(on_battery=True) == {"screen-lock": 600}
+
+def test_kde_plasma5_keys_and_defaults(commands):
+    # No Timeout key: the locker's default of five minutes
+    kde(commands, "powerdevilrc", ["Battery", "DPMSControl"], "idleTime", "120")
+    kde(commands, "powerdevilrc", ["Battery", "SuspendSession"], "idleTime", "600000")
+    reader = KdeTimeoutReader()
+    reader.command = "kreadconfig5"
+    assert reader.read(on_battery=True) == {"screen-lock": 300, "display-off": 120,
+                                            "suspend": 600}
+    kde(commands, "kscreensaverrc", ["ScreenSaver"], "Autolock", "false")
+    assert "screen-lock" not in reader.read(on_battery=True)
+
+class FakeDisplay:
+    def __init__(self, screensaver):
+        self.screensaver = screensaver
+    
+    def screensaver_timeout(self):
+        return self.screensaver
+
+def test_xset_timeouts(monkeypatch):
+    dpms = [(600, 0, 900)]
+    monkeypatch.setattr(x11, "query_dpms_timeouts", lambda display: dpms[0])
+    reader = XServerTimeoutReader()
+    reader.display = FakeDisplay(300)
+    assert reader.read() == {"screensaver": 300, "dpms-standby": 600, "dpms-off": 900}
+    # `xset s off` and DPMS disabled
+    reader.display = FakeDisplay(0)
+    dpms[0] = None
+    assert reader.read() == {}
+
+class StaticReader(TimeoutReader):
+    def __init__(self, name, values):
+        self.name = name
+        self.values = values
+        self.battery = []
+    
+    def read(self, on_battery=False):
+        self.battery.append(on_battery)
+        if isinstance(self.values, Exception):
+            raise self.values
+        return self.values
+
+def test_monitor_merges_readers_and_skips_failures():
+    gnome = StaticReader("gnome", {"idle-delay": 300})
+    broken = StaticReader("x11", x11.X11Error("cannot open display"))
+    kde_reader = StaticReader("kde", {"suspend": 900})
+    monitor = LockTimeoutMonitor(None, on_battery=lambda: True,
+                                 readers=[gnome, broken, kde_reader])
+    timeouts = monitor.read()
+    assert timeouts == {"gnome.idle-delay": 300, "kde.suspend": 900}
+    assert gnome.battery == [True]
+    assert earliest_timeout(timeouts) == ("gnome.idle-delay", 300)
+    assert earliest_timeout({}) is None
+
+def test_sparse_interval_beats_the_earliest_timeout():
+    service = CursorService(loop=VirtualEventLoop(), seed=1)
+    assert service.sparse_interval() == SPARSE_FALLBACK_INTERVAL
+    service.lock_timeouts = {"gnome.idle-delay": 300, "x11.dpms-off": 900}
+    assert service.sparse_interval() == 300 - service.sparse_margin
+    # A margin larger than the timeout still leaves half of it
+    service.lock_timeouts = {"x11.screensaver": 40}
+    assert service.sparse_interval() == 20
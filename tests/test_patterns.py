@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from services.cursor_service import CursorService, InputBackend
+from services.patterns import PATTERNS, PatternEngine, create_pattern
+
+class ReturningBackend(InputBackend):
+    """Moves out and back like the uinput backend: the net offset is always (0, 0)"""
+    
+    name = "returning"
+    
+    def __init__(self):
+        self.moves = []
+    
+    def position(self):
+        return (0, 0)
+    
+    def keep_alive(self, dx, dy):
+        self.moves.append((dx, dy))
+        return 0, 0
+
+def test_no_null_moves_when_backend_returns_the_pointer():
+    for name in PATTERNS:
+        engine = PatternEngine(create_pattern(name), distance=2, seed=1)
+        for _ in range(1000):
+            move = engine.next_move()
+            assert move != (0, 0), name
+            engine.applied(0, 0)
+
+def test_cursor_service_moves_are_never_null_on_returning_backend():
+    backend = ReturningBackend()
+    service = CursorService(input_backend=backend, seed=1)
+    for _ in range(200):
+        service.move_cursor()
+    assert len(backend.moves) == 200
+    assert (0, 0) not in backend.moves
+
+def test_cycles_still_close_when_backend_applies_moves():
+    engine = PatternEngine(create_pattern("jitter"), distance=3, seed=1)
+    for _ in range(500):
+        dx, dy = engine.next_move()
+        assert (dx, dy) != (0, 0)
+        engine.applied(dx, dy)
+        if engine.offset == (0, 0):
+            assert engine.return_move() is None
+    move = engine.return_move()
+    if move is not None:
+        engine.applied(*move)
+    assert engine.offset == (0, 0)
+
+@pytest.mark.parametrize("points", [[], [[4, 4]], [[1, 2], [1, 2], [1, 2]]])
+def test_degenerate_recordings_are_rejected(tmp_path, points):
+    path = tmp_path / "pattern.json"
+    path.write_text(json.dumps(points))
+    with pytest.raises(ValueError):
+        create_pattern("recorded", str(path))
+
+def test_degenerate_recording_falls_back_to_jitter(tmp_path):
+    path = tmp_path / "pattern.json"
+    path.write_text(json.dumps([[4, 4]]))
+    backend = ReturningBackend()
+    service = CursorService(input_backend=backend, seed=1)
+    service.update_settings(pattern="recorded", pattern_file=str(path))
+    for _ in range(10):
+        service.move_cursor()
+    assert len(backend.moves) == 10
+    assert service.pattern_engine.pattern.name == "jitter"
+    assert service.status.snapshot()["errors"] == 1
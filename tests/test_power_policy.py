@@ -0,0 +1,102 @@
+import socket
+
+import pytest
+
+from services.power_policy import (
+    BATTERY_TIMER_SLACK, POWER_AC, POWER_BATTERY, POWER_UNKNOWN, PowerMonitor, PowerPolicy,
+    read_power_state,
+)
+
+def supply(root, name, **files):
+    path = root / name
+    path.mkdir()
+    for key, value in files.items():
+        (path / key).write_text(value + "\n")
+
+def test_read_power_state(tmp_path):
+    assert read_power_state(str(tmp_path / "missing")) == POWER_UNKNOWN
+    supply(tmp_path, "BAT0", type="Battery", status="Discharging")
+    supply(tmp_path, "AC", type="Mains", online="0")
+    # A wireless mouse's battery does not power the machine
+    supply(tmp_path, "hidpp_battery_0", type="Battery", scope="Device", status="Charging")
+    assert read_power_state(str(tmp_path)) == POWER_BATTERY
+    (tmp_path / "AC" / "online").write_text("1\n")
+    assert read_power_state(str(tmp_path)) == POWER_AC
+
+def test_read_power_state_without_a_system_battery(tmp_path):
+    # A desktop with only peripheral batteries
+    supply(tmp_path, "hidpp_battery_0", type="Battery", scope="Device", status="Discharging")
+    assert read_power_state(str(tmp_path)) == POWER_UNKNOWN
+    # USB-C power delivery counts as external power
+    supply(tmp_path, "ucsi-source-psy-USBC000:001", type="USB", online="1")
+    supply(tmp_path, "BAT1", type="Battery", status="Charging")
+    assert read_power_state(str(tmp_path)) == POWER_AC
+
+def policy(state, budget=4):
+    power_policy = PowerPolicy(battery_budget=budget, root="/nonexistent")
+    power_policy.power_state = state
+    return power_policy
+
+def test_ac_power_leaves_the_settings_alone():
+    power_policy = policy(POWER_AC)
+    assert power_policy.budget() is None
+    assert power_policy.effective(1.0, 0.5, wakeup_sources=2) == (1.0, 0.5)
+    assert power_policy.timer_slack() == 0
+    assert power_policy.describe(1.0) == "On AC power: moving every 1.0s"
+
+def test_battery_budget_stretches_moves_and_polls():
+    power_policy = policy(POWER_BATTERY, budget=4)
+    assert power_policy.budget() == 4
+    # Four wakeups a minute for the move timer alone
+    assert power_policy.effective(1.0, 0.5) == (15.0, 15.0)
+    # Shared with the pointer poll: each gets two a minute
+    assert power_policy.effective(1.0, 0.5, wakeup_sources=2) == (30.0, 30.0)
+    # Slower settings already fit the budget
+    assert power_policy.effective(120.0, 60.0) == (120.0, 60.0)
+    assert power_policy.timer_slack() == BATTERY_TIMER_SLACK
+    assert power_policy.describe(15.0) == "On battery: 4 wakeups/min, moving every 15.0s"
+
+def test_zero_budget_means_no_limit_on_battery():
+    power_policy = policy(POWER_BATTERY, budget=0)
+    assert power_policy.budget() is None
+    assert power_policy.effective(1.0, 0.5) == (1.0, 0.5)
+    assert power_policy.timer_slack() == 0
+    assert power_policy.describe(1.0) == "On battery: moving every 1.0s"
+
+def test_refresh_reports_changes(tmp_path):
+    supply(tmp_path, "BAT0", type="Battery", status="Discharging")
+    supply(tmp_path, "AC", type="Mains", online="0")
+    power_policy = PowerPolicy(root=str(tmp_path))
+    assert power_policy.power_state == POWER_BATTERY
+    assert power_policy.refresh() is False
+    (tmp_path / "AC" / "online").write_text("1\n")
+    assert power_policy.refresh() is True
+    assert power_policy.power_state == POWER_AC
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs socketpair datagrams")
+def test_only_power_supply_uevents_count():
+    monitor = PowerMonitor(None, None)
+    reader, writer = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    reader.setblocking(False)
+    try:
+        writer.send(b"add@/devices/usb1\0ACTION=add\0SUBSYSTEM=usb\0")
+        assert monitor._drain(reader) is False
+        writer.send(b"change@/devices/AC\0ACTION=change\0SUBSYSTEM=power_supply\0")
+        writer.send(b"change@/devices/input\0ACTION=change\0SUBSYSTEM=input\0")
+        assert monitor._drain(reader) is True
+        assert monitor._drain(reader) is False
+    finally:
+        reader.close()
+        writer.close()
+
+def test_engine_follows_the_power_state():
+    from services.cursor_service import CursorService
+    from services.event_loop import VirtualEventLoop
+    
+    power_policy = policy(POWER_BATTERY, budget=4)
+    service = CursorService(loop=VirtualEventLoop(), power_policy=power_policy, seed=1)
+    service.update_settings(frequency=1.0)
+    assert service.move_interval == 15.0
+    power_policy.power_state = POWER_AC
+    service.apply_power_policy()
+    assert service.move_interval == 1.0
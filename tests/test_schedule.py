@@ -0,0 +1,167 @@
+import datetime
+import os
+import queue
+
+import pytest
+
+from services import schedule
+from services.schedule import ActiveHours, ScheduleTimer, parse_days, parse_windows
+
+zoneinfo = pytest.importorskip("zoneinfo")
+try:
+    NEW_YORK = zoneinfo.ZoneInfo("America/New_York")
+except zoneinfo.ZoneInfoNotFoundError:
+    pytest.skip("no time zone database", allow_module_level=True)
+
+def at(year, month, day, hour, minute=0, fold=0):
+    """POSIX time of a New York wall-clock time"""
+    return datetime.datetime(year, month, day, hour, minute, fold=fold, tzinfo=NEW_YORK).timestamp()
+
+def test_parse_days_and_windows():
+    assert parse_days("mon-fri") == {0, 1, 2, 3, 4}
+    assert parse_days("fri-mon") == {4, 5, 6, 0}
+    assert parse_days("sat,sun") == {5, 6}
+    assert parse_days("daily") == set(range(7))
+    assert parse_windows("09:00-17:30,22:00-02:00") == [(32400, 63000), (79200, 93600)]
+    for text in ("9-17", "25:00-26:00", "09:60-10:00", "23:00-24:30"):
+        with pytest.raises(ValueError):
+            parse_windows(text)
+    with pytest.raises(ValueError, match="rule 2"):
+        ActiveHours.parse("mon 09:00-10:00; xyz 09:00-10:00")
+
+def test_wall_clock_windows_follow_dst():
+    hours = ActiveHours.parse("daily 09:00-17:00", tz=NEW_YORK)
+    # Saturday before and Sunday of the spring-forward change, 2026-03-08
+    assert hours.state_at(at(2026, 3, 7, 8)) == (False, at(2026, 3, 7, 9))
+    assert hours.state_at(at(2026, 3, 8, 8)) == (False, at(2026, 3, 8, 9))
+    assert at(2026, 3, 8, 9) - at(2026, 3, 7, 9) == 23 * 3600
+    # Fall back, 2026-11-01: the day is 25 hours long
+    assert hours.state_at(at(2026, 11, 1, 12)) == (True, at(2026, 11, 1, 17))
+    assert hours.state_at(at(2026, 11, 1, 17)) == (False, at(2026, 11, 2, 9))
+    assert at(2026, 11, 1, 9) - at(2026, 10, 31, 9) == 25 * 3600
+
+def test_window_in_the_spring_forward_gap():
+    hours = ActiveHours.parse("daily 02:30-04:00", tz=NEW_YORK)
+    # 02:30 does not exist on 2026-03-08; the window opens at 03:30 EDT
+    # (02:30 at the old offset), and still closes at 04:00
+    assert hours.state_at(at(2026, 3, 8, 1)) == (False, at(2026, 3, 8, 3, 30))
+    assert hours.state_at(at(2026, 3, 8, 3)) == (False, at(2026, 3, 8, 3, 30))
+    assert hours.state_at(at(2026, 3, 8, 3, 45)) == (True, at(2026, 3, 8, 4))
+    assert hours.state_at(at(2026, 3, 9, 2, 45)) == (True, at(2026, 3, 9, 4))
+
+def test_window_in_the_repeated_fall_back_hour():
+    hours = ActiveHours.parse("daily 01:15-01:45", tz=NEW_YORK)
+    # 01:15 happens twice on 2026-11-01; the window covers the first pass
+    first = at(2026, 11, 1, 1, 15)
+    assert hours.state_at(first - 60) == (False, first)
+    assert hours.state_at(first) == (True, at(2026, 11, 1, 1, 45))
+    assert hours.state_at(at(2026, 11, 1, 1, 30, fold=1)) == (False, at(2026, 11, 2, 1, 15))
+
+def test_overnight_window_runs_past_midnight():
+    hours = ActiveHours.parse("fri 22:00-02:00", tz=NEW_YORK)
+    # Friday 2026-03-06 into Saturday
+    assert hours.state_at(at(2026, 3, 7, 1)) == (True, at(2026, 3, 7, 2))
+    assert hours.state_at(at(2026, 3, 7, 2)) == (False, at(2026, 3, 13, 22))
+
+def test_exceptions_and_holidays():
+    hours = ActiveHours.parse(
+        "mon-fri 09:00-17:00; 2026-12-24 09:00-12:00; 2026-12-31 off; 2026-01-01 10:00-11:00",
+        holidays={datetime.date(2026, 12, 25), datetime.date(2026, 1, 1)}, tz=NEW_YORK)
+    # An exception replaces the day's windows
+    assert hours.state_at(at(2026, 12, 24, 11)) == (True, at(2026, 12, 24, 12))
+    # A holiday is off; the next window is Monday's
+    assert hours.state_at(at(2026, 12, 24, 13)) == (False, at(2026, 12, 28, 9))
+    assert hours.state_at(at(2026, 12, 30, 18)) == (False, at(2027, 1, 1, 9))
+    # An exception wins over a holiday
+    assert hours.state_at(at(2026, 1, 1, 9)) == (False, at(2026, 1, 1, 10))
+
+def test_no_windows_means_no_transition():
+    hours = ActiveHours.parse("2026-01-01 off", tz=NEW_YORK)
+    assert hours.state_at(at(2026, 3, 1, 12)) == (False, None)
+
+class FakeTimer:
+    """Stands in for RealtimeTimer; expire() makes it readable like the timerfd"""
+    
+    def __init__(self):
+        self.read_fd, self.write_fd = os.pipe()
+        self.armed = queue.Queue()
+        self.clock_set = False
+    
+    def fileno(self):
+        return self.read_fd
+    
+    def arm(self, when):
+        self.armed.put(when)
+    
+    def expire(self, clock_set=False):
+        self.clock_set = clock_set
+        os.write(self.write_fd, b"\0")
+    
+    def consume(self):
+        os.read(self.read_fd, 1)
+        return not self.clock_set
+    
+    def close(self):
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+def test_realtime_timer_fires_at_a_past_time():
+    import select
+    try:
+        timer = schedule.RealtimeTimer()
+    except (OSError, AttributeError) as e:
+        pytest.skip(f"timerfd unavailable: {e}")
+    try:
+        timer.arm(1.0)
+        assert select.select([timer], [], [], 5)[0] == [timer]
+        assert timer.consume() is True
+        timer.arm(None)
+        assert select.select([timer], [], [], 0.05)[0] == []
+    finally:
+        timer.close()
+
+class FakeTime:
+    now = 0.0
+    
+    @classmethod
+    def time(cls):
+        return cls.now
+
+def test_wall_clock_jump_recomputes_the_transition(monkeypatch):
+    timers = queue.Queue()
+    
+    def make_timer():
+        timer = FakeTimer()
+        timers.put(timer)
+        return timer
+    
+    monkeypatch.setattr(schedule, "RealtimeTimer", make_timer)
+    monkeypatch.setattr(schedule, "time", FakeTime)
+    FakeTime.now = at(2026, 3, 6, 8)
+    transitions = queue.Queue()
+    schedule_timer = ScheduleTimer(transitions.put)
+    schedule_timer.set_schedule(ActiveHours.parse("daily 09:00-17:00", tz=NEW_YORK))
+    try:
+        timer = timers.get(timeout=5)
+        assert transitions.get(timeout=5) is False
+        assert timer.armed.get(timeout=5) == at(2026, 3, 6, 9)
+        
+        # The clock is set forward past the start of the window
+        FakeTime.now = at(2026, 3, 6, 10)
+        timer.expire(clock_set=True)
+        assert transitions.get(timeout=5) is True
+        assert timer.armed.get(timeout=5) == at(2026, 3, 6, 17)
+        
+        # The clock is set back before the window
+        FakeTime.now = at(2026, 3, 6, 7)
+        timer.expire(clock_set=True)
+        assert transitions.get(timeout=5) is False
+        assert timer.armed.get(timeout=5) == at(2026, 3, 6, 9)
+        
+        # The transition itself, reported even if time.time() lags the timer
+        FakeTime.now = at(2026, 3, 6, 9) - 0.001
+        timer.expire()
+        assert transitions.get(timeout=5) is True
+        assert timer.armed.get(timeout=5) == at(2026, 3, 6, 17)
+    finally:
+        schedule_timer.stop()
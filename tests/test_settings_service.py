@@ -0,0 +1,90 @@
+import json
+
+from services.event_loop import VirtualEventLoop
+from services.settings_service import FLUSH_RETRY_DELAY, FileSettingsBackend, SettingsService
+
+class CountingBackend(FileSettingsBackend):
+    """JSON file backend that counts writes and can be told to fail them"""
+    
+    def __init__(self, path):
+        super().__init__(path)
+        self.syncs = 0
+        self.failures = 0
+    
+    def sync(self):
+        if self.failures:
+            self.failures -= 1
+            raise OSError(28, "No space left on device")
+        self.syncs += 1
+        super().sync()
+
+def saved(path):
+    with open(path) as f:
+        return json.load(f)
+
+def make_service(tmp_path):
+    backend = CountingBackend(str(tmp_path / "CursorVibe.json"))
+    loop = VirtualEventLoop()
+    return SettingsService(backend, loop=loop, flush_delay=1.0), backend, loop
+
+def test_saves_coalesce_into_one_write(tmp_path):
+    service, backend, loop = make_service(tmp_path)
+    for value in (0.5, 0.7, 0.9):
+        service.save_frequency(value)
+        loop.run_until(loop.time() + 0.2)
+    service.save_distance(4)
+    assert backend.syncs == 0
+    assert service.pending() == {"frequency": 0.9, "distance": 4}
+    # One second after the first change
+    loop.run_until(1.0)
+    assert backend.syncs == 1
+    assert saved(backend.path) == {"frequency": 0.9, "distance": 4}
+    assert service.pending() == {}
+    loop.run_until(10.0)
+    assert backend.syncs == 1
+
+def test_flush_on_exit_writes_pending_changes(tmp_path):
+    service, backend, loop = make_service(tmp_path)
+    service.save_idle_threshold(30)
+    service.flush()
+    assert saved(backend.path) == {"idle_threshold": 30}
+    assert service.flush_timer is None
+    # Nothing pending: no second write
+    service.flush()
+    loop.run_until(5.0)
+    assert backend.syncs == 1
+    assert SettingsService(FileSettingsBackend(backend.path)).idle_threshold == 30
+
+def test_failed_flush_keeps_changes_and_retries(tmp_path):
+    service, backend, loop = make_service(tmp_path)
+    backend.failures = 1
+    service.save_frequency(0.5)
+    service.save_distance(3)
+    loop.run_until(1.0)
+    assert backend.syncs == 0
+    assert service.pending() == {"frequency": 0.5, "distance": 3}
+    # A newer value saved before the retry wins
+    service.save_frequency(2.0)
+    loop.run_until(1.0 + FLUSH_RETRY_DELAY - 0.1)
+    assert backend.syncs == 0
+    loop.run_until(1.0 + FLUSH_RETRY_DELAY)
+    assert backend.syncs == 1
+    assert saved(backend.path) == {"frequency": 2.0, "distance": 3}
+    assert service.pending() == {}
+
+def test_failed_flush_on_exit_keeps_changes(tmp_path):
+    service, backend, loop = make_service(tmp_path)
+    backend.failures = 1
+    service.save_pattern("circle")
+    service.flush()
+    assert service.pending() == {"pattern": "circle"}
+    service.flush()
+    assert saved(backend.path) == {"pattern": "circle"}
+
+def test_zero_delay_writes_through(tmp_path):
+    backend = CountingBackend(str(tmp_path / "CursorVibe.json"))
+    service = SettingsService(backend, flush_delay=0)
+    service.save_frequency(1.5)
+    service.save_distance(5)
+    assert backend.syncs == 2
+    assert saved(backend.path) == {"frequency": 1.5, "distance": 5}
@@ -0,0 +1,52 @@
+import pytest
+
+from services.simulation import INPUT, SUSPEND, Simulation, parse_duration, parse_script
+
+@pytest.mark.parametrize("text, seconds", [
+    ("90", 90), ("45s", 45), ("15m", 900), ("1h30m", 5400), (" 2.5m ", 150),
+])
+def test_parse_duration(text, seconds):
+    assert parse_duration(text) == seconds
+
+@pytest.mark.parametrize("text", ["", "m", "10x", "1h 30m", "-5s", "5s!"])
+def test_parse_duration_rejects_malformed_text(text):
+    with pytest.raises(ValueError, match="invalid duration"):
+        parse_duration(text)
+
+def test_parse_script():
+    events, duration = parse_script("""
+        # morning
+        active 3s
+        idle 1m  # coffee
+        active 10s every 5s
+        suspend 30s
+    """)
+    assert events == [
+        (0.0, INPUT), (1.0, INPUT), (2.0, INPUT),
+        (63.0, INPUT), (68.0, INPUT),
+        (73.0, SUSPEND, 30.0),
+    ]
+    assert duration == 103.0
+
+@pytest.mark.parametrize("text, message", [
+    ("idle 5m\nactive", "line 2"),
+    ("idle soon", "line 1: invalid duration"),
+    ("active 1m every", "line 1: expected"),
+    ("active 1m each 5s", "line 1: expected"),
+    ("idle 1m\n\nnap 20m", "line 3: unknown segment 'nap'"),
+])
+def test_parse_script_errors_name_the_line(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_script(text)
+
+def test_suspend_delays_the_grid_once():
+    events, duration = parse_script("active 10s\nidle 60s\nsuspend 30s\nidle 20s")
+    report = Simulation(events, duration, frequency=1.0, idle_threshold=3).run()
+    move_times = [move[0] for move in report.moves]
+    # Idle from 12s on: one move a second up to the suspend at 70s
+    assert move_times[:59] == [float(t) for t in range(12, 71)]
+    # The timer due at 71s fires on resume, which then resyncs the grid
+    assert report.missed == [(71.0, 100.0)]
+    assert move_times[59:] == [float(t) for t in range(100, 121)]
+    assert report.longest_gap() == 30.0
+    assert report.inputs == [float(t) for t in range(10)]
@@ -0,0 +1,91 @@
+import threading
+
+from services.status_bus import StatusBus, describe_status
+
+class Clock:
+    def __init__(self, now=100.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+def test_notify_fires_once_until_the_next_snapshot():
+    bus = StatusBus(Clock())
+    wakeups = []
+    bus.notify = lambda: wakeups.append(bus.moves)
+    bus.publish_start("move", 100.0)
+    for _ in range(5):
+        bus.publish_move(100.0)
+    bus.publish_error("Error moving cursor")
+    assert wakeups == [0]
+    assert bus.snapshot()["moves"] == 5
+    # Snapshots re-arm it, whether or not anything changed in between
+    bus.snapshot()
+    bus.publish_activity(101.0)
+    bus.publish_move(102.0)
+    assert wakeups == [0, 5]
+
+def test_publishing_without_a_consumer_is_silent():
+    bus = StatusBus(Clock())
+    bus.publish_move(1.0)
+    assert not bus.pending
+    wakeups = []
+    bus.notify = lambda: wakeups.append(True)
+    bus.publish_move(2.0)
+    assert wakeups == [True]
+
+def test_concurrent_publishers_wake_the_consumer_once():
+    bus = StatusBus(Clock())
+    wakeups = []
+    bus.notify = lambda: wakeups.append(True)
+    threads = [threading.Thread(target=lambda: [bus.publish_activity(1.0) for _ in range(500)])
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert wakeups == [True]
+
+def test_snapshot_ages_follow_the_clock():
+    clock = Clock(100.0)
+    bus = StatusBus(clock)
+    bus.publish_start("move", 95.0)
+    status = bus.snapshot()
+    assert status["idle"] == 5.0 and status["since_move"] is None
+    bus.publish_move(99.0)
+    clock.now = 130.0
+    status = bus.snapshot()
+    assert (status["idle"], status["since_move"]) == (35.0, 31.0)
+    # A timestamp read on another thread may be a little ahead of the clock
+    bus.publish_activity(130.5)
+    assert bus.snapshot()["idle"] == 0.0
+    bus.publish_stop()
+    status = bus.snapshot()
+    assert (status["active"], status["idle"], status["since_move"]) == (False, None, None)
+
+def test_restart_resets_the_moves():
+    bus = StatusBus(Clock())
+    bus.publish_start("move")
+    bus.publish_move(100.0)
+    bus.publish_stop()
+    bus.publish_start("sparse")
+    status = bus.snapshot()
+    assert (status["mode"], status["moves"], status["idle"]) == ("sparse", 0, None)
+
+def status(**fields):
+    snapshot = {"active": True, "mode": "move", "moves": 0, "idle": None,
+                "since_move": None, "error": None, "errors": 0}
+    snapshot.update(fields)
+    return snapshot
+
+def test_describe_status():
+    assert describe_status(status(active=False)) == "Not running"
+    assert describe_status(status(idle=5.2, moves=3, since_move=1.4)) == (
+        "Idle 5s, 3 moves, last 1s ago")
+    assert describe_status(status(moves=1, since_move=0.0)) == "1 move, last 0s ago"
+    errors = status(moves=2, errors=1, error="Error moving cursor")
+    assert describe_status(errors) == "2 moves, 1 error"
+    # Inhibiting moves nothing, so only the idle time and errors are shown
+    assert describe_status(status(mode="inhibit", idle=12.0)) == "Idle 12s"
+    assert describe_status(status(mode="inhibit", errors=2)) == "2 errors"
+    assert describe_status(status(mode="inhibit")) == "Running"
@@ -0,0 +1,139 @@
+import collections
+
+from services.event_loop import VirtualEventLoop
+from services.supervisor import RESPAWN_DELAY, HashRing, Supervisor, WorkerHandle
+
+NAMES = [f"vdi-{number}:0" for number in range(2000)]
+
+def owners(ring):
+    return {name: ring.lookup(name) for name in NAMES}
+
+def test_empty_ring_has_no_owner():
+    assert HashRing().lookup(":0") is None
+
+def test_placement_is_stable_and_even():
+    ring = HashRing()
+    for node in range(4):
+        ring.add(node)
+    placement = owners(ring)
+    # Independent of insertion order
+    other = HashRing()
+    for node in (3, 1, 0, 2, 1):
+        other.add(node)
+    assert owners(other) == placement
+    shares = collections.Counter(placement.values())
+    assert set(shares) == {0, 1, 2, 3}
+    assert all(300 < share < 700 for share in shares.values()), shares
+
+def test_removing_a_node_moves_only_its_keys():
+    ring = HashRing()
+    for node in range(4):
+        ring.add(node)
+    before = owners(ring)
+    ring.remove(2)
+    after = owners(ring)
+    for name in NAMES:
+        if before[name] == 2:
+            assert after[name] in (0, 1, 3)
+        else:
+            assert after[name] == before[name]
+    # Adding it back restores the original placement exactly
+    ring.add(2)
+    assert owners(ring) == before
+
+class FakeProcess:
+    pid = 4242
+    exitcode = -9
+    sentinel = 1001
+    
+    def join(self, timeout=None):
+        pass
+
+class FakeConn:
+    def __init__(self):
+        self.sent = []
+    
+    def send(self, message):
+        self.sent.append(message)
+    
+    def fileno(self):
+        return 1000
+    
+    def close(self):
+        pass
+
+class FakeLoop(VirtualEventLoop):
+    def add_reader(self, fd, callback):
+        pass
+    
+    def remove_reader(self, fd):
+        pass
+
+def supervisor_with_workers(count):
+    supervisor = Supervisor(FakeLoop(), workers=count)
+    supervisor.spawned = []
+    supervisor._spawn = supervisor.spawned.append  # No processes; record replacements
+    for worker_id in range(count):
+        handle = WorkerHandle(worker_id, FakeProcess(), FakeConn())
+        supervisor.workers[worker_id] = handle
+        supervisor._handle_message(handle, ("ready",))
+    return supervisor
+
+def test_worker_loss_moves_its_targets_to_survivors():
+    supervisor = supervisor_with_workers(3)
+    for name in NAMES[:300]:
+        supervisor.add_target(name, frequency=1.0)
+    before = {name: target.worker_id for name, target in supervisor.targets.items()}
+    assert set(before.values()) == {0, 1, 2}
+    lost = supervisor.workers[1]
+    for handle in supervisor.workers.values():
+        handle.conn.sent.clear()
+    
+    supervisor._on_exit(lost)
+    assert 1 not in supervisor.workers
+    moved = [name for name, worker_id in before.items() if worker_id == 1]
+    for name, target in supervisor.targets.items():
+        if name in moved:
+            assert target.worker_id in (0, 2)
+        else:
+            assert target.worker_id == before[name]
+    # Survivors only receive the orphaned targets
+    added = [message[1] for handle in supervisor.workers.values()
+             for message in handle.conn.sent if message[0] == "add"]
+    assert sorted(added) == sorted(moved)
+    assert not any(message[0] == "remove" for handle in supervisor.workers.values()
+                   for message in handle.conn.sent)
+    
+    # The replacement is spawned after the respawn delay, doubling on repeats
+    supervisor.loop.run_until(RESPAWN_DELAY)
+    assert supervisor.spawned == [1]
+    assert supervisor.respawn_delays[1] == 2 * RESPAWN_DELAY
+    assert supervisor.restarts[1] == 1
+
+def test_ready_replacement_takes_back_only_its_targets():
+    supervisor = supervisor_with_workers(3)
+    for name in NAMES[:300]:
+        supervisor.add_target(name, frequency=1.0)
+    before = {name: target.worker_id for name, target in supervisor.targets.items()}
+    supervisor._on_exit(supervisor.workers[1])
+    for handle in supervisor.workers.values():
+        handle.conn.sent.clear()
+    
+    replacement = WorkerHandle(1, FakeProcess(), FakeConn())
+    supervisor.workers[1] = replacement
+    supervisor._handle_message(replacement, ("ready",))
+    assert {name: target.worker_id for name, target in supervisor.targets.items()} == before
+    returned = sorted(name for name, worker_id in before.items() if worker_id == 1)
+    assert sorted(message[1] for message in replacement.conn.sent) == returned
+    removed = [message[1] for worker_id in (0, 2)
+               for message in supervisor.workers[worker_id].conn.sent if message[0] == "remove"]
+    assert sorted(removed) == returned
+
+def test_drop_from_a_stale_worker_is_ignored():
+    supervisor = supervisor_with_workers(2)
+    target = supervisor.add_target(NAMES[0])
+    other = supervisor.workers[1 - target.worker_id]
+    supervisor._handle_message(other, ("dropped", NAMES[0], "gone"))
+    assert NAMES[0] in supervisor.targets
+    supervisor._handle_message(supervisor.workers[target.worker_id], ("dropped", NAMES[0], "gone"))
+    assert NAMES[0] not in supervisor.targets
@@ -0,0 +1,80 @@
+import fcntl
+
+import pytest
+
+from services.cursor_service import (
+    BTN_LEFT, EV_KEY, EV_REL, EV_SYN, INPUT_EVENT, REL_X, REL_Y, SYN_REPORT,
+    UI_DEV_CREATE, UI_DEV_DESTROY, UI_DEV_SETUP, UI_SET_EVBIT, UI_SET_KEYBIT,
+    UI_SET_RELBIT, UINPUT_SETUP, UInputBackend,
+)
+
+def read_events(path):
+    """Return the (type, code, value) of every input_event written to path"""
+    with open(path, "rb") as f:
+        data = f.read()
+    assert len(data) % INPUT_EVENT.size == 0
+    return [event[2:] for event in INPUT_EVENT.iter_unpack(data)]
+
+def test_move_relative_writes_motion_and_sync(tmp_path):
+    path = tmp_path / "events"
+    backend = UInputBackend(path=str(path), create_device=False)
+    backend.open()
+    backend.move_relative(3, -2)
+    backend.move_relative(-1, 4)
+    backend.close()
+    assert read_events(path) == [
+        (EV_REL, REL_X, 3), (EV_REL, REL_Y, -2), (EV_SYN, SYN_REPORT, 0),
+        (EV_REL, REL_X, -1), (EV_REL, REL_Y, 4), (EV_SYN, SYN_REPORT, 0),
+    ]
+    assert backend.position() == (2, 2)
+
+def test_keep_alive_moves_out_and_back(tmp_path):
+    path = tmp_path / "events"
+    backend = UInputBackend(path=str(path), create_device=False)
+    backend.open()
+    assert backend.keep_alive(5, -7) == (0, 0)
+    backend.close()
+    assert read_events(path) == [
+        (EV_REL, REL_X, 5), (EV_REL, REL_Y, -7), (EV_SYN, SYN_REPORT, 0),
+        (EV_REL, REL_X, -5), (EV_REL, REL_Y, 7), (EV_SYN, SYN_REPORT, 0),
+    ]
+    assert backend.position() == (0, 0)
+
+def test_device_lifecycle_ioctls(tmp_path, monkeypatch):
+    path = tmp_path / "uinput"
+    path.touch()
+    calls = []
+    monkeypatch.setattr(fcntl, "ioctl", lambda fd, request, arg=0: calls.append((request, arg)))
+    backend = UInputBackend(path=str(path))
+    backend.open()
+    assert calls[:5] == [
+        (UI_SET_EVBIT, EV_KEY),
+        (UI_SET_KEYBIT, BTN_LEFT),
+        (UI_SET_EVBIT, EV_REL),
+        (UI_SET_RELBIT, REL_X),
+        (UI_SET_RELBIT, REL_Y),
+    ]
+    request, setup = calls[5]
+    assert request == UI_DEV_SETUP
+    name = UINPUT_SETUP.unpack(setup)[4].rstrip(b"\0")
+    assert name == UInputBackend.device_name.encode()
+    assert calls[6:] == [(UI_DEV_CREATE, 0)]
+    
+    backend.move_relative(1, 1)
+    backend.close()
+    assert calls[7:] == [(UI_DEV_DESTROY, 0)]
+    assert backend.fd is None
+    assert len(read_events(path)) == 3
+
+def test_failed_device_setup_closes_the_file(tmp_path, monkeypatch):
+    path = tmp_path / "uinput"
+    path.touch()
+    
+    def refuse(fd, request, arg=0):
+        raise PermissionError("uinput refused")
+    
+    monkeypatch.setattr(fcntl, "ioctl", refuse)
+    backend = UInputBackend(path=str(path))
+    with pytest.raises(PermissionError):
+        backend.open()
+    assert backend.fd is None
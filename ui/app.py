@@ -0,0 +1,273 @@
+import os
+import tempfile
+import time
+from PyQt5.QtCore import QObject
+from PyQt5.QtWidgets import QApplication
+
+from services.activity_recorder import open_recorder
+from services.control_server import CONTROL_AVAILABLE, ControlHandler, ControlServer
+from services.cursor_service import CursorService
+from services.journal import LogSink, journal
+from services.metrics import start_exporters
+from services.power_policy import PowerPolicy
+from services.schedule import ScheduleTimer
+from services.settings_service import SettingsService
+from services.status_bus import describe_status
+from services.system_tray import SystemTrayService
+from ui.custom_widgets import apply_theme
+from ui.qt_event_loop import QtEventLoop
+from ui.status_relay import StatusRelay
+
+class CursorVibeApp(QObject):
+    """Owns the services and the tray icon of the GUI application.
+    
+    The tray is the only UI that always exists. The settings window
+    (ui/main_window.py) is imported and built on the first "Show Settings",
+    and destroyed again once it has been hidden for settings_window_timeout
+    seconds, so a session started from autostart keeps no widget tree.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.settings_window = None
+        self.destroy_timer = None
+        
+        # Initialize services
+        self.event_loop = QtEventLoop(self)
+        self.settings_service = SettingsService(loop=self.event_loop)
+        self.power_policy = PowerPolicy(battery_budget=self.settings_service.wakeup_budget)
+        self.activity_recorder = None
+        if self.settings_service.activity_trace:
+            self.activity_recorder = open_recorder(self.settings_service.activity_trace)
+        self.cursor_service = CursorService(
+            loop=self.event_loop,
+            input_backend=self.settings_service.input_backend,
+            power_policy=self.power_policy,
+            recorder=self.activity_recorder
+        )
+        self.log_sink = None
+        if self.settings_service.log_file:
+            try:
+                self.log_sink = LogSink.open(journal, self.settings_service.log_file)
+                self.log_sink.start()
+            except OSError as e:
+                journal.error(f"Error opening log file {self.settings_service.log_file}: {e}")
+        self.metrics_exporters = start_exporters(
+            self.cursor_service.metrics, self.event_loop,
+            textfile=self.settings_service.metrics_textfile,
+            port=self.settings_service.metrics_port
+        )
+        
+        # Initialize system tray, styled like the settings window
+        apply_theme(QApplication.instance())
+        self.system_tray = SystemTrayService(self)
+        self.system_tray.connect_signals(
+            toggle_callback=self.toggle_simulation,
+            show_callback=self.show_settings,
+            quit_callback=self.close_app,
+            trace_callback=self.toggle_tracing,
+            dump_trace_callback=self.dump_trace,
+            dump_events_callback=self.dump_events,
+            menu_callback=self.refresh_live
+        )
+        self.system_tray.set_tracing(self.cursor_service.tracer.enabled)
+        
+        # Live engine status, streamed only while the settings window is shown
+        self.status_relay = StatusRelay(self.cursor_service.status, self)
+        self.status_relay.snapshot_ready.connect(self.on_status)
+        
+        # Apply settings to cursor service
+        settings = self.settings_service.get_all_settings()
+        self.cursor_service.update_settings(
+            frequency=settings["movement_frequency"],
+            distance=settings["movement_distance"],
+            idle_threshold=settings["idle_threshold"],
+            pattern=settings["pattern"],
+            pattern_file=settings["pattern_file"],
+            sparse_margin=settings["sparse_margin"],
+            feedback_tuning=settings["feedback_tuning"]
+        )
+        self.cursor_service.on_tuning_change = self.on_tuning_change
+        self.cursor_service.set_mode(settings["keep_awake_mode"])
+        self.refresh_status()
+        self.refresh_power()
+        
+        # Re-plan the cadence when the laptop is plugged in or unplugged
+        self.power_policy.start_monitor(
+            lambda: self.event_loop.call_soon_threadsafe(self.on_power_change)
+        )
+        
+        # Start and stop at the edges of the active hours, if any are set
+        self.schedule_timer = ScheduleTimer(
+            lambda active: self.event_loop.call_soon_threadsafe(
+                lambda: self.apply_active_hours(active))
+        )
+        try:
+            self.schedule_timer.set_schedule(self.settings_service.load_schedule())
+        except ValueError as e:
+            journal.error(f"Invalid active hours, ignoring them: {e}")
+        
+        # Serve start/stop/status/set requests from cursorvibe-ctl and later launches
+        self.control_server = None
+        if CONTROL_AVAILABLE:
+            handler = ControlHandler(
+                self.cursor_service, self.settings_service,
+                on_change=self.on_control_change,
+                on_args=self.on_forwarded_args,
+                schedule_timer=self.schedule_timer
+            )
+            self.control_server = ControlServer(handler, self.event_loop)
+            try:
+                self.control_server.start()
+            except OSError as e:
+                journal.error(f"Control socket unavailable: {e}")
+                self.control_server = None
+    
+    def show_settings(self):
+        """Show the settings window, building it if it does not exist."""
+        if self.destroy_timer is not None:
+            self.destroy_timer.cancel()
+            self.destroy_timer = None
+        if self.settings_window is None:
+            from ui.main_window import CursorVibe
+            self.settings_window = CursorVibe(self)
+            self.settings_window.center()
+        self.settings_window.show()
+        self.settings_window.raise_()
+        self.settings_window.activateWindow()
+        self.status_relay.resume()
+    
+    def on_settings_hidden(self):
+        """Stop the live status and schedule the hidden settings window for destruction."""
+        self.status_relay.pause()
+        if self.destroy_timer is not None:
+            self.destroy_timer.cancel()
+        timeout = self.settings_service.settings_window_timeout
+        if timeout >= 0:
+            self.destroy_timer = self.event_loop.call_at(
+                self.event_loop.time() + timeout, self.destroy_settings
+            )
+    
+    def destroy_settings(self):
+        """Free the settings window and its widget tree."""
+        self.destroy_timer = None
+        if self.settings_window is not None and not self.settings_window.isVisible():
+            self.settings_window.deleteLater()
+            self.settings_window = None
+    
+    def toggle_simulation(self):
+        """Toggle the cursor movement simulation on/off."""
+        if not self.cursor_service.is_active:
+            self.cursor_service.start_simulation()
+        else:
+            self.cursor_service.stop_simulation()
+        self.refresh_status()
+    
+    def set_mode(self, mode):
+        """Save and switch to a keep-awake mode."""
+        self.settings_service.save_keep_awake_mode(mode)
+        self.cursor_service.set_mode(mode)
+        self.refresh_status()
+    
+    def refresh_status(self):
+        """Bring the tray and the settings window in line with the cursor service."""
+        if self.cursor_service.is_active:
+            self.system_tray.update_status(True, self.cursor_service.active_mode)
+        else:
+            self.system_tray.update_status(False, self.cursor_service.mode)
+        if self.settings_window is not None:
+            self.settings_window.refresh_status()
+        self.refresh_live()
+    
+    def refresh_live(self):
+        """Show a fresh status snapshot, e.g. when the tray menu opens."""
+        self.on_status(self.cursor_service.status.snapshot())
+    
+    def on_status(self, status):
+        """Render a live status snapshot in the tray tooltip and the window."""
+        self.system_tray.update_live(describe_status(status))
+        if self.settings_window is not None:
+            self.settings_window.show_live(status)
+    
+    def refresh_power(self):
+        """Show the power state and effective cadence in the tray tooltip."""
+        self.system_tray.update_power(
+            self.power_policy.describe(self.cursor_service.move_interval)
+        )
+    
+    def on_power_change(self):
+        """Apply the power policy after switching between AC and battery."""
+        self.cursor_service.apply_power_policy()
+        self.refresh_power()
+    
+    def on_tuning_change(self, display, tuning):
+        """Save a new feedback tuning and show it."""
+        self.settings_service.save_feedback_tuning(display, tuning)
+        if self.settings_window is not None:
+            self.settings_window.refresh_tuning()
+        self.refresh_power()
+    
+    def toggle_tracing(self, enabled):
+        """Switch scheduler tracing on or off from the tray menu."""
+        if enabled:
+            self.cursor_service.tracer.enable()
+        else:
+            self.cursor_service.tracer.disable()
+    
+    def dump_trace(self):
+        """Write the buffered trace and tell the user where it went."""
+        try:
+            path = self.cursor_service.tracer.dump()
+        except OSError as e:
+            journal.error(f"Error saving trace: {e}")
+            return
+        self.system_tray.show_message("Trace saved", path)
+    
+    def dump_events(self):
+        """Write the recent event journal and tell the user where it went."""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(tempfile.gettempdir(), f"cursorvibe-events-{stamp}.log")
+        try:
+            journal.dump(path)
+        except OSError as e:
+            journal.error(f"Error saving events: {e}")
+            return
+        self.system_tray.show_message("Recent events saved", path)
+    
+    def apply_active_hours(self, active):
+        """Start or stop at an active-hours transition; manual toggles last until the next one."""
+        if active:
+            self.cursor_service.start_simulation()
+        else:
+            self.cursor_service.stop_simulation()
+        self.refresh_status()
+    
+    def on_control_change(self):
+        """Reflect state changed through the control socket."""
+        self.system_tray.set_tracing(self.cursor_service.tracer.enabled)
+        if self.settings_window is not None:
+            self.settings_window.refresh_settings()
+        self.refresh_status()
+        self.refresh_power()
+    
+    def on_forwarded_args(self, argv):
+        """A second launch was forwarded to us: bring the window forward."""
+        if "--tray" not in argv:
+            self.show_settings()
+    
+    def close_app(self):
+        """Close the application completely."""
+        self.cursor_service.stop_simulation()
+        self.settings_service.flush()
+        if self.control_server is not None:
+            self.control_server.stop()
+        for exporter in self.metrics_exporters:
+            exporter.stop()
+        self.power_policy.stop_monitor()
+        self.schedule_timer.stop()
+        if self.log_sink is not None:
+            self.log_sink.stop()
+        if self.activity_recorder is not None:
+            self.activity_recorder.close()
+        self.system_tray.tray_icon.hide()
+        QApplication.quit()
@@ -17,32 +17,180 @@ COLORS = {
     "border": "#DEE2E6",
 }
 
+# One application-wide stylesheet, built from COLORS and parsed by Qt once.
+# Widget variants and states are selected with dynamic properties
+# (set_style_property), which only repolishes the widget whose property
+# changed instead of re-parsing a stylesheet on every state change.
+#
+#   ModernButton  variant: "primary", "secondary" or "danger"
+#   QLabel        role: "secondary", "value", "note" or "hint"
+#   QMenu         role: "tray" for the tray icon's menu
+#
+# Rules for the main window are scoped to it so other menus and dialogs
+# keep the platform style.
+STYLESHEET = f"""
+CursorVibe, CursorVibe QWidget {{
+    background-color: {COLORS["background"]};
+    color: {COLORS["text"]};
+    font-family: 'Segoe UI', sans-serif;
+}}
+
+QLabel[role="secondary"] {{
+    color: {COLORS["text_secondary"]};
+}}
+
+QLabel[role="value"] {{
+    color: {COLORS["primary"]};
+}}
+
+QLabel[role="note"] {{
+    color: {COLORS["text_secondary"]};
+    font-size: 11px;
+}}
+
+QLabel[role="hint"] {{
+    color: {COLORS["text_secondary"]};
+    font-size: 10px;
+}}
+
+CursorVibe CardWidget, CardWidget {{
+    background-color: {COLORS["card"]};
+    border-radius: 8px;
+    border: 1px solid {COLORS["border"]};
+}}
+
+ModernSlider::groove:horizontal {{
+    border: none;
+    height: 6px;
+    background: {COLORS["border"]};
+    border-radius: 3px;
+}}
+
+ModernSlider::handle:horizontal {{
+    background: {COLORS["primary"]};
+    border: none;
+    width: 16px;
+    height: 16px;
+    margin: -5px 0;
+    border-radius: 8px;
+}}
+
+ModernSlider::handle:horizontal:hover {{
+    background: {COLORS["primary_dark"]};
+}}
+
+ModernButton {{
+    border-radius: 4px;
+    padding: 8px 16px;
+    font-weight: bold;
+}}
+
+ModernButton[variant="primary"] {{
+    background-color: {COLORS["primary"]};
+    color: white;
+    border: none;
+}}
+
+ModernButton[variant="primary"]:hover, ModernButton[variant="primary"]:pressed {{
+    background-color: {COLORS["primary_dark"]};
+}}
+
+ModernButton[variant="primary"]:disabled {{
+    background-color: {COLORS["border"]};
+    color: {COLORS["text_secondary"]};
+}}
+
+ModernButton[variant="secondary"] {{
+    background-color: {COLORS["card"]};
+    color: {COLORS["primary"]};
+    border: 1px solid {COLORS["primary"]};
+}}
+
+ModernButton[variant="secondary"]:hover, ModernButton[variant="secondary"]:pressed {{
+    background-color: {COLORS["background"]};
+}}
+
+ModernButton[variant="secondary"]:disabled {{
+    background-color: {COLORS["card"]};
+    color: {COLORS["border"]};
+    border: 1px solid {COLORS["border"]};
+}}
+
+ModernButton[variant="danger"] {{
+    background-color: {COLORS["danger"]};
+    color: white;
+    border: none;
+}}
+
+ModernButton[variant="danger"]:hover {{
+    background-color: #C82333;
+}}
+
+ModernButton[variant="danger"]:pressed {{
+    background-color: #BD2130;
+}}
+
+ModernCheckBox {{
+    spacing: 8px;
+    color: {COLORS["text"]};
+}}
+
+ModernCheckBox::indicator {{
+    width: 20px;
+    height: 20px;
+    border-radius: 3px;
+    border: 1px solid {COLORS["border"]};
+}}
+
+ModernCheckBox::indicator:checked {{
+    background-color: {COLORS["primary"]};
+    border: 1px solid {COLORS["primary"]};
+    image: url(:/icons/check.svg);
+}}
+
+ModernCheckBox::indicator:unchecked:hover {{
+    border: 1px solid {COLORS["primary"]};
+}}
+
+QMenu[role="tray"] {{
+    background-color: {COLORS["card"]};
+    border: 1px solid {COLORS["border"]};
+    border-radius: 4px;
+    padding: 5px;
+}}
+
+QMenu[role="tray"]::item {{
+    padding: 6px 25px 6px 20px;
+    border-radius: 3px;
+    margin: 2px;
+}}
+
+QMenu[role="tray"]::item:selected {{
+    background-color: {COLORS["primary"]};
+    color: white;
+}}
+"""
+
+def apply_theme(app):
+    """Install the application stylesheet unless it is already installed"""
+    if app.styleSheet() != STYLESHEET:
+        app.setStyleSheet(STYLESHEET)
+
+def set_style_property(widget, name, value):
+    """Set a dynamic property the stylesheet selects on and repolish the widget"""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+
 class ModernSlider(QSlider):
     """Custom slider with modern appearance"""
     
     def __init__(self, orientation=Qt.Horizontal, parent=None):
         super().__init__(orientation, parent)
-        self.setStyleSheet(f"""
-            QSlider::groove:horizontal {{
-                border: none;
-                height: 6px;
-                background: {COLORS["border"]};
-                border-radius: 3px;
-            }}
-            
-            QSlider::handle:horizontal {{
-                background: {COLORS["primary"]};
-                border: none;
-                width: 16px;
-                height: 16px;
-                margin: -5px 0;
-                border-radius: 8px;
-            }}
-            
-            QSlider::handle:horizontal:hover {{
-                background: {COLORS["primary_dark"]};
-            }}
-        """)
 
 class ModernButton(QPushButton):
     """Custom button with modern appearance"""
@@ -53,91 +201,24 @@ class ModernButton(QPushButton):
         self.update_style()
         
     def update_style(self):
-        if self.primary:
-            self.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {COLORS["primary"]};
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    padding: 8px 16px;
-                    font-weight: bold;
-                }}
-                QPushButton:hover {{
-                    background-color: {COLORS["primary_dark"]};
-                }}
-                QPushButton:pressed {{
-                    background-color: {COLORS["primary_dark"]};
-                }}
-                QPushButton:disabled {{
-                    background-color: {COLORS["border"]};
-                    color: {COLORS["text_secondary"]};
-                }}
-            """)
-        else:
-            self.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {COLORS["card"]};
-                    color: {COLORS["primary"]};
-                    border: 1px solid {COLORS["primary"]};
-                    border-radius: 4px;
-                    padding: 8px 16px;
-                    font-weight: bold;
-                }}
-                QPushButton:hover {{
-                    background-color: {COLORS["background"]};
-                }}
-                QPushButton:pressed {{
-                    background-color: {COLORS["background"]};
-                }}
-                QPushButton:disabled {{
-                    background-color: {COLORS["card"]};
-                    color: {COLORS["border"]};
-                    border: 1px solid {COLORS["border"]};
-                }}
-            """)
+        """Return to the button's primary or secondary look"""
+        self.set_variant("primary" if self.primary else "secondary")
+    
+    def set_variant(self, variant):
+        """Switch to the "primary", "secondary" or "danger" look"""
+        set_style_property(self, "variant", variant)
 
 class ModernCheckBox(QCheckBox):
     """Custom checkbox with modern appearance"""
     
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
-        self.setStyleSheet(f"""
-            QCheckBox {{
-                spacing: 8px;
-                color: {COLORS["text"]};
-            }}
-            
-            QCheckBox::indicator {{
-                width: 20px;
-                height: 20px;
-                border-radius: 3px;
-                border: 1px solid {COLORS["border"]};
-            }}
-            
-            QCheckBox::indicator:checked {{
-                background-color: {COLORS["primary"]};
-                border: 1px solid {COLORS["primary"]};
-                image: url(:/icons/check.svg);
-            }}
-            
-            QCheckBox::indicator:unchecked:hover {{
-                border: 1px solid {COLORS["primary"]};
-            }}
-        """)
 
 class CardWidget(QWidget):
     """Widget with card-like appearance"""
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet(f"""
-            CardWidget {{
-                background-color: {COLORS["card"]};
-                border-radius: 8px;
-                border: 1px solid {COLORS["border"]};
-            }}
-        """)
 
 class StatusIndicator(QLabel):
     """Custom status indicator"""
@@ -1,64 +1,32 @@
 
-import sys
 from PyQt5.QtWidgets import (QMainWindow, QLabel, QVBoxLayout, QHBoxLayout, 
-                            QWidget, QApplication, QTimer)
+                            QWidget, QApplication)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap, QFont
 
 from ui.custom_widgets import (ModernSlider, ModernButton, ModernCheckBox, 
-                              CardWidget, StatusIndicator, COLORS)
-from services.cursor_service import CursorService
-from services.settings_service import SettingsService
-from services.system_tray import SystemTrayService
+                              CardWidget, StatusIndicator, apply_theme)
+from services.cursor_service import MODE_FEEDBACK, MODE_INHIBIT, MODE_MOVE, MODE_SPARSE
+from services.status_bus import describe_status
 
 class CursorVibe(QMainWindow):
-    """Main window class for the CursorVibe application."""
+    """Settings window of the CursorVibe application (built on demand by ui/app.py)."""
     
-    def __init__(self):
+    def __init__(self, app):
         super().__init__()
-        
-        # Initialize services
-        self.settings_service = SettingsService()
-        self.cursor_service = CursorService()
+        self.app = app
+        self.settings_service = app.settings_service
+        self.cursor_service = app.cursor_service
         
         # Initialize UI
         self.init_ui()
-        
-        # Initialize system tray
-        self.system_tray = SystemTrayService(self)
-        self.system_tray.connect_signals(
-            toggle_callback=self.toggle_simulation,
-            show_callback=self.show,
-            quit_callback=self.close_app
-        )
-        
-        # Apply settings to cursor service
-        settings = self.settings_service.get_all_settings()
-        self.cursor_service.update_settings(
-            frequency=settings["movement_frequency"],
-            distance=settings["movement_distance"],
-            idle_threshold=settings["idle_threshold"]
-        )
-        
-        # Set up mouse position monitoring
-        self.mouse_monitor_timer = QTimer(self)
-        self.mouse_monitor_timer.timeout.connect(self.cursor_service.check_mouse_activity)
-        self.mouse_monitor_timer.start(500)  # Check every 500ms
+        self.refresh_status()
     
     def init_ui(self):
         """Initialize the user interface components."""
         self.setWindowTitle("CursorVibe")
-        self.setFixedSize(420, 500)
-        self.setStyleSheet(f"""
-            QWidget {{
-                background-color: {COLORS["background"]};
-                color: {COLORS["text"]};
-                font-family: 'Segoe UI', sans-serif;
-            }}
-            QLabel {{
-                color: {COLORS["text"]};
-            }}
-        """)
+        self.setFixedSize(420, 600)
+        apply_theme(QApplication.instance())
         
         # Create central widget and layout
         central_widget = QWidget(self)
@@ -78,7 +46,7 @@ class CursorVibe(QMainWindow):
         title_label.setFont(QFont("Segoe UI", 18, QFont.Bold))
         subtitle_label = QLabel("Keep your workflow alive")
         subtitle_label.setFont(QFont("Segoe UI", 10))
-        subtitle_label.setStyleSheet(f"color: {COLORS['text_secondary']}")
+        subtitle_label.setProperty("role", "secondary")
         
         title_layout.addWidget(title_label)
         title_layout.addWidget(subtitle_label)
@@ -98,7 +66,7 @@ class CursorVibe(QMainWindow):
         
         self.status_indicator = StatusIndicator()
         self.status_text = QLabel("Inactive")
-        self.status_text.setStyleSheet(f"color: {COLORS['text_secondary']}")
+        self.status_text.setProperty("role", "secondary")
         
         status_header.addWidget(status_title)
         status_header.addStretch()
@@ -107,9 +75,20 @@ class CursorVibe(QMainWindow):
         
         # Toggle button
         self.toggle_button = ModernButton("Go, Mouse, Go!")
-        self.toggle_button.clicked.connect(self.toggle_simulation)
+        self.toggle_button.clicked.connect(self.app.toggle_simulation)
+        
+        # Live status streamed from the engine while the window is shown
+        self.live_label = QLabel()
+        self.live_label.setProperty("role", "note")
+        
+        # Schedule found by feedback mode
+        self.tuning_label = QLabel()
+        self.tuning_label.setProperty("role", "note")
+        self.tuning_label.hide()
         
         status_layout.addLayout(status_header)
+        status_layout.addWidget(self.live_label)
+        status_layout.addWidget(self.tuning_label)
         status_layout.addWidget(self.toggle_button)
         status_layout.setContentsMargins(16, 16, 16, 16)
         
@@ -128,7 +107,7 @@ class CursorVibe(QMainWindow):
         freq_header = QHBoxLayout()
         freq_label = QLabel("Check Frequency")
         self.freq_value = QLabel(f"{self.settings_service.movement_frequency:.1f}s")
-        self.freq_value.setStyleSheet(f"color: {COLORS['primary']}")
+        self.freq_value.setProperty("role", "value")
         
         freq_header.addWidget(freq_label)
         freq_header.addStretch()
@@ -141,7 +120,7 @@ class CursorVibe(QMainWindow):
         self.freq_slider.valueChanged.connect(self.update_frequency)
         
         freq_desc = QLabel("How often CursorVibe checks if movement is needed")
-        freq_desc.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 10px")
+        freq_desc.setProperty("role", "hint")
         
         freq_layout.addLayout(freq_header)
         freq_layout.addWidget(self.freq_slider)
@@ -153,7 +132,7 @@ class CursorVibe(QMainWindow):
         dist_header = QHBoxLayout()
         dist_label = QLabel("Movement Distance")
         self.dist_value = QLabel(f"{self.settings_service.movement_distance}px")
-        self.dist_value.setStyleSheet(f"color: {COLORS['primary']}")
+        self.dist_value.setProperty("role", "value")
         
         dist_header.addWidget(dist_label)
         dist_header.addStretch()
@@ -166,7 +145,7 @@ class CursorVibe(QMainWindow):
         self.dist_slider.valueChanged.connect(self.update_distance)
         
         dist_desc = QLabel("How far the cursor moves each time")
-        dist_desc.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 10px")
+        dist_desc.setProperty("role", "hint")
         
         dist_layout.addLayout(dist_header)
         dist_layout.addWidget(self.dist_slider)
@@ -178,7 +157,7 @@ class CursorVibe(QMainWindow):
         idle_header = QHBoxLayout()
         idle_label = QLabel("Idle Threshold")
         self.idle_value = QLabel(f"{self.settings_service.idle_threshold}s")
-        self.idle_value.setStyleSheet(f"color: {COLORS['primary']}")
+        self.idle_value.setProperty("role", "value")
         
         idle_header.addWidget(idle_label)
         idle_header.addStretch()
@@ -191,7 +170,7 @@ class CursorVibe(QMainWindow):
         self.idle_slider.valueChanged.connect(self.update_idle_threshold)
         
         idle_desc = QLabel("Seconds of inactivity before cursor movement begins")
-        idle_desc.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 10px")
+        idle_desc.setProperty("role", "hint")
         
         idle_layout.addLayout(idle_header)
         idle_layout.addWidget(self.idle_slider)
@@ -208,6 +187,38 @@ class CursorVibe(QMainWindow):
         startup_layout.addStretch()
         settings_layout.addLayout(startup_layout)
         
+        # Keep-awake mode checkbox
+        mode_layout = QHBoxLayout()
+        self.inhibit_checkbox = ModernCheckBox("Keep awake without moving the cursor")
+        self.inhibit_checkbox.setChecked(self.settings_service.keep_awake_mode == MODE_INHIBIT)
+        self.inhibit_checkbox.stateChanged.connect(self.toggle_inhibit_mode)
+        
+        mode_layout.addWidget(self.inhibit_checkbox)
+        mode_layout.addStretch()
+        settings_layout.addLayout(mode_layout)
+        
+        # Sparse keep-alive checkbox
+        sparse_layout = QHBoxLayout()
+        self.sparse_checkbox = ModernCheckBox("Move only just before the screen would lock")
+        self.sparse_checkbox.setChecked(self.settings_service.keep_awake_mode == MODE_SPARSE)
+        self.sparse_checkbox.setEnabled(self.settings_service.keep_awake_mode != MODE_INHIBIT)
+        self.sparse_checkbox.stateChanged.connect(self.toggle_sparse_mode)
+        
+        sparse_layout.addWidget(self.sparse_checkbox)
+        sparse_layout.addStretch()
+        settings_layout.addLayout(sparse_layout)
+        
+        # Feedback mode checkbox
+        feedback_layout = QHBoxLayout()
+        self.feedback_checkbox = ModernCheckBox("Check each move and tune it automatically")
+        self.feedback_checkbox.setChecked(self.settings_service.keep_awake_mode == MODE_FEEDBACK)
+        self.feedback_checkbox.setEnabled(self.settings_service.keep_awake_mode != MODE_INHIBIT)
+        self.feedback_checkbox.stateChanged.connect(self.toggle_feedback_mode)
+        
+        feedback_layout.addWidget(self.feedback_checkbox)
+        feedback_layout.addStretch()
+        settings_layout.addLayout(feedback_layout)
+        
         # Add all components to main layout
         main_layout.addLayout(header_layout)
         main_layout.addWidget(status_card)
@@ -216,13 +227,10 @@ class CursorVibe(QMainWindow):
         
         # Add a footer
         footer_label = QLabel("© 2025 CursorVibe")
-        footer_label.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 10px")
+        footer_label.setProperty("role", "hint")
         footer_label.setAlignment(Qt.AlignCenter)
         main_layout.addWidget(footer_label)
         
-        # Show the window
-        self.center()
-        self.show()
     
     def center(self):
         """Center the window on the screen."""
@@ -237,6 +245,7 @@ class CursorVibe(QMainWindow):
         self.freq_value.setText(f"{frequency:.1f}s")
         self.settings_service.save_frequency(frequency)
         self.cursor_service.update_settings(frequency=frequency)
+        self.app.refresh_power()
     
     def update_distance(self, value):
         """Update the movement distance setting."""
@@ -254,48 +263,98 @@ class CursorVibe(QMainWindow):
         """Toggle the run on startup setting."""
         self.settings_service.save_run_on_startup(state == Qt.Checked)
     
-    def toggle_simulation(self):
-        """Toggle the cursor movement simulation on/off."""
-        if not self.cursor_service.is_active:
-            # Start simulation
-            self.cursor_service.start_simulation()
+    def toggle_inhibit_mode(self, state):
+        """Switch between cursor movement and the sleep inhibitor."""
+        self.apply_mode()
+    
+    def toggle_sparse_mode(self, state):
+        """Switch between regular and sparse cursor movement."""
+        if state == Qt.Checked:
+            self.set_checked_quietly(self.feedback_checkbox, False)
+        self.apply_mode()
+    
+    def toggle_feedback_mode(self, state):
+        """Switch between regular and self-tuning cursor movement."""
+        if state == Qt.Checked:
+            self.set_checked_quietly(self.sparse_checkbox, False)
+        self.apply_mode()
+    
+    def set_checked_quietly(self, checkbox, checked):
+        """Check or uncheck a box without running its handler."""
+        checkbox.blockSignals(True)
+        checkbox.setChecked(checked)
+        checkbox.blockSignals(False)
+    
+    def apply_mode(self):
+        """Save and switch to the keep-awake mode the checkboxes select."""
+        if self.inhibit_checkbox.isChecked():
+            mode = MODE_INHIBIT
+        elif self.sparse_checkbox.isChecked():
+            mode = MODE_SPARSE
+        elif self.feedback_checkbox.isChecked():
+            mode = MODE_FEEDBACK
+        else:
+            mode = MODE_MOVE
+        self.sparse_checkbox.setEnabled(mode != MODE_INHIBIT)
+        self.feedback_checkbox.setEnabled(mode != MODE_INHIBIT)
+        self.app.set_mode(mode)
+    
+    
+    def refresh_tuning(self):
+        """Show the schedule feedback mode is running, if it is."""
+        tuner = self.cursor_service.tuner
+        if tuner is None:
+            self.tuning_label.hide()
+            return
+        self.tuning_label.setText(
+            f"Tuned: {tuner.distance}px every {tuner.interval:.1f}s ({tuner.phase})"
+        )
+        self.tuning_label.show()
+    
+    def refresh_status(self):
+        """Bring the status card in line with the cursor service."""
+        if self.cursor_service.is_active:
             self.status_text.setText("Active")
             self.status_indicator.setActive(True)
             self.toggle_button.setText("Hold the Mouse Back")
-            self.toggle_button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {COLORS["danger"]};
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    padding: 8px 16px;
-                    font-weight: bold;
-                }}
-                QPushButton:hover {{
-                    background-color: #C82333;
-                }}
-                QPushButton:pressed {{
-                    background-color: #BD2130;
-                }}
-            """)
-            self.system_tray.update_status(True)
+            self.toggle_button.set_variant("danger")
         else:
-            # Stop simulation
-            self.cursor_service.stop_simulation()
             self.status_text.setText("Inactive")
             self.status_indicator.setActive(False)
             self.toggle_button.setText("Go, Mouse, Go!")
-            self.toggle_button.setStyleSheet("")
-            self.toggle_button.update_style()  # Reset button style
-            self.system_tray.update_status(False)
+            self.toggle_button.update_style()
+        self.refresh_tuning()
+    
+    def show_live(self, status):
+        """Render a live status snapshot under the status header."""
+        text = describe_status(status)
+        if text != self.live_label.text():
+            self.live_label.setText(text)
+            self.live_label.setToolTip(f"Last error: {status['error']}" if status["error"] else "")
+    
+    def refresh_settings(self):
+        """Move the setting controls to the values held by the services."""
+        controls = (
+            (self.freq_slider, int(round(self.cursor_service.movement_frequency * 10))),
+            (self.dist_slider, self.cursor_service.movement_distance),
+            (self.idle_slider, self.cursor_service.idle_threshold),
+        )
+        for slider, value in controls:
+            slider.blockSignals(True)
+            slider.setValue(value)
+            slider.blockSignals(False)
+        self.freq_value.setText(f"{self.cursor_service.movement_frequency:.1f}s")
+        self.dist_value.setText(f"{self.cursor_service.movement_distance}px")
+        self.idle_value.setText(f"{self.cursor_service.idle_threshold}s")
+        mode = self.cursor_service.mode
+        self.set_checked_quietly(self.inhibit_checkbox, mode == MODE_INHIBIT)
+        self.set_checked_quietly(self.sparse_checkbox, mode == MODE_SPARSE)
+        self.set_checked_quietly(self.feedback_checkbox, mode == MODE_FEEDBACK)
+        self.sparse_checkbox.setEnabled(mode != MODE_INHIBIT)
+        self.feedback_checkbox.setEnabled(mode != MODE_INHIBIT)
     
     def closeEvent(self, event):
-        """Handle window close event."""
+        """Hide instead of closing; the app frees the window after a while."""
         event.ignore()
         self.hide()
-    
-    def close_app(self):
-        """Close the application completely."""
-        self.cursor_service.stop_simulation()
-        self.system_tray.tray_icon.hide()
-        QApplication.quit()
+        self.app.on_settings_hidden()
@@ -0,0 +1,59 @@
+import time
+
+from PyQt5.QtCore import QObject, QThread, QTimer, Qt, pyqtSignal
+
+from services.event_loop import run_callback
+
+class QtTimerHandle:
+    """Cancellable handle for a callback scheduled with QtEventLoop.call_at"""
+    
+    def __init__(self, timer):
+        self.timer = timer
+    
+    def cancel(self):
+        if self.timer is not None:
+            self.timer.stop()
+            self.timer.deleteLater()
+            self.timer = None
+
+class QtEventLoop(QObject):
+    """Event loop for CursorService driven by the Qt event loop
+    
+    Implements the interface documented in services/event_loop.py so the
+    engine's timers run on the GUI thread without a worker thread. A
+    callback that raises is reported to the journal, as in HeapEventLoop;
+    PyQt would otherwise abort the application.
+    """
+    
+    _invoke = pyqtSignal(object)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._invoke.connect(self._run_callback, Qt.QueuedConnection)
+    
+    def time(self):
+        return time.monotonic()
+    
+    def call_at(self, when, callback):
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setTimerType(Qt.PreciseTimer)
+        handle = QtTimerHandle(timer)
+        
+        def fire():
+            handle.cancel()
+            run_callback(callback)
+        
+        timer.timeout.connect(fire)
+        # Round up so the callback never runs before its deadline
+        timer.start(max(0, int((when - time.monotonic()) * 1000 + 0.999)))
+        return handle
+    
+    def call_soon_threadsafe(self, callback):
+        self._invoke.emit(callback)
+    
+    def in_loop_thread(self):
+        return QThread.currentThread() is self.thread()
+    
+    def _run_callback(self, callback):
+        run_callback(callback)
@@ -0,0 +1,62 @@
+import time
+
+from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+# Most snapshots delivered per second
+STATUS_RATE = 2.0
+
+class StatusRelay(QObject):
+    """Delivers coalesced StatusBus snapshots on the GUI thread at a bounded rate
+    
+    The bus wakes the relay through a queued signal from whichever thread
+    published, and the relay emits snapshot_ready(dict) at most STATUS_RATE
+    times a second. While the engine is running it also re-emits at that
+    rate so ages such as the idle time keep counting. While paused it takes
+    no snapshots, so the bus stops waking it until resume().
+    """
+    
+    snapshot_ready = pyqtSignal(dict)
+    _wake = pyqtSignal()
+    
+    def __init__(self, bus, parent=None, rate=STATUS_RATE):
+        super().__init__(parent)
+        self.bus = bus
+        self.interval = 1.0 / rate
+        self.paused = True
+        self.last_emit = float("-inf")
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.deliver)
+        self._wake.connect(self.on_wake, Qt.QueuedConnection)
+        bus.notify = self._wake.emit
+    
+    def on_wake(self):
+        if self.paused or self.timer.isActive():
+            return
+        wait = self.last_emit + self.interval - time.monotonic()
+        if wait > 0:
+            self.timer.start(int(wait * 1000 + 0.999))
+        else:
+            self.deliver()
+    
+    def deliver(self):
+        """Take a snapshot and emit it"""
+        if self.paused:
+            return
+        self.last_emit = time.monotonic()
+        status = self.bus.snapshot()
+        self.snapshot_ready.emit(status)
+        if status["active"]:
+            self.timer.start(int(self.interval * 1000))
+    
+    def pause(self):
+        """Stop delivering; changes wait in the bus until resume()"""
+        self.paused = True
+        self.timer.stop()
+    
+    def resume(self):
+        """Deliver a fresh snapshot now and keep delivering"""
+        if self.paused:
+            self.paused = False
+            self.deliver()